@@ -0,0 +1,168 @@
+(function() {
+    // Track currently open tooltip
+    let currentOpenTooltip = null;
+    let currentOpenIcon = null;
+
+    // Function to close tooltip
+    function closeTooltip() {
+        if (currentOpenTooltip) {
+            currentOpenTooltip.classList.remove('visible');
+        }
+        if (currentOpenIcon) {
+            currentOpenIcon.classList.remove('active');
+        }
+        currentOpenTooltip = null;
+        currentOpenIcon = null;
+
+        // Remove backdrop on mobile
+        const backdrop = document.getElementById('metric-tooltip-backdrop');
+        if (backdrop) {
+            backdrop.remove();
+        }
+        document.body.style.overflow = '';
+    }
+
+    // Function to toggle tooltip visibility
+    function toggleTooltip(tooltipId, iconElement) {
+        const tooltip = document.getElementById(tooltipId);
+        if (!tooltip) {
+            console.warn('Tooltip not found:', tooltipId);
+            return;
+        }
+
+        // If this tooltip is already open, close it
+        if (tooltip.classList.contains('visible')) {
+            closeTooltip();
+        } else {
+            // Close any other open tooltip first
+            if (currentOpenTooltip && currentOpenTooltip !== tooltip) {
+                closeTooltip();
+            }
+
+            // Open this tooltip
+            tooltip.classList.add('visible');
+            if (iconElement) {
+                iconElement.classList.add('active');
+            }
+            currentOpenTooltip = tooltip;
+            currentOpenIcon = iconElement;
+
+            // Add backdrop on mobile
+            const isMobile = window.innerWidth <= 768;
+            if (isMobile) {
+                let backdrop = document.getElementById('metric-tooltip-backdrop');
+                if (!backdrop) {
+                    backdrop = document.createElement('div');
+                    backdrop.id = 'metric-tooltip-backdrop';
+                    backdrop.addEventListener('click', function(e) {
+                        e.stopPropagation();
+                        closeTooltip();
+                    });
+                    document.body.appendChild(backdrop);
+                }
+                document.body.style.overflow = 'hidden';
+            }
+        }
+    }
+
+    // Expose function globally
+    window.toggleMetricTooltip = toggleTooltip;
+
+    // Use event delegation for dynamically added elements
+    document.addEventListener('click', function(e) {
+        const icon = e.target.closest('.metric-info-icon');
+        if (icon) {
+            e.preventDefault();
+            e.stopPropagation();
+            const tooltipId = icon.getAttribute('data-tooltip-id');
+            if (tooltipId) {
+                toggleTooltip(tooltipId, icon);
+            }
+        }
+    });
+
+    // Close tooltip when clicking outside (desktop)
+    document.addEventListener('click', function(e) {
+        if (window.innerWidth > 768 && currentOpenTooltip) {
+            const isTooltip = e.target.closest('.metric-tooltip');
+            const isIcon = e.target.closest('.metric-info-icon');
+
+            if (!isTooltip && !isIcon) {
+                closeTooltip();
+            }
+        }
+    });
+
+    // Close tooltip on Escape key
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape' && currentOpenTooltip) {
+            closeTooltip();
+        }
+    });
+
+    // Keyboard support for info icons
+    document.addEventListener('keydown', function(e) {
+        if ((e.key === 'Enter' || e.key === ' ') && e.target.classList.contains('metric-info-icon')) {
+            e.preventDefault();
+            const tooltipId = e.target.getAttribute('data-tooltip-id');
+            if (tooltipId) {
+                toggleTooltip(tooltipId, e.target);
+            }
+        }
+    });
+
+    // Create popup overlay if it doesn't exist (for detailed popup - optional)
+    if (!document.getElementById('metric-popup-overlay')) {
+        const overlay = document.createElement('div');
+        overlay.id = 'metric-popup-overlay';
+        overlay.className = 'metric-popup-overlay';
+        overlay.innerHTML = `
+            <div class="metric-popup-content">
+                <button class="metric-popup-close" onclick="closeMetricPopup()">×</button>
+                <div id="metric-popup-body"></div>
+            </div>
+        `;
+        document.body.appendChild(overlay);
+
+        overlay.addEventListener('click', function(e) {
+            if (e.target === overlay) {
+                closeMetricPopup();
+            }
+        });
+    }
+
+    // Function to show detailed popup (optional - for future use)
+    window.showMetricPopup = function(title, description, formula, insight) {
+        const overlay = document.getElementById('metric-popup-overlay');
+        const body = document.getElementById('metric-popup-body');
+
+        body.innerHTML = `
+            <div class="metric-popup-title">${title}</div>
+            <div class="metric-popup-section">
+                <div class="metric-popup-section-label">Description</div>
+                <div class="metric-popup-section-content">${description}</div>
+            </div>
+            <div class="metric-popup-section">
+                <div class="metric-popup-section-label">Formula</div>
+                <div class="metric-popup-section-content">
+                    <div class="metric-popup-formula">${formula}</div>
+                </div>
+            </div>
+            <div class="metric-popup-section">
+                <div class="metric-popup-section-label">Why This Matters</div>
+                <div class="metric-popup-section-content">${insight}</div>
+            </div>
+        `;
+
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    };
+
+    window.closeMetricPopup = function() {
+        const overlay = document.getElementById('metric-popup-overlay');
+        if (overlay) {
+            overlay.classList.remove('active');
+            document.body.style.overflow = '';
+        }
+    };
+})();
@@ -0,0 +1,286 @@
+"""
+Local JSON API over the Lynx tracker metrics.
+
+Run it next to the workbook:
+
+    python lynx_api.py --port 8765
+
+Endpoints (GET, JSON):
+    /health     data version and load time
+    /metrics    calculate_all_metrics for a view and period
+    /cube       monthly chart data (revenue, nights, reservations, ADR, occupancy)
+    /bookings   bookings checked in during a period
+
+Query parameters for /metrics, /cube and /bookings:
+    view=Overall|Airbnb|Booking.com   (default Overall)
+    period=all|year|month_year|date_range   (default all)
+    year=2025  month=1..12  start=YYYY-MM-DD  end=YYYY-MM-DD
+
+The workbook stays loaded in one MetricsEngine and is only re-read when it changes
+on disk. Every response carries an ETag built from the workbook content hash and
+the request, so pollers sending If-None-Match get a 304 without any recomputation.
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from lynx_metrics import FILE_PATH, MetricsEngine
+
+VIEW_MODES = ("Overall", "Airbnb", "Booking.com")
+PERIOD_TYPES = ("all", "year", "month_year", "date_range")
+
+
+class ApiError(ValueError):
+    """Bad request parameters - reported to the client as HTTP 400."""
+
+
+# ========== JSON ENCODING ==========
+
+def to_jsonable(value):
+    """Convert metric values, frames and numpy/pandas scalars into plain JSON types."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        df = value.reset_index() if not isinstance(value.index, pd.RangeIndex) else value
+        return [to_jsonable(row) for row in df.to_dict(orient="records")]
+    if isinstance(value, pd.Series):
+        return to_jsonable(value.to_dict())
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, str):
+        return value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def encode(payload) -> bytes:
+    return json.dumps(to_jsonable(payload), ensure_ascii=False).encode("utf-8")
+
+
+# ========== REQUEST PARSING ==========
+
+def _single(query: dict, name: str):
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(query: dict, name: str):
+    raw = _single(query, name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ApiError(f"'{name}' must be an integer")
+
+
+def _date_param(query: dict, name: str):
+    raw = _single(query, name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return pd.Timestamp(datetime.strptime(raw, "%Y-%m-%d"))
+    except ValueError:
+        raise ApiError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def parse_selection(query: dict) -> tuple[str, dict]:
+    """Turn query parameters into (view_mode, period kwargs for MetricsEngine)."""
+    view_mode = _single(query, "view") or "Overall"
+    if view_mode not in VIEW_MODES:
+        raise ApiError(f"'view' must be one of {', '.join(VIEW_MODES)}")
+
+    period_type = _single(query, "period") or "all"
+    if period_type not in PERIOD_TYPES:
+        raise ApiError(f"'period' must be one of {', '.join(PERIOD_TYPES)}")
+
+    if period_type == "year":
+        year = _int_param(query, "year")
+        if year is None:
+            raise ApiError("period=year requires 'year'")
+        return view_mode, {"period_type": "year", "year": year}
+
+    if period_type == "month_year":
+        year = _int_param(query, "year")
+        month = _int_param(query, "month")
+        if year is None or month is None:
+            raise ApiError("period=month_year requires 'year' and 'month'")
+        if not 1 <= month <= 12:
+            raise ApiError("'month' must be between 1 and 12")
+        return view_mode, {"period_type": "month_year", "year": year, "month": month}
+
+    if period_type == "date_range":
+        start_date = _date_param(query, "start")
+        end_date = _date_param(query, "end")
+        if start_date is None or end_date is None:
+            raise ApiError("period=date_range requires 'start' and 'end'")
+        if end_date < start_date:
+            raise ApiError("'end' must not be before 'start'")
+        return view_mode, {"period_type": "date_range", "start_date": start_date, "end_date": end_date}
+
+    return view_mode, {}
+
+
+def make_etag(version: str, path: str, view_mode: str, period: dict) -> str:
+    key = json.dumps([version, path, view_mode, sorted((k, str(v)) for k, v in period.items())])
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+# ========== SERVER ==========
+
+class LynxApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one warm MetricsEngine between all requests."""
+
+    daemon_threads = True
+
+    def __init__(self, address, engine: MetricsEngine, max_bodies: int = 256):
+        super().__init__(address, LynxApiHandler)
+        self.engine = engine
+        self.max_bodies = max_bodies
+        self._bodies: OrderedDict = OrderedDict()
+        self._bodies_lock = threading.Lock()
+
+    def cached_body(self, etag: str):
+        with self._bodies_lock:
+            body = self._bodies.get(etag)
+            if body is not None:
+                self._bodies.move_to_end(etag)
+            return body
+
+    def store_body(self, etag: str, body: bytes):
+        with self._bodies_lock:
+            self._bodies[etag] = body
+            while len(self._bodies) > self.max_bodies:
+                self._bodies.popitem(last=False)
+
+
+class LynxApiHandler(BaseHTTPRequestHandler):
+    server_version = "LynxAPI/1.0"
+
+    ENDPOINTS = {
+        "/metrics": "metrics",
+        "/cube": "monthly_cube",
+        "/bookings": "bookings",
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+        engine = self.server.engine
+
+        try:
+            if path == "/health":
+                version = engine.refresh()
+                self._send_json(200, {
+                    "status": "ok",
+                    "version": version,
+                    "loaded_at": engine.loaded_at,
+                    "file": str(engine.file_path),
+                })
+                return
+
+            if path not in self.ENDPOINTS:
+                self._send_json(404, {"error": f"Unknown endpoint '{path}'",
+                                      "endpoints": ["/health", *self.ENDPOINTS]})
+                return
+
+            view_mode, period = parse_selection(query)
+
+            # Answer conditional requests from the version alone - nothing is computed
+            etag = make_etag(engine.refresh(), path, view_mode, period)
+            if etag_matches(self.headers.get("If-None-Match", ""), etag):
+                self._send_not_modified(etag)
+                return
+
+            body = self.server.cached_body(etag)
+            if body is None:
+                version, result = getattr(engine, self.ENDPOINTS[path])(view_mode, **period)
+                etag = make_etag(version, path, view_mode, period)
+                body = encode({
+                    "version": version,
+                    "view": view_mode,
+                    "period": period or {"period_type": "all"},
+                    "data": result,
+                })
+                self.server.store_body(etag, body)
+            self._send_body(200, body, etag)
+        except ApiError as e:
+            self._send_json(400, {"error": str(e)})
+        except FileNotFoundError:
+            self._send_json(503, {"error": f"Tracker file not found: {engine.file_path}"})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status: int, payload):
+        self._send_body(status, encode(payload))
+
+    def _send_body(self, status: int, body: bytes, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_modified(self, etag: str):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, file_path: Path = FILE_PATH):
+    engine = MetricsEngine(file_path)
+    engine.refresh()
+    server = LynxApiServer((host, port), engine)
+    print(f"Lynx API serving {file_path} (version {engine.version}) on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON API for the Lynx Apartment tracker")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--file", type=Path, default=FILE_PATH, help="Path to the tracker workbook")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.file)
@@ -0,0 +1,460 @@
+"""
+Altair charts for the Lynx Apartment app (dashboard carousel, custom graphs
+and reports). Kept apart so altair is only imported by the pages that draw
+charts, the first time one of them is opened.
+
+Pages draw charts from the Vega-Lite specs built here rather than from Altair
+chart objects: the data is reshaped and shrunk once, sent as a named Arrow
+dataset, and the validated spec is cached per chart and dataset.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import altair as alt
+
+from lynx_metrics import CHART_METRIC_UNITS
+
+
+# ========== CHART DATA ==========
+
+# Layouts drawn per month (the rest show aggregated values by category)
+TIME_SERIES_LAYOUTS = {
+    "Line", "Bar", "Stacked bar", "Area", "Platform comparison", "Smooth area", "Scatter", "Multi-series line",
+}
+# Layouts that leave the "Total" series out and show only the platforms
+PLATFORM_ONLY_LAYOUTS = {"Stacked bar", "Area", "Platform comparison"}
+
+
+def chart_frame(chart_df: pd.DataFrame, metric_key: str, layout: str) -> pd.DataFrame:
+    """
+    The long-format data a metric chart draws: Month / Platform / Value for
+    time series (index named "Month"), Category / Value otherwise.
+    """
+    df = chart_df.reset_index()
+    if "Month" not in df.columns or layout not in TIME_SERIES_LAYOUTS:
+        if "Category" in df.columns and "Value" in df.columns:
+            return df[["Category", "Value"]]
+        # Aggregated metric: a single value
+        return pd.DataFrame([{"Category": metric_key, "Value": float(chart_df.squeeze())}])
+
+    if pd.api.types.is_datetime64_any_dtype(df["Month"]):
+        df["Month"] = df["Month"].dt.strftime("%Y-%m")
+    else:
+        df["Month"] = df["Month"].astype(str)
+    df_melted = df.melt(id_vars=["Month"], var_name="Platform", value_name="Value")
+    if layout in PLATFORM_ONLY_LAYOUTS:
+        df_melted = df_melted[df_melted["Platform"] != "Total"]
+    return df_melted.reset_index(drop=True)
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink chart data before it is sent: amounts rounded to cents and stored
+    as float32, small integers downcast, repeated labels dictionary-encoded.
+    """
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_float_dtype(values):
+            df[column] = values.round(2).astype("float32")
+        elif pd.api.types.is_integer_dtype(values):
+            df[column] = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            df[column] = values.astype(str).astype("category")
+    return df
+
+
+def chart_dataset(df: pd.DataFrame) -> tuple[str, bytes]:
+    """
+    (name, Arrow IPC bytes) of compacted chart data. The name is a hash of the
+    bytes, so layers drawing the same data share one dataset and unchanged data
+    gives a byte-identical element.
+    """
+    # The pandas metadata only matters for reading back into pandas
+    table = pa.Table.from_pandas(compact_frame(df), preserve_index=False).replace_schema_metadata(None)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = sink.getvalue().to_pybytes()
+    return f"lynx-{hashlib.sha1(data).hexdigest()[:16]}", data
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Cheap content hash of a chart's input frame (values, index and column names)."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr((df.index.name, list(df.columns))).encode())
+    return digest.hexdigest()
+
+
+def _spec_with_data(df: pd.DataFrame, chart) -> dict:
+    """
+    Vega-Lite dict of chart(data) reading `df` as a named Arrow dataset, without
+    the default theme's fixed 300px view size.
+    """
+    name, data = chart_dataset(df)
+    spec = chart(alt.NamedData(name=name)).to_dict()
+    spec.pop("config", None)
+    spec["datasets"] = {name: data}
+    return spec
+
+
+# ========== CHARTS ==========
+
+SPEC_CACHE_SIZE = 256  # cached chart specs, across sessions
+_spec_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_spec_cache_lock = threading.Lock()
+
+
+def _cached_spec(key: tuple, build) -> dict:
+    """
+    The spec for `key` (chart kind, its options and the frame_digest of its
+    data), calling build() - reshape, compact, Altair validation - only on a miss.
+    """
+    with _spec_cache_lock:
+        spec = _spec_cache.get(key)
+        if spec is not None:
+            _spec_cache.move_to_end(key)
+    if spec is None:
+        spec = build()
+        with _spec_cache_lock:
+            _spec_cache[key] = spec
+            while len(_spec_cache) > SPEC_CACHE_SIZE:
+                _spec_cache.popitem(last=False)
+    # Streamlit takes the datasets out of the dict it is given
+    return dict(spec)
+
+
+def build_altair_chart(
+    chart_df: pd.DataFrame,
+    metric_key: str,
+    layout: str,
+    view_mode: str,
+) -> alt.Chart:
+    """
+    Build an Altair chart based on the layout type.
+    
+    Args:
+        chart_df: DataFrame with index as Year-Month and columns as platforms/metrics
+        metric_key: The metric key (e.g., "revenue_by_month")
+        layout: Chart layout type ("Line", "Bar", "Stacked bar", "Area", "Platform comparison")
+        view_mode: Current view mode ("Overall", "Airbnb", "Booking.com", "Comparison")
+    
+    Returns:
+        Altair chart object
+    """
+    df = chart_frame(chart_df, metric_key, layout)
+    return _metric_chart(df, df, metric_key, layout)
+
+
+def _metric_chart(df: pd.DataFrame, data, metric_key: str, layout: str) -> alt.Chart:
+    """Encode the long-format frame `df` as `layout`; the chart reads its rows from `data`."""
+    # Get Y-axis label
+    y_label = CHART_METRIC_UNITS.get(metric_key, "Value")
+    
+    # Color scheme for platforms / categories
+    platform_colors = {
+        "Airbnb": "#FF5A5F",        # Airbnb pink/red
+        "Booking.com": "#003580",   # Booking.com blue
+        "Total": "#7B68EE",         # Medium slate blue
+    }
+    
+    # ---------- TIME-SERIES LAYOUTS (require Month column) ----------
+    if "Month" in df.columns and layout == "Line":
+        
+        chart = (
+            alt.Chart(data)
+            .mark_line(point=True, strokeWidth=2)
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color(
+                    "Platform:N",
+                    scale=alt.Scale(
+                        domain=list(df["Platform"].unique()),
+                        range=[platform_colors.get(p, "#808080") for p in df["Platform"].unique()]
+                    ),
+                    legend=alt.Legend(title="Platform")
+                ),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+        
+    elif "Month" in df.columns and layout == "Bar":
+        
+        chart = (
+            alt.Chart(data)
+            .mark_bar()
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color(
+                    "Platform:N",
+                    scale=alt.Scale(
+                        domain=list(df["Platform"].unique()),
+                        range=[platform_colors.get(p, "#808080") for p in df["Platform"].unique()]
+                    ),
+                    legend=alt.Legend(title="Platform")
+                ),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+        
+    elif "Month" in df.columns and layout == "Stacked bar":
+        
+        chart = (
+            alt.Chart(data)
+            .mark_bar()
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label, stack="zero"),
+                color=alt.Color(
+                    "Platform:N",
+                    scale=alt.Scale(
+                        domain=list(df["Platform"].unique()),
+                        range=[platform_colors.get(p, "#808080") for p in df["Platform"].unique()]
+                    ),
+                    legend=alt.Legend(title="Platform")
+                ),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+        
+    elif "Month" in df.columns and layout == "Area":
+        
+        chart = (
+            alt.Chart(data)
+            .mark_area(opacity=0.7)
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label, stack="zero"),
+                color=alt.Color(
+                    "Platform:N",
+                    scale=alt.Scale(
+                        domain=list(df["Platform"].unique()),
+                        range=[platform_colors.get(p, "#808080") for p in df["Platform"].unique()]
+                    ),
+                    legend=alt.Legend(title="Platform")
+                ),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+        
+    elif "Month" in df.columns and layout == "Platform comparison":
+        # Side-by-side comparison chart
+        chart = (
+            alt.Chart(data)
+            .mark_bar()
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color(
+                    "Platform:N",
+                    scale=alt.Scale(
+                        domain=list(df["Platform"].unique()),
+                        range=[platform_colors.get(p, "#808080") for p in df["Platform"].unique()]
+                    ),
+                    legend=alt.Legend(title="Platform")
+                ),
+                column=alt.Column("Platform:N", spacing=10),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+            .resolve_scale(y="independent")
+        )
+        
+    # ---------- TIME-SERIES EXTENDED LAYOUTS ----------
+    elif "Month" in df.columns and layout == "Smooth area":
+        chart = (
+            alt.Chart(data)
+            .mark_area(opacity=0.6, interpolate="monotone")
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color("Platform:N", legend=alt.Legend(title="Platform")),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+
+    elif "Month" in df.columns and layout == "Scatter":
+        chart = (
+            alt.Chart(data)
+            .mark_point(filled=True, size=80)
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color("Platform:N", legend=alt.Legend(title="Platform")),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Platform"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+
+    elif "Month" in df.columns and layout == "Multi-series line":
+        chart = (
+            alt.Chart(data)
+            .mark_line(point=True, strokeWidth=3)
+            .encode(
+                x=alt.X("Month:O", title="Month", sort=None),
+                y=alt.Y("Value:Q", title=y_label),
+                color=alt.Color("Platform:N", legend=alt.Legend(title="Series")),
+                tooltip=[
+                    alt.Tooltip("Month:O", title="Month"),
+                    alt.Tooltip("Platform:N", title="Series"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+        )
+
+    # ---------- AGGREGATED / CATEGORY LAYOUTS (no Month column) ----------
+    else:
+        # chart_frame gives aggregated metrics a "Category" and a "Value" column
+        cat_field = "Category"
+
+        if layout in ["Pie", "Donut"]:
+            base = alt.Chart(data).encode(
+                theta=alt.Theta("Value:Q", stack=True),
+                color=alt.Color(f"{cat_field}:N", legend=alt.Legend(title="Category")),
+                tooltip=[
+                    alt.Tooltip(f"{cat_field}:N", title="Category"),
+                    alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                ],
+            )
+            if layout == "Donut":
+                chart = base.mark_arc(innerRadius=60)
+            else:
+                chart = base.mark_arc()
+
+        elif layout == "Horizontal bar":
+            chart = (
+                alt.Chart(data)
+                .mark_bar()
+                .encode(
+                    y=alt.Y(f"{cat_field}:N", title="Category", sort="-x"),
+                    x=alt.X("Value:Q", title=y_label),
+                    tooltip=[
+                        alt.Tooltip(f"{cat_field}:N", title="Category"),
+                        alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                    ],
+                )
+            )
+
+        elif layout == "Bar":
+            chart = (
+                alt.Chart(data)
+                .mark_bar()
+                .encode(
+                    x=alt.X(f"{cat_field}:N", title="Category", sort=None),
+                    y=alt.Y("Value:Q", title=y_label),
+                    tooltip=[
+                        alt.Tooltip(f"{cat_field}:N", title="Category"),
+                        alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                    ],
+                )
+            )
+
+        else:
+            # Fallback: simple point chart for other layouts
+            chart = (
+                alt.Chart(data)
+                .mark_point(filled=True, size=100)
+                .encode(
+                    x=alt.X(f"{cat_field}:N", title="Category"),
+                    y=alt.Y("Value:Q", title=y_label),
+                    tooltip=[
+                        alt.Tooltip(f"{cat_field}:N", title="Category"),
+                        alt.Tooltip("Value:Q", title=y_label, format=",.2f"),
+                    ],
+                )
+            )
+
+    return chart
+
+
+
+def metric_chart_spec(chart_df: pd.DataFrame, metric_key: str, layout: str, view_mode: str) -> dict:
+    """
+    Vega-Lite spec for st.vega_lite_chart: the build_altair_chart chart with
+    its data as a compact named dataset. Cached per (metric_key, layout,
+    view_mode, data version), so a rerun with unchanged data skips the reshape
+    and Altair entirely.
+    """
+    def build() -> dict:
+        df = chart_frame(chart_df, metric_key, layout)
+        return _spec_with_data(df, lambda data: _metric_chart(df, data, metric_key, layout))
+
+    return _cached_spec(("metric", metric_key, layout, view_mode, frame_digest(chart_df)), build)
+
+
+def _revenue_heatmap(data) -> alt.Chart:
+    return (
+        alt.Chart(data)
+        .mark_rect()
+        .encode(
+            x=alt.X("MonthName:O", title="Month"),
+            y=alt.Y("Year:O", title="Year"),
+            color=alt.Color("Revenue:Q", title="Revenue (€)", scale=alt.Scale(scheme="blues")),
+            tooltip=[
+                alt.Tooltip("Year:O", title="Year"),
+                alt.Tooltip("MonthName:O", title="Month"),
+                alt.Tooltip("Revenue:Q", title="Revenue (€)", format=",.2f"),
+            ],
+        )
+    )
+
+
+def revenue_heatmap_spec(heat_df: pd.DataFrame) -> dict:
+    """Year x month revenue heatmap (Dashboard and reports) from revenue_heatmap_frame rows."""
+    heat_df = heat_df[["Year", "MonthName", "Revenue"]]
+    return _cached_spec(
+        ("revenue_heatmap", frame_digest(heat_df)),
+        lambda: _spec_with_data(heat_df, _revenue_heatmap),
+    )
+
+
+def _cost_breakdown(data) -> alt.Chart:
+    return (
+        alt.Chart(data)
+        .mark_arc()
+        .encode(
+            theta=alt.Theta(field="Amount", type="quantitative"),
+            color=alt.Color(field="Cost Type", type="nominal"),
+            tooltip=[alt.Tooltip("Cost Type:N"), alt.Tooltip("Amount:Q", format=",.2f")],
+        )
+    )
+
+
+def cost_breakdown_spec(cost_df: pd.DataFrame) -> dict:
+    """Pie of per-stay costs by type (reports) from Cost Type / Amount rows."""
+    cost_df = cost_df[["Cost Type", "Amount"]]
+    return _cached_spec(
+        ("cost_breakdown", frame_digest(cost_df)),
+        lambda: _spec_with_data(cost_df, _cost_breakdown),
+    )
@@ -0,0 +1,358 @@
+"""
+Bulk import of Airbnb and Booking.com reservation exports into the Bookings sheet.
+
+Free of Streamlit calls so an export can be imported from the app as well as
+from the command line:
+
+    python lynx_import.py reservations.csv
+
+The export is read in chunks and every chunk is mapped to the Bookings columns
+at once (dates, nights, platform commission, the default per-stay costs of the
+Add New Booking form). Reservations already in the tracker - same reservation
+code, or same platform, dates and guest - are skipped, and everything else is
+written as one journal entry, however many rows the file has.
+"""
+import argparse
+import csv
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+import pandas as pd
+
+from lynx_metrics import (
+    BOOKING_COM_COMMISSION,
+    FILE_PATH,
+    TRACKER_SNAPSHOT_DIR,
+    TrackerJournal,
+    get_current_consumables_totals,
+)
+
+
+# 🔧 CONFIG
+IMPORT_CHUNK_ROWS = 5000
+
+# Per-stay costs an imported booking starts with, as in the Add New Booking form
+IMPORT_DEFAULT_COSTS = {
+    "Transportation Cost (€)": 5.0,
+    "Laundry Cost (€)": 5.0,
+    "Bank Fees (€)": 6.0,
+}
+
+# Platform code of the export (Airbnb confirmation code, Booking.com book number)
+RESERVATION_CODE_COLUMN = "Reservation Code"
+
+BOOKINGS_COLUMNS = [
+    "Check-in date", "Check-out date", "Guest Name", "Country", "Adults", "Children",
+    "Total guests", "Sofa Bed", "Baby Crib", "Parking", "Platform", "Nights",
+    "Revenue for stay (€)", "Transportation Cost (€)", "Laundry Cost (€)",
+    "Consumable Cost (€)", "Bank Fees (€)", "Per-stay expenses (€)",
+    "Net Income Before Fixed Costs (€)", "Check-in Month", "Check-in Year", "Notes",
+    RESERVATION_CODE_COLUMN,
+]
+
+# One entry per export format. "columns" maps export headers (first match
+# wins) to the fields used below; "detect" is a header only that export has.
+IMPORT_FORMATS = {
+    "Airbnb": {
+        "detect": "Confirmation code",
+        "platform": "Airbnb",
+        "commission": 0.0,  # "Earnings" is the payout, host fee already taken
+        "dayfirst": False,
+        "columns": {
+            "code": ["Confirmation code"],
+            "status": ["Status"],
+            "guest": ["Guest name", "Guest"],
+            "check_in": ["Start date"],
+            "check_out": ["End date"],
+            "nights": ["# of nights", "Nights"],
+            "adults": ["# of adults", "Adults"],
+            "children": ["# of children", "Children"],
+            "price": ["Earnings", "Amount"],
+        },
+    },
+    "Booking.com": {
+        "detect": "Book number",
+        "platform": "Booking",
+        "commission": BOOKING_COM_COMMISSION,  # used when the row has no commission amount
+        "dayfirst": True,
+        "columns": {
+            "code": ["Book number"],
+            "status": ["Status"],
+            "guest": ["Guest name(s)", "Guest name", "Booked by"],
+            "country": ["Booker country"],
+            "check_in": ["Check-in"],
+            "check_out": ["Check-out"],
+            "nights": ["Duration (nights)"],
+            "adults": ["Adults"],
+            "children": ["Children"],
+            "persons": ["Persons", "People"],
+            "price": ["Price", "Original amount", "Final amount"],
+            "commission_amount": ["Commission amount"],
+        },
+    },
+}
+
+# Booking.com gives the booker's country as an ISO code; the tracker uses names
+COUNTRY_NAMES = {
+    "AL": "Albania", "AT": "Austria", "AU": "Australia", "BA": "Bosnia and Herzegovina",
+    "BE": "Belgium", "BG": "Bulgaria", "CA": "Canada", "CH": "Switzerland", "CN": "China",
+    "CY": "Cyprus", "CZ": "Czech Republic", "DE": "Germany", "DK": "Denmark", "EE": "Estonia",
+    "ES": "Spain", "FI": "Finland", "FR": "France", "GB": "United Kingdom", "GR": "Greece",
+    "HR": "Croatia", "HU": "Hungary", "IE": "Ireland", "IL": "Israel", "IN": "India",
+    "IT": "Italy", "JP": "Japan", "KR": "South Korea", "LT": "Lithuania", "LU": "Luxembourg",
+    "LV": "Latvia", "ME": "Montenegro", "MK": "North Macedonia", "MT": "Malta",
+    "NL": "Netherlands", "NO": "Norway", "NZ": "New Zealand", "PL": "Poland", "PT": "Portugal",
+    "RO": "Romania", "RS": "Serbia", "RU": "Russia", "SE": "Sweden", "SI": "Slovenia",
+    "SK": "Slovakia", "TR": "Turkey", "UA": "Ukraine", "UK": "United Kingdom", "US": "USA",
+    "XK": "Kosovo",
+}
+
+
+# ========== PARSING ==========
+
+def detect_import_format(columns) -> Optional[str]:
+    """Name of the export format whose marker header is among `columns`, or None."""
+    headers = {str(column).strip().lower() for column in columns}
+    for name, spec in IMPORT_FORMATS.items():
+        if spec["detect"].lower() in headers:
+            return name
+    return None
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """
+    Money strings ("€170.72", "1,234.50 EUR", "1.234,50") to floats. A comma is
+    the decimal separator when it comes after the last dot or is the only
+    separator followed by one or two digits.
+    """
+    text = values.astype("string").str.replace(r"[^\d,.\-]", "", regex=True)
+    comma_decimal = (
+        text.str.contains(r",\d{1,2}$", regex=True, na=False)
+        & (text.str.rfind(",") > text.str.rfind("."))
+    )
+    text = text.where(
+        ~comma_decimal,
+        text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+    ).str.replace(",", "", regex=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+def parse_dates(values: pd.Series, dayfirst: bool) -> pd.Series:
+    """ISO dates first, then the platform's slashed format (D/M/Y or M/D/Y)."""
+    text = values.astype("string").str.strip()
+    parsed = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+    slashed = parsed.isna() & text.notna()
+    if slashed.any():
+        fmt = "%d/%m/%Y" if dayfirst else "%m/%d/%Y"
+        parsed[slashed] = pd.to_datetime(text[slashed], format=fmt, errors="coerce")
+    return parsed.dt.normalize()
+
+
+def _field(chunk: pd.DataFrame, spec: dict, field: str) -> Optional[pd.Series]:
+    for header in spec["columns"].get(field, []):
+        if header in chunk.columns:
+            return chunk[header]
+    return None
+
+
+def map_reservations(chunk: pd.DataFrame, import_format: str, consumable_cost: float) -> tuple[pd.DataFrame, dict]:
+    """
+    Map one chunk of an export to Bookings rows.
+
+    Returns (rows, counts) where counts has "cancelled" and "invalid" (rows
+    without usable dates or price) for the import summary.
+    """
+    spec = IMPORT_FORMATS[import_format]
+    chunk = chunk.rename(columns=lambda column: str(column).strip())
+    count = len(chunk)
+
+    def field(name, default=None):
+        values = _field(chunk, spec, name)
+        return values if values is not None else pd.Series(default, index=chunk.index)
+
+    status = field("status", "").astype("string").fillna("")
+    cancelled = status.str.contains("cancel", case=False, regex=False)
+
+    check_in = parse_dates(field("check_in"), spec["dayfirst"])
+    check_out = parse_dates(field("check_out"), spec["dayfirst"])
+    nights = (check_out - check_in).dt.days
+    export_nights = pd.to_numeric(field("nights"), errors="coerce")
+    check_out = check_out.fillna(check_in + pd.to_timedelta(export_nights, unit="D"))
+    nights = nights.fillna(export_nights)
+
+    price = parse_amounts(field("price"))
+    commission = parse_amounts(field("commission_amount"))
+    revenue = (price - commission).fillna(price * (1 - spec["commission"])).round(2)
+
+    valid = check_in.notna() & (nights > 0) & revenue.notna() & ~cancelled
+
+    adults = pd.to_numeric(field("adults"), errors="coerce")
+    children = pd.to_numeric(field("children"), errors="coerce").fillna(0)
+    persons = pd.to_numeric(field("persons"), errors="coerce")
+    adults = adults.fillna(persons - children).fillna(1).clip(lower=1)
+
+    country = field("country").astype("string").str.strip().str.upper()
+    country = country.map(COUNTRY_NAMES).fillna(country).fillna("")
+
+    codes = field("code").astype("string").str.strip().str.replace(r"\.0$", "", regex=True)
+
+    rows = pd.DataFrame({
+        "Check-in date": check_in,
+        "Check-out date": check_out,
+        "Guest Name": field("guest", "").astype("string").str.strip().fillna(""),
+        "Country": country,
+        "Adults": adults.astype(int),
+        "Children": children.astype(int),
+        "Sofa Bed": "No",
+        "Baby Crib": "No",
+        "Parking": "No",
+        "Platform": spec["platform"],
+        "Nights": nights,
+        "Revenue for stay (€)": revenue,
+        "Consumable Cost (€)": round(consumable_cost, 2),
+        **IMPORT_DEFAULT_COSTS,
+        "Notes": "",
+        RESERVATION_CODE_COLUMN: codes,
+    })[valid]
+
+    rows["Total guests"] = rows["Adults"] + rows["Children"]
+    rows["Nights"] = rows["Nights"].astype(int)
+    rows["Per-stay expenses (€)"] = rows[
+        ["Transportation Cost (€)", "Laundry Cost (€)", "Consumable Cost (€)", "Bank Fees (€)"]
+    ].sum(axis=1).round(2)
+    rows["Net Income Before Fixed Costs (€)"] = (rows["Revenue for stay (€)"] - rows["Per-stay expenses (€)"]).round(2)
+    rows["Check-in Month"] = rows["Check-in date"].dt.month
+    rows["Check-in Year"] = rows["Check-in date"].dt.year
+
+    counts = {"cancelled": int(cancelled.sum()), "invalid": int(count - valid.sum() - cancelled.sum())}
+    return rows[BOOKINGS_COLUMNS].reset_index(drop=True), counts
+
+
+def read_reservation_export(
+    source: Union[str, Path, BinaryIO],
+    import_format: Optional[str] = None,
+    chunk_rows: int = IMPORT_CHUNK_ROWS,
+) -> tuple[str, Iterator[pd.DataFrame]]:
+    """
+    (format, chunks) for an export file. The format is detected from the
+    header row unless given; chunks are raw export rows, read lazily.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+        first_line = source.readline()
+        source.seek(0)
+    else:
+        with open(source, "rb") as f:
+            first_line = f.readline()
+    if isinstance(first_line, bytes):
+        first_line = first_line.decode("utf-8-sig", errors="replace")
+    sep = ";" if first_line.count(";") > first_line.count(",") else ","
+    header = next(csv.reader([first_line], delimiter=sep), [])
+
+    import_format = import_format or detect_import_format(header)
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(
+            "Unrecognized export: expected an Airbnb reservations CSV (with 'Confirmation code') "
+            "or a Booking.com reservations CSV (with 'Book number')"
+        )
+    chunks = pd.read_csv(
+        source, sep=sep, dtype=str, encoding="utf-8-sig", chunksize=chunk_rows,
+        keep_default_na=False, na_values=[""],
+    )
+    return import_format, chunks
+
+
+# ========== DEDUPLICATION ==========
+
+def reservation_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keys identifying a reservation: the platform's reservation code, and the
+    stay itself (platform, check-in, check-out, guest) for bookings entered by
+    hand before the platform export was imported.
+    """
+    if df.empty:
+        return pd.DataFrame({"code": pd.Series(dtype=object), "stay": pd.Series(dtype=object)})
+    platform = df["Platform"].astype("string").str.strip().str.lower()
+    if RESERVATION_CODE_COLUMN in df.columns:
+        code = df[RESERVATION_CODE_COLUMN].astype("string").str.strip().replace("", pd.NA)
+        code = ("code:" + platform + ":" + code).astype(object)
+    else:
+        code = pd.Series(None, index=df.index, dtype=object)
+    check_in = pd.to_datetime(df["Check-in date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    check_out = pd.to_datetime(df["Check-out date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    guest = df["Guest Name"].astype("string").str.strip().str.casefold().str.replace(r"\s+", " ", regex=True)
+    stay = ("stay:" + platform + ":" + check_in + ":" + check_out + ":" + guest).astype(object)
+    keys = pd.DataFrame({"code": code, "stay": stay}, index=df.index)
+    return keys.where(keys.notna(), None)
+
+
+# ========== IMPORT ==========
+
+def import_reservations(
+    source: Union[str, Path, BinaryIO],
+    journal: TrackerJournal,
+    import_format: Optional[str] = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Import a platform export into the Bookings sheet in one journal entry.
+
+    Returns a summary: format, read, cancelled, invalid, duplicates, imported
+    and the imported rows (or, with dry_run, the rows that would be imported).
+    """
+    bookings, _, toiletries = journal.load()
+    consumable_cost = get_current_consumables_totals(toiletries)[1]
+    import_format, chunks = read_reservation_export(source, import_format)
+
+    summary = {"format": import_format, "read": 0, "cancelled": 0, "invalid": 0}
+    mapped = []
+    for chunk in chunks:
+        rows, counts = map_reservations(chunk, import_format, consumable_cost)
+        summary["read"] += len(chunk)
+        summary["cancelled"] += counts["cancelled"]
+        summary["invalid"] += counts["invalid"]
+        mapped.append(rows)
+    rows = pd.concat(mapped, ignore_index=True) if mapped else pd.DataFrame(columns=BOOKINGS_COLUMNS)
+
+    # The same reservation twice in one file (modified bookings are re-exported)
+    keys = reservation_keys(rows)
+    rows = rows[~(keys["code"].notna() & keys["code"].duplicated()) & ~keys["stay"].duplicated()]
+
+    if dry_run:
+        existing = set(pd.unique(reservation_keys(bookings).to_numpy().ravel())) - {None}
+        new_rows = rows[~reservation_keys(rows).isin(existing).any(axis=1).to_numpy()]
+    else:
+        new_rows = journal.append_unique("Bookings", rows, reservation_keys)
+
+    summary["duplicates"] = int(summary["read"] - summary["cancelled"] - summary["invalid"] - len(new_rows))
+    summary["imported"] = len(new_rows)
+    summary["rows"] = new_rows.reset_index(drop=True)
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Import Airbnb / Booking.com reservation exports into the tracker")
+    parser.add_argument("exports", nargs="+", type=Path, help="Reservation export CSV file(s)")
+    parser.add_argument("--format", dest="import_format", choices=list(IMPORT_FORMATS), help="Export format (default: detect from the header)")
+    parser.add_argument("--file", type=Path, default=FILE_PATH, help="Path to the tracker workbook")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be imported without saving")
+    args = parser.parse_args(argv)
+
+    journal = TrackerJournal(args.file, args.file.parent / TRACKER_SNAPSHOT_DIR)
+    for export in args.exports:
+        try:
+            summary = import_reservations(export, journal, args.import_format, dry_run=args.dry_run)
+        except ValueError as e:
+            parser.error(f"{export}: {e}")
+        verb = "Would import" if args.dry_run else "Imported"
+        print(
+            f"{export.name} ({summary['format']}): {verb} {summary['imported']} of {summary['read']} rows "
+            f"({summary['duplicates']} duplicates, {summary['cancelled']} cancelled, "
+            f"{summary['invalid']} without dates or price)"
+        )
+    if not args.dry_run:
+        journal.compact()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3893 @@
+"""
+Data and metrics layer for the Lynx Apartment dashboard.
+
+Everything in this module is free of Streamlit calls so it can be imported by
+the Streamlit app as well as by background tools (local JSON API, batch jobs).
+"""
+import bisect
+import calendar
+import csv
+import difflib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+
+# 🔧 CONFIG
+FILE_PATH = Path("Lynx Apartment Tracker.xlsx")
+TRACKER_SNAPSHOT_DIR = Path("tracker_snapshot")  # one CSV per sheet, for diffable sync
+FX_RATES_FILE = Path("lynx_fx_rates.csv")  # MKD per EUR from each date on
+
+# ========= CONSTANTS & HELPERS =========
+
+FX_RATE = 61.51  # 1 euro = 61.51 denars; used when there is no FX rate table
+BOOKING_COM_COMMISSION = 0.12  # Booking.com keeps 12% of the price; Airbnb payouts are already net
+
+# ========== FX RATES ==========
+
+# Cached rate tables: path -> (file signature, version, rates)
+_fx_tables: dict[str, tuple] = {}
+
+
+def _fx_signature(path: Path) -> Optional[tuple]:
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_fx_rates(path: Path = FX_RATES_FILE) -> tuple[str, pd.DataFrame]:
+    """
+    (version, rates) of the FX rate table: one row per date from which a rate
+    applies, columns "Date" and "MKD per EUR", sorted by date. Re-read only
+    when the file changes. Without a table, FX_RATE applies to every date and
+    the version is "default".
+    """
+    key = str(Path(path).resolve())
+    signature = _fx_signature(path)
+    cached = _fx_tables.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2]
+
+    if signature is None:
+        version = "default"
+        rates = pd.DataFrame({"Date": [pd.Timestamp("1900-01-01")], "MKD per EUR": [FX_RATE]})
+    else:
+        content = Path(path).read_bytes()
+        version = hashlib.sha256(content).hexdigest()[:16]
+        rates = pd.read_csv(io.BytesIO(content), encoding="utf-8")
+        rates["Date"] = pd.to_datetime(rates["Date"], errors="coerce").dt.normalize()
+        rates["MKD per EUR"] = pd.to_numeric(rates["MKD per EUR"], errors="coerce")
+        rates = rates.dropna(subset=["Date", "MKD per EUR"]).sort_values("Date").reset_index(drop=True)
+        if rates.empty:
+            rates = pd.DataFrame({"Date": [pd.Timestamp("1900-01-01")], "MKD per EUR": [FX_RATE]})
+    _fx_tables[key] = (signature, version, rates)
+    return version, rates
+
+
+def write_fx_rates(rates: pd.DataFrame, path: Path = FX_RATES_FILE) -> None:
+    """Save the rate table sorted by date; rows without a date or a positive rate are dropped."""
+    rates = pd.DataFrame({
+        "Date": pd.to_datetime(rates["Date"], errors="coerce").dt.normalize(),
+        "MKD per EUR": pd.to_numeric(rates["MKD per EUR"], errors="coerce"),
+    })
+    rates = rates[rates["Date"].notna() & (rates["MKD per EUR"] > 0)]
+    rates = rates.sort_values("Date").drop_duplicates("Date", keep="last")
+    text = rates.to_csv(index=False, date_format="%Y-%m-%d", float_format="%.6g", lineterminator="\n")
+    _write_file_atomic(Path(path), text.encode("utf-8"))
+
+
+def fx_rates_version(path: Path = FX_RATES_FILE) -> str:
+    """Changes whenever the rate table does; "default" without one."""
+    return load_fx_rates(path)[0]
+
+
+@lru_cache(maxsize=64)
+def _fx_rates_for_days(path_key: str, version: str, days: tuple) -> tuple:
+    """As-of join of sorted unique days against one version of the rate table (cached per version)."""
+    rates = _fx_tables[path_key][2]
+    joined = pd.merge_asof(
+        pd.DataFrame({"Date": pd.to_datetime(list(days))}), rates, on="Date", direction="backward"
+    )
+    # Days before the first entry use the earliest known rate
+    return tuple(joined["MKD per EUR"].fillna(rates["MKD per EUR"].iloc[0]))
+
+
+def fx_rates_on(dates, path: Path = FX_RATES_FILE) -> pd.Series:
+    """
+    MKD per EUR in effect on each date: the latest table entry on or before
+    it. Missing dates get today's rate.
+    """
+    version, rates = load_fx_rates(path)
+    days = pd.to_datetime(pd.Series(dates), errors="coerce").dt.normalize()
+    days = days.fillna(pd.Timestamp.today().normalize())
+    unique_days = tuple(sorted(days.unique()))
+    lookup = dict(zip(unique_days, _fx_rates_for_days(str(Path(path).resolve()), version, unique_days)))
+    return days.map(lookup).astype(float)
+
+
+def mkd_to_eur(amounts: pd.Series, dates, path: Path = FX_RATES_FILE) -> pd.Series:
+    """Convert denar amounts to euros at the rate in effect on each amount's date."""
+    return pd.to_numeric(amounts, errors="coerce") / fx_rates_on(dates, path).to_numpy()
+
+
+# ========= METRIC DESCRIPTIONS & INFO =========
+# Central configuration for all metric descriptions, formulas, and insights
+METRIC_INFO = {
+    "Reservations": {
+        "description": "Counts bookings that contributed at least one booked night to the selected period.",
+        "formula": "Count of bookings with overlap_nights > 0",
+        "insight": "Shows booking volume. Includes bookings that started before the period but overlap with it. Higher numbers indicate more activity and potential revenue."
+    },
+    "Total nights": {
+        "description": "Counts only the nights that fall inside the selected period, even if the booking started earlier.",
+        "formula": "Sum of overlapping nights: max(check_in, period_start) to min(check_out, period_end)",
+        "insight": "Total occupancy nights within the period. Accurately reflects nights that contribute to the selected timeframe, regardless of when the booking started."
+    },
+    "Occupancy (%)": {
+        "description": "Percentage of available nights that were actually booked.",
+        "formula": "(Total Nights ÷ Nights Available) × 100",
+        "insight": "Key efficiency metric. Higher occupancy means better utilization of your property. Industry standard is typically 60-80%."
+    },
+    "Total revenue (€)": {
+        "description": "Total revenue from all stays in the selected period.",
+        "formula": "Sum of Revenue for stay (€) for all bookings",
+        "insight": "Primary income metric. Track trends over time to identify growth patterns."
+    },
+    "Net Profit (€)": {
+        "description": "Net profit after per-stay expenses and fixed monthly costs for the selected period.",
+        "formula": "Total Revenue - Per-Stay Expenses - Fixed Costs",
+        "insight": "True profitability indicator. Positive values mean the property is generating profit after all costs."
+    },
+    "Net Income Before Fixed Costs (€)": {
+        "description": "Net profit after per-stay expenses, before fixed monthly costs.",
+        "formula": "Total Revenue - Per-Stay Expenses",
+        "insight": "Shows variable profitability. Useful for comparing different platforms or periods without fixed cost allocation."
+    },
+    "Average price per night (€)": {
+        "description": "Average revenue per booked night (same as ADR).",
+        "formula": "Total Revenue ÷ Booked Nights",
+        "insight": "Pricing efficiency metric. Compare with market rates to optimize pricing strategy."
+    },
+    "Average stay (nights)": {
+        "description": "Average length of stay per reservation.",
+        "formula": "Total Nights ÷ Reservations",
+        "insight": "Guest behavior indicator. Longer stays reduce turnover costs and increase revenue per booking."
+    },
+    "Average Monthly Gross Income (€)": {
+        "description": "Calculates the average gross income per month for the selected period. Gross income is based on the RevenueForStay of each booking.",
+        "formula": "(Sum of RevenueForStay for all bookings in selected period) ÷ (Number of unique months within selected period)",
+        "insight": "Monthly gross income average. Helps understand revenue consistency and seasonal patterns. Higher values indicate better monthly performance."
+    },
+    "Average Monthly Net Income (€)": {
+        "description": "Calculates the average net income per month for the selected period. Net income accounts for per-stay expenses and fixed monthly costs.",
+        "formula": "(Sum of NetProfit for all bookings in selected period) ÷ (Number of unique months within selected period)",
+        "insight": "Monthly net income average. Shows true profitability per month after all costs. Essential for cash flow planning and financial forecasting."
+    },
+    "Profit Margin (%)": {
+        "description": "Percentage of revenue that becomes profit after all costs.",
+        "formula": "(Net Profit ÷ Total Revenue) × 100",
+        "insight": "Profitability efficiency. Higher margins mean better cost control and pricing power."
+    },
+    "Cost per Reservation (€)": {
+        "description": "Average variable cost per booking.",
+        "formula": "Total Per-Stay Expenses ÷ Reservations",
+        "insight": "Cost efficiency per booking. Lower values indicate better operational efficiency."
+    },
+    "Profit per Night (€)": {
+        "description": "Profitability per booked night.",
+        "formula": "Net Profit ÷ Total Nights",
+        "insight": "Nightly profitability. Compare across periods to track efficiency improvements."
+    },
+    "Profit per Stay (€)": {
+        "description": "Average profit per booking.",
+        "formula": "Net Profit ÷ Reservations",
+        "insight": "Booking-level profitability. Useful for understanding the value of each reservation."
+    },
+    "Net Income per Night Before Fixed (€)": {
+        "description": "Variable profit per night (before fixed costs).",
+        "formula": "Net Income Before Fixed Costs ÷ Total Nights",
+        "insight": "Shows nightly profitability excluding fixed costs. Useful for scaling decisions."
+    },
+    "Net Income per Stay Before Fixed (€)": {
+        "description": "Variable profit per booking (before fixed costs).",
+        "formula": "Net Income Before Fixed Costs ÷ Reservations",
+        "insight": "Booking-level profitability excluding fixed costs. Compare platforms on this metric."
+    },
+    "Cost Percentage of Revenue (%)": {
+        "description": "What portion of revenue goes to variable costs.",
+        "formula": "(Total Per-Stay Expenses ÷ Total Revenue) × 100",
+        "insight": "Cost structure indicator. Lower percentages mean more revenue retained after variable costs."
+    },
+    "Fixed Cost Percentage of Revenue (%)": {
+        "description": "What portion of revenue covers fixed costs.",
+        "formula": "(Total Fixed Costs ÷ Total Revenue) × 100",
+        "insight": "Fixed cost burden. Lower percentages indicate better revenue relative to fixed expenses."
+    },
+    "Revenue per Available Night (€)": {
+        "description": "Revenue per available night (RevPAR). Standard hotel metric showing revenue efficiency.",
+        "formula": "Total Revenue ÷ Nights Available (all days in period)",
+        "insight": "Industry-standard efficiency metric. Combines occupancy and pricing. Higher RevPAR means better overall performance."
+    },
+    "Average Daily Rate (€)": {
+        "description": "Average revenue per booked night (ADR). Standard hotel metric showing average price per night.",
+        "formula": "Total Revenue ÷ Booked Nights (only occupied nights)",
+        "insight": "Pricing power indicator. Compare with market rates. Higher ADR with good occupancy means strong pricing strategy."
+    },
+    "Airbnb revenue (€)": {
+        "description": "Total revenue coming from Airbnb bookings in the selected period.",
+        "formula": "Sum of Revenue for stay (€) where Platform = Airbnb",
+        "insight": "Platform-specific revenue. Track to understand which platform generates more income."
+    },
+    "Booking.com revenue (€)": {
+        "description": "Total revenue coming from Booking.com bookings in the selected period.",
+        "formula": "Sum of Revenue for stay (€) where Platform = Booking.com",
+        "insight": "Platform-specific revenue. Compare with Airbnb to optimize channel mix."
+    },
+    "Airbnb share of revenue (%)": {
+        "description": "Percentage of total revenue generated via Airbnb.",
+        "formula": "(Airbnb Revenue ÷ Total Revenue) × 100",
+        "insight": "Channel diversification indicator. Over-reliance on one platform increases risk."
+    },
+    "Booking.com share of revenue (%)": {
+        "description": "Percentage of total revenue generated via Booking.com.",
+        "formula": "(Booking.com Revenue ÷ Total Revenue) × 100",
+        "insight": "Channel diversification indicator. Balanced distribution reduces platform dependency risk."
+    },
+    "Airbnb nights": {
+        "description": "Total booked nights that came from Airbnb.",
+        "formula": "Sum of Nights where Platform = Airbnb",
+        "insight": "Platform occupancy volume. Compare with Booking.com to understand channel performance."
+    },
+    "Booking.com nights": {
+        "description": "Total booked nights that came from Booking.com.",
+        "formula": "Sum of Nights where Platform = Booking.com",
+        "insight": "Platform occupancy volume. Compare with Airbnb to optimize channel strategy."
+    },
+    "Airbnb Occupancy (%)": {
+        "description": "Occupancy rate specifically from Airbnb.",
+        "formula": "(Airbnb Nights ÷ Nights Available) × 100",
+        "insight": "Platform-specific efficiency. Compare with Booking.com occupancy to identify stronger channel."
+    },
+    "Booking.com Occupancy (%)": {
+        "description": "Occupancy rate specifically from Booking.com.",
+        "formula": "(Booking.com Nights ÷ Nights Available) × 100",
+        "insight": "Platform-specific efficiency. Compare with Airbnb occupancy to optimize channel mix."
+    },
+    "Airbnb RevPAR (€)": {
+        "description": "Revenue per available night from Airbnb.",
+        "formula": "Airbnb Revenue ÷ Nights Available (all days in period)",
+        "insight": "Platform efficiency metric. Higher values indicate better Airbnb performance relative to capacity."
+    },
+    "Booking.com RevPAR (€)": {
+        "description": "Revenue per available night from Booking.com.",
+        "formula": "Booking.com Revenue ÷ Nights Available (all days in period)",
+        "insight": "Platform efficiency metric. Compare with Airbnb RevPAR to optimize channel strategy."
+    },
+    "Airbnb ADR (€)": {
+        "description": "Average daily rate from Airbnb.",
+        "formula": "Airbnb Revenue ÷ Airbnb Booked Nights (only occupied nights)",
+        "insight": "Platform pricing power. Compare with Booking.com ADR to understand pricing differences."
+    },
+    "Booking.com ADR (€)": {
+        "description": "Average daily rate from Booking.com.",
+        "formula": "Booking.com Revenue ÷ Booking.com Booked Nights (only occupied nights)",
+        "insight": "Platform pricing power. Compare with Airbnb ADR to optimize pricing strategy."
+    },
+    "Platform Profitability Difference (€)": {
+        "description": "Difference in profit per booking between Airbnb and Booking.com.",
+        "formula": "Airbnb Profit per Reservation - Booking.com Profit per Reservation",
+        "insight": "Platform comparison metric. Positive values mean Airbnb is more profitable per booking."
+    },
+    "Average Stay Length by Platform (nights)": {
+        "description": "Average booking duration by platform.",
+        "formula": "Platform Nights ÷ Platform Reservations",
+        "insight": "Guest behavior by channel. Longer stays reduce turnover costs and increase revenue per booking."
+    },
+    "Platform Revenue per Reservation (€)": {
+        "description": "Average booking value by platform.",
+        "formula": "Platform Revenue ÷ Platform Reservations",
+        "insight": "Channel value comparison. Higher values indicate more valuable bookings from that platform."
+    },
+    "Platform Cost per Reservation (€)": {
+        "description": "Average variable cost per booking by platform.",
+        "formula": "Platform Per-Stay Expenses ÷ Platform Reservations",
+        "insight": "Cost efficiency by channel. Lower costs per booking mean better profitability from that platform."
+    },
+    "Platform Mix (%)": {
+        "description": "Share of bookings by platform.",
+        "formula": "(Platform Reservations ÷ Total Reservations) × 100",
+        "insight": "Channel diversification. Balanced mix reduces dependency risk on a single platform."
+    },
+    "Revenue Concentration Risk (%)": {
+        "description": "How dependent you are on one platform.",
+        "formula": "Max(Airbnb Revenue Share, Booking.com Revenue Share)",
+        "insight": "Risk indicator. Values above 80% indicate high dependency on one channel. Diversify to reduce risk."
+    },
+    "Average group size": {
+        "description": "Average number of guests per stay.",
+        "formula": "Total Guests ÷ Reservations",
+        "insight": "Guest behavior indicator. Larger groups may require more amenities but also generate more revenue."
+    },
+    "Average Revenue per Stay (€)": {
+        "description": "Average booking value.",
+        "formula": "Total Revenue ÷ Reservations",
+        "insight": "Booking value metric. Track trends to understand if average booking value is increasing."
+    },
+    "Average Cost per Stay (€)": {
+        "description": "Average variable cost per booking.",
+        "formula": "Total Per-Stay Expenses ÷ Reservations",
+        "insight": "Cost efficiency per booking. Lower values indicate better operational efficiency."
+    },
+    "Average Guests per Booking by Platform": {
+        "description": "Average group size by platform.",
+        "formula": "Platform Total Guests ÷ Platform Reservations",
+        "insight": "Guest behavior by channel. Different platforms may attract different group sizes."
+    },
+    "Parking Usage (%)": {
+        "description": "Percentage of bookings where parking was used.",
+        "formula": "(Bookings with Parking = Yes ÷ Total Reservations) × 100",
+        "insight": "Amenity utilization. High usage may indicate need for parking availability or pricing."
+    },
+    "Revenue per Guest (€)": {
+        "description": "Average revenue per person.",
+        "formula": "Total Revenue ÷ Total Guests",
+        "insight": "Per-guest value metric. Higher values indicate better revenue extraction per person."
+    },
+    "Baby Crib usage (%)": {
+        "description": "Percentage of bookings where the baby crib was used.",
+        "formula": "(Bookings with Baby Crib = Yes ÷ Total Reservations) × 100",
+        "insight": "Amenity utilization. Track to understand guest needs and optimize amenity offerings."
+    },
+    "Sofa Bed usage (%)": {
+        "description": "Percentage of bookings where the sofa bed was used.",
+        "formula": "(Bookings with Sofa Bed = Yes ÷ Total Reservations) × 100",
+        "insight": "Amenity utilization. High usage indicates capacity flexibility is valued by guests."
+    },
+    "Total Per-Stay Expenses (€)": {
+        "description": "Sum of all variable per-stay costs.",
+        "formula": "Sum of Transportation + Laundry + Consumables + Bank Fees",
+        "insight": "Total variable costs. Track trends to identify cost reduction opportunities."
+    },
+    "Total Fixed Costs (€)": {
+        "description": "Sum of all fixed monthly costs for the selected period.",
+        "formula": "Sum of Monthly Fixed Costs for selected period",
+        "insight": "Fixed cost burden. These costs must be covered regardless of occupancy."
+    },
+    "Average Cost per Night (€)": {
+        "description": "Variable cost per booked night.",
+        "formula": "Total Per-Stay Expenses ÷ Total Nights",
+        "insight": "Nightly cost efficiency. Lower values mean better cost control per night."
+    },
+    "Fixed Cost per Night (€)": {
+        "description": "Fixed cost allocation per booked night.",
+        "formula": "Total Fixed Costs ÷ Total Nights",
+        "insight": "Fixed cost burden per night. Higher occupancy spreads fixed costs across more nights."
+    },
+    "Fixed Cost per Reservation (€)": {
+        "description": "Fixed cost allocation per booking.",
+        "formula": "Total Fixed Costs ÷ Reservations",
+        "insight": "Fixed cost burden per booking. More bookings spread fixed costs across more reservations."
+    },
+    "Variable vs Fixed Cost Ratio": {
+        "description": "Ratio of variable to fixed costs.",
+        "formula": "Total Per-Stay Expenses ÷ Total Fixed Costs",
+        "insight": "Cost structure indicator. Higher ratios mean more scalable cost structure (more variable, less fixed)."
+    },
+    "Break-even Occupancy (%)": {
+        "description": "Minimum occupancy needed to cover fixed costs.",
+        "formula": "(Total Fixed Costs ÷ (ADR × Nights Available)) × 100",
+        "insight": "Critical threshold. Below this occupancy, you're losing money on fixed costs."
+    },
+    "Break-even Nights": {
+        "description": "Minimum nights needed to cover fixed costs.",
+        "formula": "Total Fixed Costs ÷ ADR",
+        "insight": "Critical threshold. Below this number of nights, fixed costs aren't covered."
+    },
+    "Best month by revenue": {
+        "description": "Month and year with the highest total revenue.",
+        "formula": "Month with maximum Total Revenue",
+        "insight": "Peak performance indicator. Identify seasonal patterns and replicate successful strategies."
+    },
+    "Best Month by Profit (€)": {
+        "description": "Month and year with the highest profit.",
+        "formula": "Month with maximum Net Profit",
+        "insight": "Peak profitability indicator. Analyze what made this month successful."
+    },
+    "Worst Month by Revenue (€)": {
+        "description": "Month and year with the lowest revenue.",
+        "formula": "Month with minimum Total Revenue",
+        "insight": "Low performance indicator. Identify causes and develop strategies to improve."
+    },
+    "Projected next-year revenue": {
+        "description": "Simple projection: average monthly revenue × 12.",
+        "formula": "Average Monthly Revenue × 12",
+        "insight": "Basic revenue forecast. Use for planning and goal setting."
+    },
+    "Projected Next-Year Revenue (Weighted)": {
+        "description": "Weighted projection favoring recent performance.",
+        "formula": "(Recent 6 Months Avg × 0.6 + Older Months Avg × 0.4) × 12",
+        "insight": "More accurate forecast. Recent trends weighted more heavily for better prediction."
+    },
+    "Projected Next-Year Profit (€)": {
+        "description": "Forecast profit based on weighted revenue projection.",
+        "formula": "Projected Weighted Revenue × (Average Profit Margin ÷ 100)",
+        "insight": "Profit forecast. Use for financial planning and investment decisions."
+    },
+    "Month-over-Month Revenue Change (%)": {
+        "description": "Percentage change in revenue from previous month.",
+        "formula": "((Current Month Revenue - Previous Month Revenue) ÷ Previous Month Revenue) × 100",
+        "insight": "Short-term trend indicator. Positive values show growth momentum."
+    },
+    "Year-over-Year Revenue Change (%)": {
+        "description": "Percentage change in revenue compared to same period last year.",
+        "formula": "((Current Year Revenue - Previous Year Revenue) ÷ Previous Year Revenue) × 100",
+        "insight": "Long-term growth indicator. Accounts for seasonality by comparing same periods."
+    },
+    "3-Month Moving Average Revenue (€)": {
+        "description": "Average revenue over the last 3 months.",
+        "formula": "Sum of Last 3 Months Revenue ÷ 3",
+        "insight": "Smoothed trend indicator. Reduces month-to-month volatility to show underlying trends."
+    },
+    "Seasonal Index": {
+        "description": "Average seasonal index across all months.",
+        "formula": "Average of (Monthly Revenue ÷ Annual Average Revenue) × 100",
+        "insight": "Seasonality indicator. Values above 100 indicate above-average months, below 100 indicate below-average."
+    },
+    "Transportation Cost per Stay (€)": {
+        "description": "Average transportation cost per booking.",
+        "formula": "Total Transportation Cost ÷ Reservations",
+        "insight": "Transportation efficiency. Track to identify cost reduction opportunities."
+    },
+    "Laundry Cost per Stay (€)": {
+        "description": "Average laundry cost per booking.",
+        "formula": "Total Laundry Cost ÷ Reservations",
+        "insight": "Laundry efficiency. Monitor for cost control and optimization opportunities."
+    },
+    "Consumable Cost per Stay (€)": {
+        "description": "Average consumable cost per booking.",
+        "formula": "Total Consumable Cost ÷ Reservations",
+        "insight": "Consumable efficiency. Track to optimize supply costs and guest experience balance."
+    },
+    "Bank Fees per Stay (€)": {
+        "description": "Average bank fees per booking.",
+        "formula": "Total Bank Fees ÷ Reservations",
+        "insight": "Payment processing efficiency. Consider alternative payment methods if fees are high."
+    },
+    "Top Countries by Bookings": {
+        "description": "Top 5 countries by number of bookings.",
+        "formula": "Top 5 countries sorted by reservation count",
+        "insight": "Guest origin analysis. Understand your market and tailor marketing to top countries."
+    },
+    "Top Countries by Revenue": {
+        "description": "Top 5 countries by total revenue.",
+        "formula": "Top 5 countries sorted by total revenue",
+        "insight": "Revenue source analysis. Focus marketing efforts on high-value country markets."
+    }
+}
+
+
+def recalc_monthly_costs(df: pd.DataFrame, fx_path: Path = FX_RATES_FILE) -> pd.DataFrame:
+    """Recalculate euro columns (at each month's FX rate) and Total fixed costs from denar values."""
+    pairs = [
+        ("Electricity (den)", "Electricity (€)"),
+        ("Water (den)", "Water (€)"),
+        ("Property Management Fee (den)", "Property Management Fee (€)"),
+    ]
+
+    if {"Year", "MONTH"} <= set(df.columns):
+        month_start = pd.to_datetime(
+            pd.DataFrame({
+                "year": pd.to_numeric(df["Year"], errors="coerce"),
+                "month": pd.to_numeric(df["MONTH"], errors="coerce"),
+                "day": 1,
+            }),
+            errors="coerce",
+        )
+    else:
+        month_start = pd.Series(pd.NaT, index=df.index)
+
+    for den_col, eur_col in pairs:
+        if den_col in df.columns and eur_col in df.columns:
+            df[den_col] = pd.to_numeric(df[den_col], errors="coerce").fillna(0)
+            df[eur_col] = mkd_to_eur(df[den_col], month_start, fx_path)
+
+    euro_cols = [c for c in df.columns if "€" in c and c != "Total Fixed Costs (€)"]
+    for c in euro_cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+
+    if "Total Fixed Costs (€)" in df.columns:
+        df["Total Fixed Costs (€)"] = df[euro_cols].sum(axis=1)
+
+    return df
+
+
+def recalc_toiletries(df: pd.DataFrame) -> pd.DataFrame:
+    """Recalculate Total (MKD) = Unit Price (MKD) * Units per Stay (canonical columns, see resolve_schema)."""
+    df["Unit Price (MKD)"] = pd.to_numeric(df["Unit Price (MKD)"], errors="coerce").fillna(0)
+    df["Units per Stay"] = pd.to_numeric(df["Units per Stay"], errors="coerce").fillna(0)
+    df["Total (MKD)"] = df["Unit Price (MKD)"] * df["Units per Stay"]
+    return df
+
+
+def recalc_booking_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """Recalculate Per-stay expenses (€) and Net Income Before Fixed Costs (€) from the cost columns."""
+    required_cost_cols = BOOKING_COST_COLUMNS
+    if all(col in df.columns for col in required_cost_cols) and "Revenue for stay (€)" in df.columns:
+        # Fill NaN with 0 for cost columns
+        for col in required_cost_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df["Revenue for stay (€)"] = pd.to_numeric(df["Revenue for stay (€)"], errors='coerce').fillna(0)
+
+        df["Per-stay expenses (€)"] = (
+            df["Transportation Cost (€)"] +
+            df["Laundry Cost (€)"] +
+            df["Consumable Cost (€)"] +
+            df["Bank Fees (€)"]
+        ).round(2)
+        df["Net Income Before Fixed Costs (€)"] = (
+            df["Revenue for stay (€)"] - df["Per-stay expenses (€)"]
+        ).round(2)
+    return df
+
+
+def get_current_consumables_totals(consumables_df: pd.DataFrame) -> tuple[float, float]:
+    """
+    Calculate current consumables totals from the consumables DataFrame.
+    
+    Args:
+        consumables_df: DataFrame with a "Total (MKD)" column
+    
+    Returns:
+        tuple: (total_mkd, total_eur) - Total cost per stay in MKD, and in EUR at today's rate
+    """
+    total_mkd = float(pd.to_numeric(consumables_df["Total (MKD)"], errors="coerce").fillna(0).sum())
+    total_eur = float(mkd_to_eur(pd.Series([total_mkd]), [pd.Timestamp.today()]).iloc[0]) if total_mkd > 0 else 0.0
+    return total_mkd, total_eur
+
+
+def clean_bookings(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop fully empty rows and rows without check-in date."""
+    df = df.dropna(how="all")
+    if "Check-in date" in df.columns:
+        df = df[df["Check-in date"].notna()]
+    return df
+
+
+def sort_bookings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort bookings by Check-in date ascending and reset the index.
+    This keeps the DataFrame in strict chronological order.
+    """
+    if "Check-in date" in df.columns:
+        df = df.sort_values("Check-in date", ascending=True).reset_index(drop=True)
+    return df
+
+
+def compute_nights_available(
+    bookings_df: pd.DataFrame, 
+    selected_year: int | None = None,
+    period_type: str | None = None,
+    month: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> int:
+    """
+    Calculate nights available based on period type.
+    
+    Args:
+        bookings_df: Bookings DataFrame (used for date range fallback)
+        selected_year: Selected year (for year/month_year periods)
+        period_type: Type of period - "month_year", "year", "date_range", or None
+        month: Selected month (1-12) for month_year period
+        start_date: Start date for date_range period
+        end_date: End date for date_range period
+    
+    Returns:
+        Number of nights available in the selected period
+    """
+    bookings_df = clean_bookings(bookings_df.copy())
+
+    # For monthly reports: calculate days in that specific month
+    if period_type == "month_year" and selected_year is not None and month is not None:
+        # Get number of days in the specific month/year
+        days_in_month = calendar.monthrange(selected_year, month)[1]
+        return days_in_month
+    
+    # For yearly reports: calculate days in that year
+    elif period_type == "year" and selected_year is not None:
+        # Full calendar year availability
+        return 366 if calendar.isleap(selected_year) else 365
+    
+    # For date range: calculate days in the date range
+    elif period_type == "date_range" and start_date is not None and end_date is not None:
+        start_dt = pd.to_datetime(start_date)
+        end_dt = pd.to_datetime(end_date)
+        # Calculate days between start and end (inclusive)
+        days = (end_dt - start_dt).days + 1
+        return max(days, 0)
+    
+    # Legacy behavior: if selected_year is given but no period_type, assume year
+    elif selected_year is not None:
+        # Full calendar year availability
+        return 366 if calendar.isleap(selected_year) else 365
+
+    # Fallback: if no period info, use date range from bookings
+    if bookings_df.empty or "Check-in date" not in bookings_df.columns or "Check-out date" not in bookings_df.columns:
+        return 0
+
+    start = bookings_df["Check-in date"].min()
+    end = bookings_df["Check-out date"].max()
+    if pd.isna(start) or pd.isna(end):
+        return 0
+
+    return max((end - start).days, 0)
+
+
+# ========== CHART CONFIGURATION ==========
+
+# Chart layout options
+CHART_LAYOUTS = [
+    "Line",
+    "Bar",
+    "Stacked bar",
+    "Area",
+    "Platform comparison",
+    # Extended layouts for custom graphs
+    "Pie",
+    "Donut",
+    "Horizontal bar",
+    "Smooth area",
+    "Scatter",
+    "Multi-series line",
+]
+
+# Chart metric keys
+CHART_METRIC_KEYS = [
+    "revenue_by_month",
+    "nights_by_month",
+    "reservations_by_month",
+    "adr_by_month",
+    "occupancy_by_month",
+]
+
+# Chart metric labels (for display)
+CHART_METRIC_LABELS = {
+    "revenue_by_month": "Revenue by month",
+    "nights_by_month": "Nights by month",
+    "reservations_by_month": "Reservations by month",
+    "adr_by_month": "ADR by month",
+    "occupancy_by_month": "Occupancy by month",
+}
+
+# Chart metric units (for Y-axis labels)
+CHART_METRIC_UNITS = {
+    "revenue_by_month": "Revenue (€)",
+    "nights_by_month": "Nights",
+    "reservations_by_month": "Reservations",
+    "adr_by_month": "ADR (€)",
+    "occupancy_by_month": "Occupancy (%)",
+}
+
+
+# ========== SCHEMA ==========
+
+# Per-stay cost columns of the Bookings sheet, in display order
+BOOKING_COST_COLUMNS = ["Transportation Cost (€)", "Laundry Cost (€)", "Consumable Cost (€)", "Bank Fees (€)"]
+
+# Canonical column -> legacy names it may carry in older workbooks. When a
+# sheet has several of them, the canonical column wins and the aliases fill
+# its gaps in the order listed.
+SCHEMA_ALIASES = {
+    "Bookings": {
+        "Nights": ["Nights (auto)"],
+        "Check-in Month": ["Month (number, auto)"],
+        "Check-in Year": ["Year (auto)"],
+        "Net Income Before Fixed Costs (€)": ["Net income before fixed (auto)"],
+        "Guest Name": ["Booker name"],
+        "Sofa Bed": ["Sofabed"],
+        "Transportation Cost (€)": ["Transport (to/from) (€)", "Transportation Cost", "Transport (to/from)"],
+        "Laundry Cost (€)": ["Laundry (€)", "Laundry Cost", "Laundry"],
+        "Consumable Cost (€)": [
+            "Guest Supplies Cost (€)", "Toiletries (€)", "Consumable Cost", "Guest Supplies Cost", "Toiletries",
+        ],
+        "Bank Fees (€)": ["Bank Fees"],
+    },
+    "Monthly_Costs": {
+        "Property Management Fee (den)": ["Building management (den)"],
+        "Property Management Fee (€)": ["Building management (€)"],
+        "Total Fixed Costs (€)": ["Total fixed costs (auto)"],
+    },
+    "Toiletries": {
+        "Item": ["Unnamed: 0"],
+        "Unit Price (MKD)": ["Piece"],
+        "Units per Stay": ["Quantity per stay"],
+        "Total (MKD)": ["Total per stay"],
+    },
+}
+
+# Columns the calculations read by name; added empty when a sheet lacks them
+SCHEMA_REQUIRED = {
+    "Bookings": BOOKING_COST_COLUMNS,
+    "Monthly_Costs": [],
+    "Toiletries": ["Item", "Unit Price (MKD)", "Units per Stay", "Total (MKD)"],
+}
+
+# Legacy column names found by read_tracker, per workbook and sheet
+_legacy_columns_seen: dict[str, dict[str, dict[str, str]]] = {}
+
+
+@lru_cache(maxsize=64)
+def _schema_plan(sheet: str, columns: tuple) -> tuple[tuple, tuple]:
+    """
+    How to canonicalize one header row: (canonical, sources present, anchor
+    column) for every canonical column with a legacy alias present, and the
+    required columns that are missing altogether. Cached, so reloading a
+    workbook with the same headers skips the probing.
+    """
+    present = set(columns)
+    merges = []
+    for canonical, aliases in SCHEMA_ALIASES.get(sheet, {}).items():
+        found = [alias for alias in aliases if alias in present]
+        if found:
+            sources = tuple(([canonical] if canonical in present else []) + found)
+            anchor = min(sources, key=columns.index)  # the merged column takes the leftmost one's place
+            merges.append((canonical, sources, anchor))
+    resolved = present | {merge[0] for merge in merges}
+    missing = tuple(column for column in SCHEMA_REQUIRED.get(sheet, []) if column not in resolved)
+    return tuple(merges), missing
+
+
+def resolve_schema(sheet: str, df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    Give a sheet its canonical column names: legacy aliases are merged into
+    the canonical column and dropped, and missing required columns are added
+    empty. Returns (frame, {legacy name: canonical name} for aliases seen).
+    """
+    merges, missing = _schema_plan(sheet, tuple(str(column) for column in df.columns))
+    legacy = {}
+    if merges:
+        df = df.copy()
+        for canonical, sources, anchor in merges:
+            values = df[sources[0]]
+            for source in sources[1:]:
+                values = values.combine_first(df[source])
+            df = df.drop(columns=[source for source in sources if source != anchor])
+            df = df.rename(columns={anchor: canonical})
+            df[canonical] = values
+            legacy.update({source: canonical for source in sources if source != canonical})
+    for column in missing:
+        df[column] = pd.Series(dtype=float, index=df.index)
+    return df, legacy
+
+
+def legacy_columns_seen(file_path: Path = FILE_PATH) -> dict[str, dict[str, str]]:
+    """{sheet: {legacy name: canonical name}} found when the workbook was last read."""
+    return _legacy_columns_seen.get(str(Path(file_path).resolve()), {})
+
+
+# ========== DATA LAYER ==========
+
+def read_tracker(file_path: Path):
+    """Read Bookings, Monthly_Costs and Toiletries from the tracker workbook and normalize them."""
+    bookings = pd.read_excel(file_path, sheet_name="Bookings")
+    monthly_costs = pd.read_excel(file_path, sheet_name="Monthly_Costs")
+    toiletries = pd.read_excel(file_path, sheet_name="Toiletries")
+
+    # Canonical column names; the aliases found are remembered for legacy_columns_seen()
+    bookings, legacy_bookings = resolve_schema("Bookings", bookings)
+    monthly_costs, legacy_costs = resolve_schema("Monthly_Costs", monthly_costs)
+    toiletries, legacy_toiletries = resolve_schema("Toiletries", toiletries)
+    _legacy_columns_seen[str(Path(file_path).resolve())] = {
+        sheet: legacy
+        for sheet, legacy in zip(TRACKER_SHEETS, (legacy_bookings, legacy_costs, legacy_toiletries))
+        if legacy
+    }
+
+    # Clean bookings
+    bookings = clean_bookings(bookings)
+
+    # Ensure correct dtypes
+    if "Check-in date" in bookings.columns:
+        bookings["Check-in date"] = pd.to_datetime(bookings["Check-in date"])
+    if "Check-out date" in bookings.columns:
+        bookings["Check-out date"] = pd.to_datetime(bookings["Check-out date"])
+
+    # Nights
+    if "Nights" in bookings.columns:
+        missing_nights = bookings["Nights"].isna()
+        bookings.loc[missing_nights, "Nights"] = (
+            bookings.loc[missing_nights, "Check-out date"]
+            - bookings.loc[missing_nights, "Check-in date"]
+        ).dt.days
+
+    # Month / Year
+    if "Check-in Month" in bookings.columns:
+        missing_month = bookings["Check-in Month"].isna()
+        bookings.loc[missing_month, "Check-in Month"] = (
+            bookings.loc[missing_month, "Check-in date"].dt.month
+        )
+    if "Check-in Year" in bookings.columns:
+        missing_year = bookings["Check-in Year"].isna()
+        bookings.loc[missing_year, "Check-in Year"] = (
+            bookings.loc[missing_year, "Check-in date"].dt.year
+        )
+
+    # Net income before fixed
+    if "Net Income Before Fixed Costs (€)" in bookings.columns:
+        mask = bookings["Net Income Before Fixed Costs (€)"].isna()
+        bookings.loc[mask, "Net Income Before Fixed Costs (€)"] = (
+            bookings["Revenue for stay (€)"].fillna(0)
+            - bookings["Per-stay expenses (€)"].fillna(0)
+        )
+
+    # Always keep bookings sorted chronologically by Check-in date
+    bookings = sort_bookings(bookings)
+
+    toiletries = recalc_toiletries(toiletries)
+
+    # Recalculate monthly costs totals
+    monthly_costs = recalc_monthly_costs(monthly_costs)
+
+    return bookings, monthly_costs, toiletries
+
+
+def get_year_range(year: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Get the date range for an entire year.
+    
+    Args:
+        year: Year (e.g., 2025)
+    
+    Returns:
+        tuple: (start_date, end_date) for the year
+    """
+    start = pd.Timestamp(year=year, month=1, day=1)
+    end = pd.Timestamp(year=year, month=12, day=31)
+    return start, end
+
+
+def get_month_range(year: int, month: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Get the date range for a specific month in a year.
+    
+    Args:
+        year: Year (e.g., 2025)
+        month: Month (1-12)
+    
+    Returns:
+        tuple: (start_date, end_date) for the month
+    """
+    start = pd.Timestamp(year=year, month=month, day=1)
+    # Get last day of month
+    last_day = calendar.monthrange(year, month)[1]
+    end = pd.Timestamp(year=year, month=month, day=last_day)
+    return start, end
+
+
+def go_to_previous_month(year: int, month: int) -> tuple[int, int]:
+    """
+    Navigate to the previous month.
+    Handles year rollover (January -> December of previous year).
+    
+    Args:
+        year: Current year
+        month: Current month (1-12)
+    
+    Returns:
+        tuple: (new_year, new_month)
+    """
+    if month == 1:
+        return year - 1, 12
+    else:
+        return year, month - 1
+
+
+def go_to_next_month(year: int, month: int) -> tuple[int, int]:
+    """
+    Navigate to the next month.
+    Handles year rollover (December -> January of next year).
+    
+    Args:
+        year: Current year
+        month: Current month (1-12)
+    
+    Returns:
+        tuple: (new_year, new_month)
+    """
+    if month == 12:
+        return year + 1, 1
+    else:
+        return year, month + 1
+
+
+def get_night_dates(check_in, check_out):
+    """
+    Generate a list of all night dates for a booking.
+    Nights are based on check-in dates (check-out date is exclusive).
+    
+    Args:
+        check_in: Check-in date (datetime, Timestamp, or None)
+        check_out: Check-out date (datetime, Timestamp, or None)
+    
+    Returns:
+        list: List of date objects representing each night of the stay
+    """
+    if pd.isna(check_in) or pd.isna(check_out):
+        return []
+    
+    check_in_dt = pd.to_datetime(check_in).normalize()
+    check_out_dt = pd.to_datetime(check_out).normalize()
+    
+    if check_out_dt <= check_in_dt:
+        return []
+    
+    # Generate all night dates from check-in to check-out (exclusive)
+    night_dates = []
+    current_date = check_in_dt
+    while current_date < check_out_dt:
+        night_dates.append(current_date.date())
+        current_date += pd.Timedelta(days=1)
+    
+    return night_dates
+
+
+def count_nights_in_period(check_in, check_out, period_start, period_end):
+    """
+    Count the number of nights that fall within the selected period.
+    Uses explicit per-night iteration to handle edge cases correctly.
+    
+    Args:
+        check_in: Check-in date (datetime, Timestamp, or None)
+        check_out: Check-out date (datetime, Timestamp, or None)
+        period_start: Start date of the selected period (datetime, Timestamp, or None)
+        period_end: End date of the selected period (datetime, Timestamp, or None)
+    
+    Returns:
+        int: Number of nights within the period (0 if no overlap)
+    """
+    if pd.isna(check_in) or pd.isna(check_out) or period_start is None or period_end is None:
+        return 0
+    
+    # Get all night dates for this booking
+    night_dates = get_night_dates(check_in, check_out)
+    if not night_dates:
+        return 0
+    
+    # Convert period boundaries to date objects for comparison
+    period_start_dt = pd.to_datetime(period_start).date()
+    period_end_dt = pd.to_datetime(period_end).date()
+    
+    # Count nights that fall within the period
+    nights_in_period = 0
+    for night_date in night_dates:
+        if period_start_dt <= night_date <= period_end_dt:
+            nights_in_period += 1
+    
+    return nights_in_period
+
+
+def calculate_overlap_nights(check_in, check_out, period_start, period_end):
+    """
+    Calculate the number of nights that overlap between a booking and a period.
+    This is a wrapper function that uses the per-night counting logic.
+    
+    Args:
+        check_in: Check-in date (datetime, Timestamp, or None)
+        check_out: Check-out date (datetime, Timestamp, or None)
+        period_start: Start date of the selected period (datetime, Timestamp, or None)
+        period_end: End date of the selected period (datetime, Timestamp, or None)
+    
+    Returns:
+        int: Number of overlapping nights (0 if no overlap)
+    """
+    return count_nights_in_period(check_in, check_out, period_start, period_end)
+
+
+def calculate_revenue_per_night(booking_row):
+    """
+    Calculate revenue per night for a booking.
+    
+    Args:
+        booking_row: A pandas Series representing a booking row
+    
+    Returns:
+        float: Revenue per night (0 if invalid)
+    """
+    if pd.isna(booking_row.get("Check-in date")) or pd.isna(booking_row.get("Check-out date")):
+        return 0.0
+    
+    check_in = pd.to_datetime(booking_row.get("Check-in date"))
+    check_out = pd.to_datetime(booking_row.get("Check-out date"))
+    
+    if check_out <= check_in:
+        return 0.0
+    
+    total_nights = (check_out - check_in).days
+    if total_nights == 0:
+        return 0.0
+    
+    revenue_for_stay = float(booking_row.get("Revenue for stay (€)", 0) or 0)
+    revenue_per_night = revenue_for_stay / total_nights
+    
+    return revenue_per_night
+
+
+def calculate_net_profit_per_night(booking_row, fixed_cost_share: float = 0.0):
+    """
+    Calculate net profit per night for a booking.
+    
+    Args:
+        booking_row: A pandas Series representing a booking row
+        fixed_cost_share: Fixed cost allocation for this booking (default: 0.0)
+    
+    Returns:
+        float: Net profit per night (0 if invalid)
+    """
+    if pd.isna(booking_row.get("Check-in date")) or pd.isna(booking_row.get("Check-out date")):
+        return 0.0
+    
+    check_in = pd.to_datetime(booking_row.get("Check-in date"))
+    check_out = pd.to_datetime(booking_row.get("Check-out date"))
+    
+    if check_out <= check_in:
+        return 0.0
+    
+    total_nights = (check_out - check_in).days
+    if total_nights == 0:
+        return 0.0
+    
+    # Calculate total net profit for the booking
+    revenue_for_stay = float(booking_row.get("Revenue for stay (€)", 0) or 0)
+    per_stay_expenses = float(booking_row.get("Per-stay expenses (€)", 0) or 0)
+    
+    # Net profit = Revenue - Per-stay expenses - Fixed cost share
+    total_net_profit = revenue_for_stay - per_stay_expenses - fixed_cost_share
+    net_profit_per_night = total_net_profit / total_nights
+    
+    return net_profit_per_night
+
+
+def calculate_distributed_revenue(booking_row, nights_in_period: int):
+    """
+    Calculate the revenue contribution for a booking based on nights in period.
+    
+    Args:
+        booking_row: A pandas Series representing a booking row
+        nights_in_period: Number of nights that fall within the selected period
+    
+    Returns:
+        float: Distributed revenue for the period
+    """
+    if nights_in_period <= 0:
+        return 0.0
+    
+    revenue_per_night = calculate_revenue_per_night(booking_row)
+    distributed_revenue = revenue_per_night * nights_in_period
+    
+    return distributed_revenue
+
+
+def calculate_distributed_net_profit(booking_row, nights_in_period: int, fixed_cost_share: float = 0.0):
+    """
+    Calculate the net profit contribution for a booking based on nights in period.
+    
+    Args:
+        booking_row: A pandas Series representing a booking row
+        nights_in_period: Number of nights that fall within the selected period
+        fixed_cost_share: Fixed cost allocation for this booking (default: 0.0)
+    
+    Returns:
+        float: Distributed net profit for the period
+    """
+    if nights_in_period <= 0:
+        return 0.0
+    
+    net_profit_per_night = calculate_net_profit_per_night(booking_row, fixed_cost_share)
+    distributed_net_profit = net_profit_per_night * nights_in_period
+    
+    return distributed_net_profit
+
+
+def compute_metrics(bookings: pd.DataFrame,
+                    monthly_costs: pd.DataFrame,
+                    view_mode: str,
+                    period_start: Optional[datetime] = None,
+                    period_end: Optional[datetime] = None,
+                    use_overlap_logic: bool = False):
+    """
+    view_mode: 'Overall', 'Airbnb', 'Booking.com'
+    period_start: Start date of the selected period (for overlap calculation)
+    period_end: End date of the selected period (for overlap calculation)
+    use_overlap_logic: If True, calculate nights and reservations using overlap logic
+    """
+    df = clean_bookings(bookings.copy())
+
+    # Normalize platform labels
+    if "Platform" in df.columns:
+        df["Platform"] = df["Platform"].replace({"Booking": "Booking.com"})
+
+    # Filter by platform
+    if view_mode == "Airbnb":
+        df = df[df["Platform"] == "Airbnb"]
+    elif view_mode == "Booking.com":
+        df = df[df["Platform"] == "Booking.com"]
+
+    # Calculate reservations and nights using overlap logic if requested
+    use_distributed_calculation = use_overlap_logic and period_start is not None and period_end is not None
+    
+    if use_distributed_calculation and "Check-in date" in df.columns and "Check-out date" in df.columns:
+        # Calculate overlap nights for each booking
+        overlap_nights = df.apply(
+            lambda row: calculate_overlap_nights(
+                row.get("Check-in date"),
+                row.get("Check-out date"),
+                period_start,
+                period_end
+            ),
+            axis=1
+        )
+        total_nights = int(overlap_nights.sum())
+        # Count reservations that have at least one overlapping night
+        reservations = int((overlap_nights > 0).sum())
+        
+        # Calculate distributed revenue and profit per night
+        distributed_revenue_series = df.apply(
+            lambda row: calculate_distributed_revenue(row, overlap_nights[row.name]),
+            axis=1
+        )
+        # Ensure we're summing numeric values only (convert to float to avoid datetime issues)
+        # Convert to Series first, then to numeric, then fillna and sum
+        if len(distributed_revenue_series) > 0:
+            distributed_revenue = pd.Series(pd.to_numeric(distributed_revenue_series.values, errors='coerce')).fillna(0).sum()
+        else:
+            distributed_revenue = 0.0
+        
+        # Calculate distributed per-stay expenses (proportional to nights)
+        distributed_per_stay_series = df.apply(
+            lambda row: (
+                (float(row.get("Per-stay expenses (€)", 0) or 0) / 
+                 max((pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days, 1))
+                * overlap_nights[row.name]
+            ) if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0.0,
+            axis=1
+        )
+        # Ensure we're summing numeric values only (convert to float to avoid datetime issues)
+        # Convert to Series first, then to numeric, then fillna and sum
+        if len(distributed_per_stay_series) > 0:
+            distributed_per_stay = pd.Series(pd.to_numeric(distributed_per_stay_series.values, errors='coerce')).fillna(0).sum()
+        else:
+            distributed_per_stay = 0.0
+        
+        total_revenue = float(distributed_revenue)
+        total_per_stay = float(distributed_per_stay)
+        net_before_fixed = total_revenue - total_per_stay
+    else:
+        # Original logic: count all filtered bookings (for "All" selection or when dates not available)
+        reservations = len(df)
+        total_nights = df["Nights"].fillna(0).sum() if "Nights" in df.columns else 0
+        total_revenue = df["Revenue for stay (€)"].fillna(0).sum() if "Revenue for stay (€)" in df.columns else 0
+        total_per_stay = df["Per-stay expenses (€)"].fillna(0).sum() if "Per-stay expenses (€)" in df.columns else 0
+
+        if "Net Income Before Fixed Costs (€)" in df.columns:
+            net_before_fixed = df["Net Income Before Fixed Costs (€)"].fillna(
+                df["Revenue for stay (€)"].fillna(0) - df["Per-stay expenses (€)"].fillna(0)
+            ).sum()
+        else:
+            net_before_fixed = total_revenue - total_per_stay
+
+    # Only for Overall: use fixed costs
+    if view_mode == "Overall" and "Total Fixed Costs (€)" in monthly_costs.columns:
+        total_fixed = monthly_costs["Total Fixed Costs (€)"].fillna(0).sum()
+        
+        # For distributed calculation, allocate fixed costs proportionally based on nights
+        if use_distributed_calculation and total_nights > 0:
+            # Calculate total nights across all bookings (for fixed cost allocation)
+            total_booking_nights = df.apply(
+                lambda row: (
+                    (pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days
+                    if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0
+                ),
+                axis=1
+            ).sum()
+            
+            if total_booking_nights > 0:
+                # Allocate fixed costs proportionally based on nights in period
+                total_fixed = total_fixed * (total_nights / total_booking_nights)
+    else:
+        total_fixed = None
+
+    avg_price_per_night = total_revenue / total_nights if total_nights > 0 else 0
+
+    metrics = {
+        "Reservations": int(reservations),
+        "Total nights": int(total_nights),  # Nights should be whole numbers
+        "Total revenue (€)": float(total_revenue),
+        "Total Per-Stay Expenses (€)": float(total_per_stay),
+        "Net Income Before Fixed Costs (€)": float(net_before_fixed),
+        "Average price per night (€)": float(avg_price_per_night),
+    }
+
+    if total_fixed is not None:
+        metrics["Total Fixed Costs (€)"] = float(total_fixed)
+        metrics["Net Profit (€)"] = float(net_before_fixed - total_fixed)
+
+    return metrics
+
+
+def monthly_revenue_by_platform(bookings: pd.DataFrame):
+    df = clean_bookings(bookings.copy())
+
+    # Normalize platform labels
+    df["Platform"] = df["Platform"].replace({"Booking": "Booking.com"})
+
+    # Make sure revenue is numeric
+    df["Revenue for stay (€)"] = pd.to_numeric(
+        df["Revenue for stay (€)"], errors="coerce"
+    ).fillna(0)
+
+    # Convert year/month to numeric, allow NaN, then drop invalid rows
+    df["Year"] = pd.to_numeric(df["Check-in Year"], errors="coerce")
+    df["Month"] = pd.to_numeric(df["Check-in Month"], errors="coerce")
+
+    df = df.dropna(subset=["Year", "Month"])
+
+    df["Year"] = df["Year"].astype(int)
+    df["Month"] = df["Month"].astype(int)
+
+    # Build a Year-Month column
+    df["Year-Month"] = pd.to_datetime(
+        df["Year"].astype(str) + "-" + df["Month"].astype(str) + "-01"
+    )
+
+    grouped = df.groupby(["Year-Month", "Platform"], as_index=False)[
+        "Revenue for stay (€)"
+    ].sum()
+
+    pivot = grouped.pivot(
+        index="Year-Month",
+        columns="Platform",
+        values="Revenue for stay (€)",
+    ).fillna(0)
+
+    if "Airbnb" not in pivot.columns:
+        pivot["Airbnb"] = 0
+    if "Booking.com" not in pivot.columns:
+        pivot["Booking.com"] = 0
+
+    pivot = pivot.sort_index()
+    pivot.index.name = "Month"
+
+    return pivot
+
+
+def revenue_heatmap_frame(bookings: pd.DataFrame, platform: str = "Overall") -> Optional[pd.DataFrame]:
+    """
+    Revenue per check-in year and month (Year / Month / MonthName / Revenue),
+    for one platform or "Overall". None when there is nothing to show.
+    """
+    heat_source = clean_bookings(bookings.copy())
+    if "Platform" in heat_source.columns:
+        heat_source["platform_normalized"] = heat_source["Platform"].replace({"Booking": "Booking.com"})
+    else:
+        heat_source["platform_normalized"] = "Unknown"
+
+    if platform != "Overall":
+        heat_source = heat_source[heat_source["platform_normalized"] == platform]
+
+    if (
+        "Check-in Year" not in heat_source.columns
+        or "Check-in Month" not in heat_source.columns
+        or "Revenue for stay (€)" not in heat_source.columns
+        or heat_source.empty
+    ):
+        return None
+
+    heat_source["Year"] = heat_source["Check-in Year"].astype(int)
+    heat_source["Month"] = heat_source["Check-in Month"].astype(int)
+    heat_grouped = (
+        heat_source.groupby(["Year", "Month"])["Revenue for stay (€)"]
+        .sum()
+        .reset_index()
+    )
+    heat_grouped["MonthName"] = heat_grouped["Month"].map(lambda m: calendar.month_abbr[int(m)])
+    return heat_grouped.rename(columns={"Revenue for stay (€)": "Revenue"})
+
+
+def monthly_nights_by_platform(bookings: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate total nights by month and platform."""
+    df = clean_bookings(bookings.copy())
+    
+    # Normalize platform labels
+    df["Platform"] = df["Platform"].replace({"Booking": "Booking.com"})
+    
+    # Make sure nights is numeric
+    df["Nights"] = pd.to_numeric(df["Nights"], errors="coerce").fillna(0)
+    
+    # Convert year/month to numeric
+    df["Year"] = pd.to_numeric(df["Check-in Year"], errors="coerce")
+    df["Month"] = pd.to_numeric(df["Check-in Month"], errors="coerce")
+    df = df.dropna(subset=["Year", "Month"])
+    
+    df["Year"] = df["Year"].astype(int)
+    df["Month"] = df["Month"].astype(int)
+    
+    # Build Year-Month column
+    df["Year-Month"] = pd.to_datetime(
+        df["Year"].astype(str) + "-" + df["Month"].astype(str) + "-01"
+    )
+    
+    grouped = df.groupby(["Year-Month", "Platform"], as_index=False)["Nights"].sum()
+    
+    pivot = grouped.pivot(
+        index="Year-Month",
+        columns="Platform",
+        values="Nights",
+    ).fillna(0)
+    
+    if "Airbnb" not in pivot.columns:
+        pivot["Airbnb"] = 0
+    if "Booking.com" not in pivot.columns:
+        pivot["Booking.com"] = 0
+    
+    pivot = pivot.sort_index()
+    pivot.index.name = "Month"
+    return pivot
+
+
+def monthly_reservations_by_platform(bookings: pd.DataFrame) -> pd.DataFrame:
+    """Count reservations by month and platform."""
+    df = clean_bookings(bookings.copy())
+    
+    # Normalize platform labels
+    df["Platform"] = df["Platform"].replace({"Booking": "Booking.com"})
+    
+    # Convert year/month to numeric
+    df["Year"] = pd.to_numeric(df["Check-in Year"], errors="coerce")
+    df["Month"] = pd.to_numeric(df["Check-in Month"], errors="coerce")
+    df = df.dropna(subset=["Year", "Month"])
+    
+    df["Year"] = df["Year"].astype(int)
+    df["Month"] = df["Month"].astype(int)
+    
+    # Build Year-Month column
+    df["Year-Month"] = pd.to_datetime(
+        df["Year"].astype(str) + "-" + df["Month"].astype(str) + "-01"
+    )
+    
+    grouped = df.groupby(["Year-Month", "Platform"], as_index=False).size()
+    grouped.rename(columns={"size": "Count"}, inplace=True)
+    
+    pivot = grouped.pivot(
+        index="Year-Month",
+        columns="Platform",
+        values="Count",
+    ).fillna(0)
+    
+    if "Airbnb" not in pivot.columns:
+        pivot["Airbnb"] = 0
+    if "Booking.com" not in pivot.columns:
+        pivot["Booking.com"] = 0
+    
+    pivot = pivot.sort_index()
+    pivot.index.name = "Month"
+    return pivot
+
+
+def monthly_adr_by_platform(bookings: pd.DataFrame) -> pd.DataFrame:
+    """Calculate ADR (Average Daily Rate) by month and platform."""
+    return _adr_frame(monthly_revenue_by_platform(bookings), monthly_nights_by_platform(bookings))
+
+
+def _adr_frame(revenue_df: pd.DataFrame, nights_df: pd.DataFrame) -> pd.DataFrame:
+    """ADR per month and platform from the monthly revenue and nights frames."""
+    # Calculate ADR for each platform
+    adr_df = revenue_df.copy()
+    for platform in ["Airbnb", "Booking.com"]:
+        if platform in revenue_df.columns and platform in nights_df.columns:
+            nights_values = nights_df[platform]
+            adr_df[platform] = revenue_df[platform] / nights_values.replace(0, pd.NA)
+            adr_df[platform] = adr_df[platform].fillna(0)
+        else:
+            adr_df[platform] = 0
+    
+    return adr_df
+
+
+def monthly_occupancy_by_platform(
+    bookings: pd.DataFrame,
+    nights_available_per_month: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Calculate occupancy percentage by month and platform.
+    
+    Args:
+        bookings: Bookings dataframe
+        nights_available_per_month: Dict mapping Year-Month timestamps to available nights.
+                                   If None, calculates based on calendar days in each month.
+    """
+    return _occupancy_frame(monthly_nights_by_platform(bookings), nights_available_per_month)
+
+
+def _occupancy_frame(nights_df: pd.DataFrame, nights_available_per_month: dict | None = None) -> pd.DataFrame:
+    """Occupancy % per month and platform from the monthly nights frame."""
+    # Calculate available nights per month if not provided
+    if nights_available_per_month is None:
+        nights_available_per_month = {}
+        for year_month in nights_df.index:
+            year = year_month.year
+            month = year_month.month
+            days_in_month = calendar.monthrange(year, month)[1]
+            nights_available_per_month[year_month] = days_in_month
+    
+    # Calculate occupancy percentage (0 for months without available nights)
+    available = pd.Series(
+        [nights_available_per_month.get(year_month, 0) for year_month in nights_df.index],
+        index=nights_df.index,
+        dtype=float,
+    )
+    occupancy_df = nights_df.copy()
+    for platform in ["Airbnb", "Booking.com"]:
+        if platform in nights_df.columns and not nights_df.empty:
+            occupancy_df[platform] = (nights_df[platform] / available.where(available > 0) * 100).fillna(0)
+    
+    return occupancy_df
+
+
+def get_monthly_metric_data(
+    bookings: pd.DataFrame,
+    metric_key: str,
+    nights_available_per_month: dict | None = None,
+) -> pd.DataFrame:
+    """Get monthly aggregated data for a given metric key."""
+    if metric_key == "revenue_by_month":
+        return monthly_revenue_by_platform(bookings)
+    elif metric_key == "nights_by_month":
+        return monthly_nights_by_platform(bookings)
+    elif metric_key == "reservations_by_month":
+        return monthly_reservations_by_platform(bookings)
+    elif metric_key == "adr_by_month":
+        return monthly_adr_by_platform(bookings)
+    elif metric_key == "occupancy_by_month":
+        return monthly_occupancy_by_platform(bookings, nights_available_per_month)
+    else:
+        raise ValueError(f"Unknown metric key: {metric_key}")
+
+
+def monthly_metric_cube(bookings: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Every monthly chart metric (CHART_METRIC_KEYS) from a single pass over the
+    bookings: one group-by of revenue, nights and stays per month and platform,
+    from which each metric frame is a pivot or a ratio. Gives the same frames
+    as get_monthly_metric_data (occupancy against calendar days).
+    """
+    df = clean_bookings(bookings.copy())
+    df["Platform"] = df["Platform"].replace({"Booking": "Booking.com"})
+    df["Revenue for stay (€)"] = pd.to_numeric(df["Revenue for stay (€)"], errors="coerce").fillna(0)
+    df["Nights"] = pd.to_numeric(df["Nights"], errors="coerce").fillna(0)
+    df["Year"] = pd.to_numeric(df["Check-in Year"], errors="coerce")
+    df["Month"] = pd.to_numeric(df["Check-in Month"], errors="coerce")
+    df = df.dropna(subset=["Year", "Month"])
+    df["Year-Month"] = pd.to_datetime(
+        pd.DataFrame({"year": df["Year"].astype(int), "month": df["Month"].astype(int), "day": 1})
+    )
+
+    grouped = df.groupby(["Year-Month", "Platform"]).agg(
+        revenue=("Revenue for stay (€)", "sum"),
+        nights=("Nights", "sum"),
+        stays=("Platform", "size"),
+    )
+
+    def pivot(column: str) -> pd.DataFrame:
+        frame = grouped[column].unstack("Platform").fillna(0)
+        for platform in ["Airbnb", "Booking.com"]:
+            if platform not in frame.columns:
+                frame[platform] = 0
+        frame = frame.sort_index()
+        frame.index.name = "Month"
+        return frame
+
+    revenue_df, nights_df = pivot("revenue"), pivot("nights")
+    return {
+        "revenue_by_month": revenue_df,
+        "nights_by_month": nights_df,
+        "reservations_by_month": pivot("stays"),
+        "adr_by_month": _adr_frame(revenue_df, nights_df),
+        "occupancy_by_month": _occupancy_frame(nights_df),
+    }
+
+
+def prepare_chart_data(
+    metric_df: pd.DataFrame,
+    view_mode: str,
+) -> pd.DataFrame:
+    """
+    Prepare chart data based on view mode.
+    Returns a dataframe with columns ready for charting.
+    """
+    if view_mode == "Airbnb":
+        chart_df = metric_df[["Airbnb"]].copy()
+    elif view_mode == "Booking.com":
+        chart_df = metric_df[["Booking.com"]].copy()
+    else:
+        # Overall or Comparison: show both platforms and total
+        chart_df = metric_df[["Airbnb", "Booking.com"]].copy()
+        chart_df["Total"] = chart_df["Airbnb"] + chart_df["Booking.com"]
+    
+    return chart_df
+
+
+def calculate_number_of_months(start_date, end_date):
+    """
+    Calculate the number of unique months between start_date and end_date (inclusive).
+    
+    Args:
+        start_date: Start date (datetime, date, or None)
+        end_date: End date (datetime, date, or None)
+    
+    Returns:
+        int: Number of unique months in the period
+    """
+    if start_date is None or end_date is None:
+        return 0
+    
+    # Convert to pandas datetime if needed
+    start_dt = pd.to_datetime(start_date)
+    end_dt = pd.to_datetime(end_date)
+    
+    # Calculate the difference in months
+    # We count unique months by creating a date range and counting unique year-month combinations
+    months = pd.period_range(start=start_dt, end=end_dt, freq='M')
+    
+    # If the range doesn't align with month boundaries, we need to count partial months
+    # Count unique year-month combinations
+    unique_months = set()
+    
+    # Start from the first day of start_date's month to the last day of end_date's month
+    current = pd.Timestamp(year=start_dt.year, month=start_dt.month, day=1)
+    end_month = pd.Timestamp(year=end_dt.year, month=end_dt.month, day=1)
+    
+    while current <= end_month:
+        unique_months.add((current.year, current.month))
+        # Move to next month
+        if current.month == 12:
+            current = pd.Timestamp(year=current.year + 1, month=1, day=1)
+        else:
+            current = pd.Timestamp(year=current.year, month=current.month + 1, day=1)
+    
+    return len(unique_months)
+
+
+def calculate_avg_monthly_gross_income(df, start_date, end_date):
+    """
+    Calculate average monthly gross income for the selected period.
+    
+    Formula: (Sum of RevenueForStay for all bookings) ÷ (Number of unique months)
+    
+    Uses the actual date range of bookings in the dataframe, not the theoretical period boundaries,
+    to ensure consistency when comparing year selection vs custom date ranges.
+    
+    Args:
+        df: Filtered bookings dataframe
+        start_date: Start date of the period (datetime, date, or None) - used as fallback
+        end_date: End date of the period (datetime, date, or None) - used as fallback
+    
+    Returns:
+        float: Average monthly gross income
+    """
+    if df.empty:
+        return 0.0
+    
+    # Use actual date range from the bookings data, not theoretical boundaries
+    if "Check-in date" in df.columns and not df["Check-in date"].dropna().empty:
+        actual_start = pd.to_datetime(df["Check-in date"].min())
+        actual_end = pd.to_datetime(df["Check-in date"].max())
+    elif start_date is not None and end_date is not None:
+        # Fallback to provided dates if no check-in dates available
+        actual_start = pd.to_datetime(start_date)
+        actual_end = pd.to_datetime(end_date)
+    else:
+        return 0.0
+    
+    # Calculate number of months based on actual data range
+    num_months = calculate_number_of_months(actual_start, actual_end)
+    if num_months == 0:
+        return 0.0
+    
+    # Sum of RevenueForStay (Revenue for stay (€))
+    if "Revenue for stay (€)" in df.columns:
+        total_gross = float(df["Revenue for stay (€)"].fillna(0).sum())
+    else:
+        return 0.0
+    
+    # Calculate average
+    avg_monthly_gross = total_gross / num_months if num_months > 0 else 0.0
+    
+    return avg_monthly_gross
+
+
+def calculate_avg_monthly_net_income(df, monthly_costs_filtered, view_mode, start_date, end_date):
+    """
+    Calculate average monthly net income for the selected period.
+    
+    Formula: (Sum of NetProfit for all bookings) ÷ (Number of unique months)
+    
+    NetProfit = Revenue - Per-Stay Expenses - Fixed Costs (for Overall view)
+    or NetProfit = Revenue - Per-Stay Expenses (for platform-specific views)
+    
+    Uses the actual date range of bookings in the dataframe, not the theoretical period boundaries,
+    to ensure consistency when comparing year selection vs custom date ranges.
+    
+    Args:
+        df: Filtered bookings dataframe
+        monthly_costs_filtered: Filtered monthly costs dataframe
+        view_mode: 'Overall', 'Airbnb', or 'Booking.com'
+        start_date: Start date of the period (datetime, date, or None) - used as fallback
+        end_date: End date of the period (datetime, date, or None) - used as fallback
+    
+    Returns:
+        float: Average monthly net income
+    """
+    if df.empty:
+        return 0.0
+    
+    # Use actual date range from the bookings data, not theoretical boundaries
+    if "Check-in date" in df.columns and not df["Check-in date"].dropna().empty:
+        actual_start = pd.to_datetime(df["Check-in date"].min())
+        actual_end = pd.to_datetime(df["Check-in date"].max())
+    elif start_date is not None and end_date is not None:
+        # Fallback to provided dates if no check-in dates available
+        actual_start = pd.to_datetime(start_date)
+        actual_end = pd.to_datetime(end_date)
+    else:
+        return 0.0
+    
+    # Calculate number of months based on actual data range
+    num_months = calculate_number_of_months(actual_start, actual_end)
+    if num_months == 0:
+        return 0.0
+    
+    # Calculate total revenue
+    if "Revenue for stay (€)" in df.columns:
+        total_revenue = float(df["Revenue for stay (€)"].fillna(0).sum())
+    else:
+        return 0.0
+    
+    # Calculate total per-stay expenses
+    if "Per-stay expenses (€)" in df.columns:
+        total_per_stay = float(df["Per-stay expenses (€)"].fillna(0).sum())
+    else:
+        total_per_stay = 0.0
+    
+    # Calculate net profit
+    net_before_fixed = total_revenue - total_per_stay
+    
+    # For Overall view, subtract fixed costs
+    if view_mode == "Overall" and "Total Fixed Costs (€)" in monthly_costs_filtered.columns:
+        total_fixed = float(monthly_costs_filtered["Total Fixed Costs (€)"].fillna(0).sum())
+        net_profit = net_before_fixed - total_fixed
+    else:
+        net_profit = net_before_fixed
+    
+    # Calculate average
+    avg_monthly_net = net_profit / num_months if num_months > 0 else 0.0
+    
+    return avg_monthly_net
+
+
+def calculate_all_metrics(
+    bookings_filtered: pd.DataFrame,
+    monthly_costs_filtered: pd.DataFrame,
+    view_mode: str,
+    nights_available: int,
+    selected_year_int: int | None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    bookings_all: Optional[pd.DataFrame] = None,
+    metric_keys: Optional[list[str]] = None,
+) -> dict[str, dict]:
+    """
+    Calculate all metrics and return them in metric_info format.
+    Returns: dict[key] = {label, value, prefix, explanation}
+    
+    Args:
+        bookings_filtered: Bookings filtered by check-in date (for revenue/expenses)
+        bookings_all: All bookings (for overlap-based nights/reservations calculation)
+        metric_keys: Only return these metrics and skip the calculations none of them
+            need (platform split, seasonality, country stats). None returns everything.
+        Other args: Same as before
+    """
+    metric_info: dict[str, dict] = {}
+    wanted = set(metric_keys) if metric_keys is not None else None
+
+    def wants(*keys):
+        return wanted is None or not wanted.isdisjoint(keys)
+
+    def add_metric(key, label, value, prefix, explanation):
+        metric_info[key] = {
+            "label": label,
+            "value": value,
+            "prefix": prefix,
+            "explanation": explanation,
+        }
+
+    # Use all bookings for overlap calculation if provided, otherwise use filtered
+    bookings_for_overlap = bookings_all if bookings_all is not None else bookings_filtered
+    
+    # Determine period boundaries for distributed calculation
+    period_start_dt = None
+    period_end_dt = None
+    use_distributed = False
+    
+    if start_date is not None and end_date is not None:
+        period_start_dt = pd.to_datetime(start_date)
+        period_end_dt = pd.to_datetime(end_date)
+        use_distributed = True
+    elif selected_year_int is not None:
+        period_start_dt = pd.Timestamp(year=selected_year_int, month=1, day=1)
+        period_end_dt = pd.Timestamp(year=selected_year_int, month=12, day=31)
+        use_distributed = True
+    
+    # Get base metrics - use distributed calculation if we have period boundaries
+    metrics = compute_metrics(
+        bookings_filtered, 
+        monthly_costs_filtered, 
+        view_mode,
+        period_start=period_start_dt,
+        period_end=period_end_dt,
+        use_overlap_logic=use_distributed
+    )
+    
+    # If using distributed calculation, we need to recalculate from all bookings
+    if use_distributed:
+        # Calculate overlap nights and distributed revenue/profit from ALL bookings
+        df_all = clean_bookings(bookings_for_overlap.copy())
+        
+        # Normalize platform labels
+        if "Platform" in df_all.columns:
+            df_all["Platform"] = df_all["Platform"].replace({"Booking": "Booking.com"})
+        
+        # Filter by platform if needed
+        if view_mode == "Airbnb":
+            df_all = df_all[df_all["Platform"] == "Airbnb"]
+        elif view_mode == "Booking.com":
+            df_all = df_all[df_all["Platform"] == "Booking.com"]
+        
+        # Calculate overlap nights for each booking
+        if "Check-in date" in df_all.columns and "Check-out date" in df_all.columns:
+            overlap_nights = df_all.apply(
+                lambda row: calculate_overlap_nights(
+                    row.get("Check-in date"),
+                    row.get("Check-out date"),
+                    period_start_dt,
+                    period_end_dt
+                ),
+                axis=1
+            )
+            total_nights = int(overlap_nights.sum())
+            # Count reservations that have at least one overlapping night
+            reservations = int((overlap_nights > 0).sum())
+            
+            # Calculate distributed revenue and expenses
+            distributed_revenue_series = df_all.apply(
+                lambda row: calculate_distributed_revenue(row, overlap_nights[row.name]),
+                axis=1
+            )
+            # Ensure we're summing numeric values only (convert to float to avoid datetime issues)
+            # Convert to Series first, then to numeric, then fillna and sum
+            if len(distributed_revenue_series) > 0:
+                distributed_revenue = pd.Series(pd.to_numeric(distributed_revenue_series.values, errors='coerce')).fillna(0).sum()
+            else:
+                distributed_revenue = 0.0
+            
+            # Calculate distributed per-stay expenses (proportional to nights)
+            distributed_per_stay_series = df_all.apply(
+                lambda row: (
+                    (float(row.get("Per-stay expenses (€)", 0) or 0) / 
+                     max((pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days, 1))
+                    * overlap_nights[row.name]
+                ) if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0.0,
+                axis=1
+            )
+            # Ensure we're summing numeric values only (convert to float to avoid datetime issues)
+            # Convert to Series first, then to numeric, then fillna and sum
+            if len(distributed_per_stay_series) > 0:
+                distributed_per_stay = pd.Series(pd.to_numeric(distributed_per_stay_series.values, errors='coerce')).fillna(0).sum()
+            else:
+                distributed_per_stay = 0.0
+            
+            # Update metrics with distributed values
+            metrics["Total nights"] = total_nights
+            metrics["Reservations"] = reservations
+            metrics["Total revenue (€)"] = float(distributed_revenue)
+            metrics["Total Per-Stay Expenses (€)"] = float(distributed_per_stay)
+            metrics["Net Income Before Fixed Costs (€)"] = float(distributed_revenue - distributed_per_stay)
+            
+            # Update Net Profit if fixed costs are available
+            if "Net Profit (€)" in metrics:
+                # Calculate total booking nights for fixed cost allocation
+                total_booking_nights = df_all.apply(
+                    lambda row: (
+                        (pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days
+                        if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0
+                    ),
+                    axis=1
+                ).sum()
+                
+                if total_booking_nights > 0 and total_nights > 0:
+                    # Allocate fixed costs proportionally
+                    original_fixed = metrics.get("Total Fixed Costs (€)", 0.0)
+                    allocated_fixed = original_fixed * (total_nights / total_booking_nights)
+                    metrics["Total Fixed Costs (€)"] = float(allocated_fixed)
+                    metrics["Net Profit (€)"] = float(distributed_revenue - distributed_per_stay - allocated_fixed)
+        else:
+            # Fallback to original logic if dates are missing
+            total_nights = int(metrics.get("Total nights", 0))
+            reservations = int(metrics.get("Reservations", 0))
+    # Extract values from metrics (already calculated with distributed logic if use_distributed=True)
+    total_nights = int(metrics.get("Total nights", 0))
+    reservations = int(metrics.get("Reservations", 0))
+
+    total_revenue = float(metrics.get("Total revenue (€)", 0.0))
+    total_per_stay_expenses = float(metrics.get("Total Per-Stay Expenses (€)", 0.0))
+    total_fixed_costs = float(metrics.get("Total Fixed Costs (€)", 0.0))
+    net_before_fixed = float(metrics.get("Net Income Before Fixed Costs (€)", 0.0))
+
+    # Net profit (only available for Overall view)
+    if "Net Profit (€)" in metrics:
+        net_profit = float(metrics["Net Profit (€)"])
+        net_label = "Net Profit (€)"
+        net_explanation = (
+            "Net profit after per-stay expenses and fixed monthly costs "
+            "for the selected period."
+        )
+    else:
+        net_profit = None
+        net_label = "Net Income Before Fixed Costs (€)"
+        net_explanation = (
+            "Net profit after per-stay expenses, before fixed monthly costs "
+            "for the selected view/platform."
+        )
+
+    # Derived basic metrics
+    occupancy_pct = (total_nights / nights_available * 100) if nights_available > 0 else 0.0
+    revpar = (total_revenue / nights_available) if nights_available > 0 else 0.0
+    adr = (total_revenue / total_nights) if total_nights > 0 else 0.0
+    avg_stay_nights = (total_nights / reservations) if reservations > 0 else 0.0
+
+    # Platform statistics
+    # Use all bookings for distributed calculation if available
+    bookings_for_stats = clean_bookings(bookings_for_overlap.copy() if use_distributed else bookings_filtered.copy())
+    if "Platform" in bookings_for_stats.columns:
+        bookings_for_stats["platform_normalized"] = bookings_for_stats["Platform"].replace(
+            {"Booking": "Booking.com"}
+        )
+    else:
+        bookings_for_stats["platform_normalized"] = "Unknown"
+
+    airbnb_mask = bookings_for_stats["platform_normalized"] == "Airbnb"
+    booking_mask = bookings_for_stats["platform_normalized"] == "Booking.com"
+
+    # Calculate platform revenue using distributed logic if enabled
+    airbnb_overlap_nights = None
+    booking_overlap_nights = None
+    
+    if not wants(*METRIC_SECTIONS["Platform Performance"], "Average Guests per Booking by Platform"):
+        # No platform metrics requested - skip the per-platform overlap calculation
+        airbnb_revenue = booking_revenue = 0.0
+        airbnb_nights = booking_nights = 0
+        airbnb_reservations = booking_reservations = 0
+    elif use_distributed and period_start_dt is not None and period_end_dt is not None:
+        if "Check-in date" in bookings_for_stats.columns and "Check-out date" in bookings_for_stats.columns:
+            # Calculate overlap nights for platform-specific bookings (calculate once, reuse)
+            airbnb_overlap_nights = bookings_for_stats[airbnb_mask].apply(
+                lambda row: calculate_overlap_nights(
+                    row.get("Check-in date"),
+                    row.get("Check-out date"),
+                    period_start_dt,
+                    period_end_dt
+                ),
+                axis=1
+            )
+            booking_overlap_nights = bookings_for_stats[booking_mask].apply(
+                lambda row: calculate_overlap_nights(
+                    row.get("Check-in date"),
+                    row.get("Check-out date"),
+                    period_start_dt,
+                    period_end_dt
+                ),
+                axis=1
+            )
+            
+            # Calculate distributed revenue for each platform
+            airbnb_revenue_series = bookings_for_stats[airbnb_mask].apply(
+                lambda row: calculate_distributed_revenue(row, airbnb_overlap_nights[row.name]),
+                axis=1
+            )
+            if len(airbnb_revenue_series) > 0:
+                airbnb_revenue = float(pd.Series(pd.to_numeric(airbnb_revenue_series.values, errors='coerce')).fillna(0).sum())
+            else:
+                airbnb_revenue = 0.0
+            
+            booking_revenue_series = bookings_for_stats[booking_mask].apply(
+                lambda row: calculate_distributed_revenue(row, booking_overlap_nights[row.name]),
+                axis=1
+            )
+            if len(booking_revenue_series) > 0:
+                booking_revenue = float(pd.Series(pd.to_numeric(booking_revenue_series.values, errors='coerce')).fillna(0).sum())
+            else:
+                booking_revenue = 0.0
+            
+            airbnb_nights = int(airbnb_overlap_nights.sum())
+            booking_nights = int(booking_overlap_nights.sum())
+            airbnb_reservations = int((airbnb_overlap_nights > 0).sum())
+            booking_reservations = int((booking_overlap_nights > 0).sum())
+        else:
+            # Fallback to original logic
+            airbnb_revenue = float(
+                bookings_for_stats.loc[airbnb_mask, "Revenue for stay (€)"].sum()
+                if "Revenue for stay (€)" in bookings_for_stats.columns
+                else 0.0
+            )
+            booking_revenue = float(
+                bookings_for_stats.loc[booking_mask, "Revenue for stay (€)"].sum()
+                if "Revenue for stay (€)" in bookings_for_stats.columns
+                else 0.0
+            )
+            airbnb_nights = int(
+                bookings_for_stats.loc[airbnb_mask, "Nights"].fillna(0).sum()
+                if "Nights" in bookings_for_stats.columns
+                else 0
+            )
+            booking_nights = int(
+                bookings_for_stats.loc[booking_mask, "Nights"].fillna(0).sum()
+                if "Nights" in bookings_for_stats.columns
+                else 0
+            )
+            airbnb_reservations = int(airbnb_mask.sum()) if not bookings_for_stats.empty else 0
+            booking_reservations = int(booking_mask.sum()) if not bookings_for_stats.empty else 0
+    else:
+        # Original logic for "All" selection
+        airbnb_revenue = float(
+            bookings_for_stats.loc[airbnb_mask, "Revenue for stay (€)"].sum()
+            if "Revenue for stay (€)" in bookings_for_stats.columns
+            else 0.0
+        )
+        booking_revenue = float(
+            bookings_for_stats.loc[booking_mask, "Revenue for stay (€)"].sum()
+            if "Revenue for stay (€)" in bookings_for_stats.columns
+            else 0.0
+        )
+        airbnb_nights = int(
+            bookings_for_stats.loc[airbnb_mask, "Nights"].fillna(0).sum()
+            if "Nights" in bookings_for_stats.columns
+            else 0
+        )
+        booking_nights = int(
+            bookings_for_stats.loc[booking_mask, "Nights"].fillna(0).sum()
+            if "Nights" in bookings_for_stats.columns
+            else 0
+        )
+        airbnb_reservations = int(airbnb_mask.sum()) if not bookings_for_stats.empty else 0
+        booking_reservations = int(booking_mask.sum()) if not bookings_for_stats.empty else 0
+
+    airbnb_revenue_share = (airbnb_revenue / total_revenue * 100) if total_revenue > 0 else 0.0
+    booking_revenue_share = (booking_revenue / total_revenue * 100) if total_revenue > 0 else 0.0
+
+    # Calculate platform-specific per-stay expenses (distributed if enabled)
+    if use_distributed and period_start_dt is not None and period_end_dt is not None and airbnb_overlap_nights is not None and booking_overlap_nights is not None:
+        if "Check-in date" in bookings_for_stats.columns and "Check-out date" in bookings_for_stats.columns:
+            # Calculate distributed per-stay expenses for each platform (reuse overlap_nights from above)
+            airbnb_per_stay_series = bookings_for_stats[airbnb_mask].apply(
+                lambda row: (
+                    (float(row.get("Per-stay expenses (€)", 0) or 0) / 
+                     max((pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days, 1))
+                    * airbnb_overlap_nights[row.name]
+                ) if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0.0,
+                axis=1
+            )
+            if len(airbnb_per_stay_series) > 0:
+                airbnb_per_stay_expenses = float(pd.Series(pd.to_numeric(airbnb_per_stay_series.values, errors='coerce')).fillna(0).sum())
+            else:
+                airbnb_per_stay_expenses = 0.0
+            
+            booking_per_stay_series = bookings_for_stats[booking_mask].apply(
+                lambda row: (
+                    (float(row.get("Per-stay expenses (€)", 0) or 0) / 
+                     max((pd.to_datetime(row.get("Check-out date")) - pd.to_datetime(row.get("Check-in date"))).days, 1))
+                    * booking_overlap_nights[row.name]
+                ) if not (pd.isna(row.get("Check-in date")) or pd.isna(row.get("Check-out date"))) else 0.0,
+                axis=1
+            )
+            if len(booking_per_stay_series) > 0:
+                booking_per_stay_expenses = float(pd.Series(pd.to_numeric(booking_per_stay_series.values, errors='coerce')).fillna(0).sum())
+            else:
+                booking_per_stay_expenses = 0.0
+            airbnb_net_before_fixed = airbnb_revenue - airbnb_per_stay_expenses
+            booking_net_before_fixed = booking_revenue - booking_per_stay_expenses
+        else:
+            # Fallback
+            if "Per-stay expenses (€)" in bookings_for_stats.columns:
+                airbnb_per_stay_expenses = float(
+                    bookings_for_stats.loc[airbnb_mask, "Per-stay expenses (€)"].fillna(0).sum()
+                )
+                booking_per_stay_expenses = float(
+                    bookings_for_stats.loc[booking_mask, "Per-stay expenses (€)"].fillna(0).sum()
+                )
+            else:
+                airbnb_per_stay_expenses = 0.0
+                booking_per_stay_expenses = 0.0
+            airbnb_net_before_fixed = airbnb_revenue - airbnb_per_stay_expenses
+            booking_net_before_fixed = booking_revenue - booking_per_stay_expenses
+    else:
+        # Original logic
+        if "Per-stay expenses (€)" in bookings_for_stats.columns:
+            airbnb_per_stay_expenses = float(
+                bookings_for_stats.loc[airbnb_mask, "Per-stay expenses (€)"].fillna(0).sum()
+            )
+            booking_per_stay_expenses = float(
+                bookings_for_stats.loc[booking_mask, "Per-stay expenses (€)"].fillna(0).sum()
+            )
+            airbnb_net_before_fixed = airbnb_revenue - airbnb_per_stay_expenses
+            booking_net_before_fixed = booking_revenue - booking_per_stay_expenses
+        else:
+            airbnb_per_stay_expenses = 0.0
+            booking_per_stay_expenses = 0.0
+            airbnb_net_before_fixed = airbnb_revenue
+            booking_net_before_fixed = booking_revenue
+
+    # Guest statistics
+    if "Total guests" in bookings_for_stats.columns:
+        avg_group_size = float(bookings_for_stats["Total guests"].fillna(0).mean())
+        total_guests = float(bookings_for_stats["Total guests"].fillna(0).sum())
+    elif {"Adults", "Children"} <= set(bookings_for_stats.columns):
+        total_guests = float(
+            (bookings_for_stats["Adults"].fillna(0) + bookings_for_stats["Children"].fillna(0)).sum()
+        )
+        avg_group_size = float(
+            (bookings_for_stats["Adults"].fillna(0) + bookings_for_stats["Children"].fillna(0)).mean()
+        )
+    else:
+        avg_group_size = 0.0
+        total_guests = 0.0
+
+    # Amenity usage
+    baby_usage = None
+    sofa_bed_usage = None
+    parking_usage = None
+    if not bookings_for_stats.empty:
+        if "Baby Crib" in bookings_for_stats.columns:
+            baby_usage = (
+                bookings_for_stats["Baby Crib"].astype(str).str.lower().eq("yes").sum()
+                / len(bookings_for_stats)
+                * 100
+            )
+        if "Sofa Bed" in bookings_for_stats.columns:
+            sofa_bed_usage = (
+                bookings_for_stats["Sofa Bed"].astype(str).str.lower().eq("yes").sum()
+                / len(bookings_for_stats)
+                * 100
+            )
+        if "Parking" in bookings_for_stats.columns:
+            parking_usage = (
+                bookings_for_stats["Parking"].astype(str).str.lower().eq("yes").sum()
+                / len(bookings_for_stats)
+                * 100
+            )
+
+    # Cost breakdown per stay (columns canonicalized on load, see resolve_schema)
+    transportation_cost = laundry_cost = consumable_cost = bank_fees = 0.0
+    if not bookings_for_stats.empty:
+        cost_totals = bookings_for_stats[BOOKING_COST_COLUMNS].apply(pd.to_numeric, errors="coerce").sum()
+        transportation_cost, laundry_cost, consumable_cost, bank_fees = (float(total) for total in cost_totals)
+
+    # Monthly revenue and seasonality
+    best_month_label = "N/A"
+    worst_month_label = "N/A"
+    best_month_profit_label = "N/A"
+    forecast_next_year = 0.0
+    forecast_weighted = 0.0
+    forecast_profit = 0.0
+    mom_change = None
+    yoy_change = None
+    moving_avg_3m = None
+    seasonal_index = None
+
+    if wants(*METRIC_SECTIONS["Seasonality & Trends"]) and \
+       not bookings_filtered.empty and \
+       "Check-in Year" in bookings_filtered.columns and \
+       "Check-in Month" in bookings_filtered.columns:
+
+        monthly_revenue = (
+            bookings_filtered
+            .groupby(["Check-in Year", "Check-in Month"])["Revenue for stay (€)"]
+            .sum()
+            .reset_index()
+        )
+        monthly_revenue["Check-in Year"] = monthly_revenue["Check-in Year"].astype(int)
+        monthly_revenue["Check-in Month"] = monthly_revenue["Check-in Month"].astype(int)
+        monthly_revenue["MonthName"] = monthly_revenue["Check-in Month"].apply(
+            lambda m: calendar.month_abbr[int(m)]
+        )
+
+        if not monthly_revenue.empty:
+            best_row = monthly_revenue.loc[monthly_revenue["Revenue for stay (€)"].idxmax()]
+            best_month_label = f"{best_row['MonthName']} {int(best_row['Check-in Year'])}"
+
+            worst_row = monthly_revenue.loc[monthly_revenue["Revenue for stay (€)"].idxmin()]
+            worst_month_label = f"{worst_row['MonthName']} {int(worst_row['Check-in Year'])}"
+
+            months_count = len(monthly_revenue)
+            forecast_next_year = float(
+                monthly_revenue["Revenue for stay (€)"].mean() * 12 if months_count > 0 else 0.0
+            )
+
+            # Weighted forecast (recent 6 months weighted more)
+            if months_count >= 6:
+                recent_avg = monthly_revenue.tail(6)["Revenue for stay (€)"].mean()
+                older_avg = monthly_revenue.head(months_count - 6)["Revenue for stay (€)"].mean() if months_count > 6 else recent_avg
+                forecast_weighted = float((recent_avg * 0.6 + older_avg * 0.4) * 12)
+            else:
+                forecast_weighted = forecast_next_year
+
+            # Month-over-month change (if we have at least 2 months)
+            if months_count >= 2:
+                sorted_monthly = monthly_revenue.sort_values(["Check-in Year", "Check-in Month"])
+                if len(sorted_monthly) >= 2:
+                    current = sorted_monthly.iloc[-1]["Revenue for stay (€)"]
+                    previous = sorted_monthly.iloc[-2]["Revenue for stay (€)"]
+                    if previous > 0:
+                        mom_change = float(((current - previous) / previous) * 100)
+
+            # Year-over-year change
+            if selected_year_int is not None and months_count > 0:
+                current_year_revenue = monthly_revenue[
+                    monthly_revenue["Check-in Year"] == selected_year_int
+                ]["Revenue for stay (€)"].sum()
+                previous_year_revenue = monthly_revenue[
+                    monthly_revenue["Check-in Year"] == selected_year_int - 1
+                ]["Revenue for stay (€)"].sum()
+                if previous_year_revenue > 0:
+                    yoy_change = float(((current_year_revenue - previous_year_revenue) / previous_year_revenue) * 100)
+
+            # 3-month moving average
+            if months_count >= 3:
+                sorted_monthly = monthly_revenue.sort_values(["Check-in Year", "Check-in Month"])
+                moving_avg_3m = float(sorted_monthly.tail(3)["Revenue for stay (€)"].mean())
+
+            # Seasonal index
+            if months_count > 0:
+                annual_avg = monthly_revenue["Revenue for stay (€)"].mean()
+                if annual_avg > 0:
+                    monthly_revenue["SeasonalIndex"] = (
+                        monthly_revenue["Revenue for stay (€)"] / annual_avg * 100
+                    )
+                    # Return average seasonal index per month (across years)
+                    seasonal_by_month = monthly_revenue.groupby("Check-in Month")["SeasonalIndex"].mean()
+                    seasonal_index = float(seasonal_by_month.mean())  # Average across all months
+
+        # Best month by profit
+        if "Net Income Before Fixed Costs (€)" in bookings_filtered.columns:
+            monthly_profit = (
+                bookings_filtered
+                .groupby(["Check-in Year", "Check-in Month"])["Net Income Before Fixed Costs (€)"]
+                .sum()
+                .reset_index()
+            )
+            if not monthly_profit.empty:
+                best_profit_row = monthly_profit.loc[monthly_profit["Net Income Before Fixed Costs (€)"].idxmax()]
+                best_month_profit_label = f"{calendar.month_abbr[int(best_profit_row['Check-in Month'])]} {int(best_profit_row['Check-in Year'])}"
+
+    # Country statistics (for demographics section)
+    top_countries_bookings = None
+    top_countries_revenue = None
+    if wants(*METRIC_SECTIONS["Guest Demographics"]) and \
+       "Country" in bookings_for_stats.columns and not bookings_for_stats.empty:
+        country_stats = bookings_for_stats.groupby("Country").agg({
+            "Revenue for stay (€)": ["count", "sum", "mean"],
+            "Nights": "mean"
+        }).reset_index()
+        country_stats.columns = ["Country", "Bookings", "TotalRevenue", "AvgRevenue", "AvgNights"]
+        top_countries_bookings = country_stats.nlargest(5, "Bookings")[["Country", "Bookings"]].to_dict("records")
+        top_countries_revenue = country_stats.nlargest(5, "TotalRevenue")[["Country", "TotalRevenue"]].to_dict("records")
+        avg_revenue_by_country = country_stats[["Country", "AvgRevenue"]].to_dict("records")
+        avg_stay_by_country = country_stats[["Country", "AvgNights"]].to_dict("records")
+
+    # ========== CORE FINANCIAL & OCCUPANCY ==========
+    add_metric("Reservations", "Reservations", reservations, "", "Counts bookings that contributed at least one booked night to the selected period.")
+    add_metric("Total nights", "Total nights", total_nights, "", "Counts only the nights that fall inside the selected period, even if the booking started earlier.")
+    add_metric("Occupancy (%)", "Occupancy (%)", occupancy_pct, "", "Share of available nights that were actually booked.")
+    add_metric("Total revenue (€)", "Total revenue (€)", total_revenue, "€ ", "Total revenue from all stays in the selected period.")
+    add_metric("Net Profit (€)", net_label, net_profit if net_profit is not None else net_before_fixed, "€ ", net_explanation)
+    add_metric("Average price per night (€)", "Average price per night (€) (ADR)", adr, "€ ", "Average revenue per booked night (Total Revenue ÷ Booked Nights - only occupied nights). Same as ADR.")
+    add_metric("Average stay (nights)", "Average stay (nights)", avg_stay_nights, "", "Average length of stay per reservation (total nights ÷ reservations).")
+    
+    # ========== AVERAGE MONTHLY INCOME METRICS ==========
+    # Calculate average monthly gross and net income
+    # Functions now use actual date range from bookings data, so they work for "All" selection too
+    # Always add these metrics to metric_info so they're available in Custom Metrics
+    if wants("Average Monthly Gross Income (€)"):
+        avg_monthly_gross = calculate_avg_monthly_gross_income(bookings_filtered, start_date, end_date)
+        add_metric("Average Monthly Gross Income (€)", "Average Monthly Gross Income (€)", avg_monthly_gross, "€ ", 
+                   "Calculates the average gross income per month for the selected period. Gross income is based on the RevenueForStay of each booking.")
+    
+    if wants("Average Monthly Net Income (€)"):
+        avg_monthly_net = calculate_avg_monthly_net_income(bookings_filtered, monthly_costs_filtered, view_mode, start_date, end_date)
+        add_metric("Average Monthly Net Income (€)", "Average Monthly Net Income (€)", avg_monthly_net, "€ ", 
+                   "Calculates the average net income per month for the selected period. Net income accounts for per-stay expenses and fixed monthly costs.")
+
+    # ========== PROFITABILITY METRICS ==========
+    if net_profit is not None and total_revenue > 0:
+        profit_margin = (net_profit / total_revenue) * 100
+        add_metric("Profit Margin (%)", "Profit Margin (%)", profit_margin, "", "Percentage of revenue that becomes profit after all costs.")
+    if reservations > 0:
+        cost_per_reservation = total_per_stay_expenses / reservations
+        add_metric("Cost per Reservation (€)", "Cost per Reservation (€)", cost_per_reservation, "€ ", "Average variable cost per booking.")
+    if net_profit is not None:
+        if total_nights > 0:
+            profit_per_night = net_profit / total_nights
+            add_metric("Profit per Night (€)", "Profit per Night (€)", profit_per_night, "€ ", "Profitability per booked night.")
+        if reservations > 0:
+            profit_per_stay = net_profit / reservations
+            add_metric("Profit per Stay (€)", "Profit per Stay (€)", profit_per_stay, "€ ", "Average profit per booking.")
+    if total_nights > 0:
+        net_income_per_night = net_before_fixed / total_nights
+        add_metric("Net Income per Night Before Fixed (€)", "Net Income per Night Before Fixed (€)", net_income_per_night, "€ ", "Variable profit per night (before fixed costs).")
+    if reservations > 0:
+        net_income_per_stay = net_before_fixed / reservations
+        add_metric("Net Income per Stay Before Fixed (€)", "Net Income per Stay Before Fixed (€)", net_income_per_stay, "€ ", "Variable profit per booking (before fixed costs).")
+    if total_revenue > 0:
+        cost_pct_revenue = (total_per_stay_expenses / total_revenue) * 100
+        add_metric("Cost Percentage of Revenue (%)", "Cost Percentage of Revenue (%)", cost_pct_revenue, "", "What portion of revenue goes to variable costs.")
+    if total_revenue > 0 and total_fixed_costs > 0:
+        fixed_cost_pct_revenue = (total_fixed_costs / total_revenue) * 100
+        add_metric("Fixed Cost Percentage of Revenue (%)", "Fixed Cost Percentage of Revenue (%)", fixed_cost_pct_revenue, "", "What portion of revenue covers fixed costs.")
+
+    # ========== PLATFORM PERFORMANCE METRICS ==========
+    add_metric("Airbnb revenue (€)", "Airbnb revenue (€)", airbnb_revenue, "€ ", "Total revenue coming from Airbnb bookings in the selected period.")
+    add_metric("Booking.com revenue (€)", "Booking.com revenue (€)", booking_revenue, "€ ", "Total revenue coming from Booking.com bookings in the selected period.")
+    add_metric("Airbnb share of revenue (%)", "Airbnb share of revenue (%)", airbnb_revenue_share, "", "Percentage of total revenue generated via Airbnb.")
+    add_metric("Booking.com share of revenue (%)", "Booking.com share of revenue (%)", booking_revenue_share, "", "Percentage of total revenue generated via Booking.com.")
+    add_metric("Airbnb nights", "Airbnb nights", airbnb_nights, "", "Total booked nights that came from Airbnb.")
+    add_metric("Booking.com nights", "Booking.com nights", booking_nights, "", "Total booked nights that came from Booking.com.")
+    
+    if nights_available > 0:
+        airbnb_occupancy = (airbnb_nights / nights_available) * 100
+        booking_occupancy = (booking_nights / nights_available) * 100
+        add_metric("Airbnb Occupancy (%)", "Airbnb Occupancy (%)", airbnb_occupancy, "", "Occupancy rate specifically from Airbnb.")
+        add_metric("Booking.com Occupancy (%)", "Booking.com Occupancy (%)", booking_occupancy, "", "Occupancy rate specifically from Booking.com.")
+        
+        # Platform RevPAR and ADR - display together for comparison
+        airbnb_revpar = airbnb_revenue / nights_available
+        booking_revpar = booking_revenue / nights_available
+        add_metric("Airbnb RevPAR (€)", "Airbnb RevPAR (€)", airbnb_revpar, "€ ", "Revenue per available night from Airbnb (Airbnb Revenue ÷ Nights Available - all days in period).")
+        add_metric("Booking.com RevPAR (€)", "Booking.com RevPAR (€)", booking_revpar, "€ ", "Revenue per available night from Booking.com (Booking.com Revenue ÷ Nights Available - all days in period).")
+        
+        # Platform ADR - display right after RevPAR for comparison
+        if airbnb_nights > 0:
+            airbnb_adr = airbnb_revenue / airbnb_nights
+            add_metric("Airbnb ADR (€)", "Airbnb ADR (€)", airbnb_adr, "€ ", "Average daily rate from Airbnb (Airbnb Revenue ÷ Airbnb Booked Nights - only occupied nights).")
+        if booking_nights > 0:
+            booking_adr = booking_revenue / booking_nights
+            add_metric("Booking.com ADR (€)", "Booking.com ADR (€)", booking_adr, "€ ", "Average daily rate from Booking.com (Booking.com Revenue ÷ Booking.com Booked Nights - only occupied nights).")
+    
+    if airbnb_reservations > 0 and booking_reservations > 0:
+        airbnb_profit_per_res = airbnb_net_before_fixed / airbnb_reservations
+        booking_profit_per_res = booking_net_before_fixed / booking_reservations
+        platform_profit_diff = airbnb_profit_per_res - booking_profit_per_res
+        add_metric("Platform Profitability Difference (€)", "Platform Profitability Difference (€)", platform_profit_diff, "€ ", "Difference in profit per booking between Airbnb and Booking.com (positive = Airbnb more profitable).")
+    
+    if airbnb_nights > 0 and airbnb_reservations > 0:
+        airbnb_avg_stay = airbnb_nights / airbnb_reservations
+        add_metric("Average Stay Length by Platform (nights)", "Airbnb Average Stay (nights)", airbnb_avg_stay, "", "Average booking duration from Airbnb.")
+    if booking_nights > 0 and booking_reservations > 0:
+        booking_avg_stay = booking_nights / booking_reservations
+        if "Average Stay Length by Platform (nights)" in metric_info:
+            # Update to show both platforms (averages with decimals)
+            metric_info["Average Stay Length by Platform (nights)"]["label"] = "Average Stay Length by Platform (nights)"
+            metric_info["Average Stay Length by Platform (nights)"]["value"] = f"Airbnb: {airbnb_avg_stay:.2f}, Booking.com: {booking_avg_stay:.2f}"
+            metric_info["Average Stay Length by Platform (nights)"]["explanation"] = "Average booking duration by platform."
+    
+    if airbnb_reservations > 0:
+        airbnb_rev_per_res = airbnb_revenue / airbnb_reservations
+        add_metric("Platform Revenue per Reservation (€)", "Airbnb Revenue per Reservation (€)", airbnb_rev_per_res, "€ ", "Average booking value from Airbnb.")
+    if booking_reservations > 0:
+        booking_rev_per_res = booking_revenue / booking_reservations
+        if "Platform Revenue per Reservation (€)" in metric_info:
+            metric_info["Platform Revenue per Reservation (€)"]["label"] = "Platform Revenue per Reservation (€)"
+            metric_info["Platform Revenue per Reservation (€)"]["value"] = f"Airbnb: €{airbnb_rev_per_res:.2f}, Booking.com: €{booking_rev_per_res:.2f}"
+            metric_info["Platform Revenue per Reservation (€)"]["prefix"] = ""  # Remove prefix since value already contains € signs
+            metric_info["Platform Revenue per Reservation (€)"]["explanation"] = "Average booking value by platform."
+    
+    if airbnb_reservations > 0:
+        airbnb_cost_per_res = airbnb_per_stay_expenses / airbnb_reservations
+        add_metric("Platform Cost per Reservation (€)", "Airbnb Cost per Reservation (€)", airbnb_cost_per_res, "€ ", "Average variable cost per booking from Airbnb.")
+    if booking_reservations > 0:
+        booking_cost_per_res = booking_per_stay_expenses / booking_reservations
+        if "Platform Cost per Reservation (€)" in metric_info:
+            metric_info["Platform Cost per Reservation (€)"]["label"] = "Platform Cost per Reservation (€)"
+            metric_info["Platform Cost per Reservation (€)"]["value"] = f"Airbnb: €{airbnb_cost_per_res:.2f}, Booking.com: €{booking_cost_per_res:.2f}"
+            metric_info["Platform Cost per Reservation (€)"]["prefix"] = ""  # Remove prefix since value already contains € signs
+            metric_info["Platform Cost per Reservation (€)"]["explanation"] = "Average variable cost per booking by platform."
+    
+    if reservations > 0:
+        platform_mix_airbnb = (airbnb_reservations / reservations) * 100
+        platform_mix_booking = (booking_reservations / reservations) * 100
+        add_metric("Platform Mix (%)", "Platform Mix (%)", f"Airbnb: {platform_mix_airbnb:.1f}%, Booking.com: {platform_mix_booking:.1f}%", "", "Share of bookings by platform.")
+    
+    revenue_concentration = max(airbnb_revenue_share, booking_revenue_share)
+    add_metric("Revenue Concentration Risk (%)", "Revenue Concentration Risk (%)", revenue_concentration, "", "How dependent you are on one platform (higher = riskier).")
+
+    # ========== GUEST BEHAVIOR METRICS ==========
+    add_metric("Average group size", "Average group size", avg_group_size, "", "Average number of guests per stay (adults + children).")
+    if reservations > 0:
+        avg_revenue_per_stay = total_revenue / reservations
+        add_metric("Average Revenue per Stay (€)", "Average Revenue per Stay (€)", avg_revenue_per_stay, "€ ", "Average booking value.")
+        avg_cost_per_stay = total_per_stay_expenses / reservations
+        add_metric("Average Cost per Stay (€)", "Average Cost per Stay (€)", avg_cost_per_stay, "€ ", "Average variable cost per booking.")
+    
+    if airbnb_reservations > 0 and "Total guests" in bookings_for_stats.columns:
+        airbnb_avg_guests = float(bookings_for_stats.loc[airbnb_mask, "Total guests"].fillna(0).mean())
+        booking_avg_guests = float(bookings_for_stats.loc[booking_mask, "Total guests"].fillna(0).mean()) if booking_reservations > 0 else 0.0
+        add_metric("Average Guests per Booking by Platform", "Average Guests per Booking by Platform", f"Airbnb: {airbnb_avg_guests:.1f}, Booking.com: {booking_avg_guests:.1f}", "", "Average group size by platform.")
+    
+    if parking_usage is not None:
+        add_metric("Parking Usage (%)", "Parking Usage (%)", parking_usage, "", "Percentage of bookings where parking was used.")
+    
+    if total_guests > 0:
+        revenue_per_guest = total_revenue / total_guests
+        add_metric("Revenue per Guest (€)", "Revenue per Guest (€)", revenue_per_guest, "€ ", "Average revenue per person.")
+    
+    if baby_usage is not None:
+        add_metric("Baby Crib usage (%)", "Baby Crib usage (%)", baby_usage, "", "Percentage of bookings where the baby crib was used.")
+    if sofa_bed_usage is not None:
+        add_metric("Sofa Bed usage (%)", "Sofa Bed usage (%)", sofa_bed_usage, "", "Percentage of bookings where the sofa bed was used.")
+
+    # ========== OPERATIONAL EFFICIENCY METRICS ==========
+    add_metric("Total Per-Stay Expenses (€)", "Total Per-Stay Expenses (€)", total_per_stay_expenses, "€ ", "Sum of all variable per-stay costs (transportation, laundry, consumables, bank fees, etc.).")
+    add_metric("Total Fixed Costs (€)", "Total Fixed Costs (€)", total_fixed_costs, "€ ", "Sum of all fixed monthly costs (electricity, water, property management fee, etc.) for the selected period.")
+    
+    if total_nights > 0:
+        avg_cost_per_night = total_per_stay_expenses / total_nights
+        add_metric("Average Cost per Night (€)", "Average Cost per Night (€)", avg_cost_per_night, "€ ", "Variable cost per booked night.")
+        if total_fixed_costs > 0:
+            fixed_cost_per_night = total_fixed_costs / total_nights
+            add_metric("Fixed Cost per Night (€)", "Fixed Cost per Night (€)", fixed_cost_per_night, "€ ", "Fixed cost allocation per booked night.")
+    
+    if reservations > 0 and total_fixed_costs > 0:
+        fixed_cost_per_reservation = total_fixed_costs / reservations
+        add_metric("Fixed Cost per Reservation (€)", "Fixed Cost per Reservation (€)", fixed_cost_per_reservation, "€ ", "Fixed cost allocation per booking.")
+    
+    if total_fixed_costs > 0:
+        variable_fixed_ratio = total_per_stay_expenses / total_fixed_costs
+        add_metric("Variable vs Fixed Cost Ratio", "Variable vs Fixed Cost Ratio", variable_fixed_ratio, "", "Ratio of variable to fixed costs (higher = more scalable).")
+    
+    if adr > 0 and nights_available > 0:
+        break_even_occupancy = (total_fixed_costs / (adr * nights_available)) * 100
+        add_metric("Break-even Occupancy (%)", "Break-even Occupancy (%)", break_even_occupancy, "", "Minimum occupancy needed to cover fixed costs.")
+        break_even_nights = total_fixed_costs / adr if adr > 0 else 0.0
+        add_metric("Break-even Nights", "Break-even Nights", break_even_nights, "", "Minimum nights needed to cover fixed costs.")
+    
+    # RevPAR and ADR - display together for comparison
+    add_metric("Revenue per Available Night (€)", "Revenue per Available Night (€) (RevPAR)", revpar, "€ ", "Revenue per available night (Total Revenue ÷ Nights Available - all days in period). Standard hotel metric showing revenue efficiency.")
+    add_metric("Average Daily Rate (€)", "Average Daily Rate (€) (ADR)", adr, "€ ", "Average revenue per booked night (Total Revenue ÷ Booked Nights - only occupied nights). Standard hotel metric showing average price per night.")
+
+    # ========== SEASONALITY & TRENDS METRICS ==========
+    add_metric("Best month by revenue", "Best month by revenue", best_month_label, "", "Month and year with the highest total revenue in the selected data.")
+    if best_month_profit_label != "N/A":
+        add_metric("Best Month by Profit (€)", "Best Month by Profit (€)", best_month_profit_label, "", "Month and year with the highest profit in the selected data.")
+    add_metric("Worst Month by Revenue (€)", "Worst Month by Revenue (€)", worst_month_label, "", "Month and year with the lowest revenue in the selected data.")
+    add_metric("Projected next-year revenue", "Projected next-year revenue", forecast_next_year, "€ ", "Simple projection: average monthly revenue × 12.")
+    if forecast_weighted > 0:
+        add_metric("Projected Next-Year Revenue (Weighted)", "Projected Next-Year Revenue (Weighted)", forecast_weighted, "€ ", "Weighted projection: recent 6 months × 0.6 + older months × 0.4, then × 12.")
+    if forecast_weighted > 0 and net_profit is not None and total_revenue > 0:
+        profit_margin_avg = (net_profit / total_revenue) * 100
+        forecast_profit = forecast_weighted * (profit_margin_avg / 100)
+        add_metric("Projected Next-Year Profit (€)", "Projected Next-Year Profit (€)", forecast_profit, "€ ", "Forecast profit based on weighted revenue projection and average profit margin.")
+    if mom_change is not None:
+        add_metric("Month-over-Month Revenue Change (%)", "Month-over-Month Revenue Change (%)", mom_change, "", "Percentage change in revenue from previous month.")
+    if yoy_change is not None:
+        add_metric("Year-over-Year Revenue Change (%)", "Year-over-Year Revenue Change (%)", yoy_change, "", "Percentage change in revenue compared to same period last year.")
+    if moving_avg_3m is not None:
+        add_metric("3-Month Moving Average Revenue (€)", "3-Month Moving Average Revenue (€)", moving_avg_3m, "€ ", "Average revenue over the last 3 months (smoothed trend).")
+    if seasonal_index is not None:
+        add_metric("Seasonal Index", "Seasonal Index", seasonal_index, "", "Average seasonal index across all months (100 = average, >100 = above average, <100 = below average).")
+
+    # ========== COST BREAKDOWN METRICS ==========
+    # Always show these metrics, even if reservations is 0 (will show 0.00)
+    if reservations > 0:
+        add_metric("Transportation Cost per Stay (€)", "Transportation Cost per Stay (€)", transportation_cost / reservations, "€ ", "Average transportation cost per booking.")
+        add_metric("Laundry Cost per Stay (€)", "Laundry Cost per Stay (€)", laundry_cost / reservations, "€ ", "Average laundry cost per booking.")
+        add_metric("Consumable Cost per Stay (€)", "Consumable Cost per Stay (€)", consumable_cost / reservations, "€ ", "Average consumable cost per booking.")
+        add_metric("Bank Fees per Stay (€)", "Bank Fees per Stay (€)", bank_fees / reservations, "€ ", "Average bank fees per booking.")
+    else:
+        # Show 0.00 if no reservations
+        add_metric("Transportation Cost per Stay (€)", "Transportation Cost per Stay (€)", 0.0, "€ ", "Average transportation cost per booking.")
+        add_metric("Laundry Cost per Stay (€)", "Laundry Cost per Stay (€)", 0.0, "€ ", "Average laundry cost per booking.")
+        add_metric("Consumable Cost per Stay (€)", "Consumable Cost per Stay (€)", 0.0, "€ ", "Average consumable cost per booking.")
+        add_metric("Bank Fees per Stay (€)", "Bank Fees per Stay (€)", 0.0, "€ ", "Average bank fees per booking.")
+
+    # ========== GUEST DEMOGRAPHICS METRICS ==========
+    # Note: These are stored as structured data, not simple values
+    # We'll handle them specially in the UI rendering
+    if top_countries_bookings:
+        countries_str = ", ".join([f"{c['Country']} ({c['Bookings']})" for c in top_countries_bookings[:5]])
+        add_metric("Top Countries by Bookings", "Top Countries by Bookings", countries_str, "", "Top 5 countries by number of bookings.")
+    if top_countries_revenue:
+        countries_str = ", ".join([f"{c['Country']} (€{c['TotalRevenue']:.0f})" for c in top_countries_revenue[:5]])
+        add_metric("Top Countries by Revenue", "Top Countries by Revenue", countries_str, "", "Top 5 countries by total revenue.")
+
+    if wanted is not None:
+        metric_info = {key: info for key, info in metric_info.items() if key in wanted}
+    return metric_info
+
+
+# ========== METRICS CONFIGURATION ==========
+
+# Define metric sections and their order
+METRIC_SECTIONS = {
+    "Custom": [],  # User-defined favorites (populated via session state)
+    "Core Financial & Occupancy": [
+        "Reservations",
+        "Total nights",
+        "Occupancy (%)",
+        "Total revenue (€)",
+        "Net Profit (€)",
+        "Average price per night (€)",
+        "Average stay (nights)",
+        "Average Monthly Gross Income (€)",
+        "Average Monthly Net Income (€)",
+    ],
+    "Profitability": [
+        "Profit Margin (%)",
+        "Cost per Reservation (€)",
+        "Profit per Night (€)",
+        "Profit per Stay (€)",
+        "Net Income per Night Before Fixed (€)",
+        "Net Income per Stay Before Fixed (€)",
+        "Cost Percentage of Revenue (%)",
+        "Fixed Cost Percentage of Revenue (%)",
+    ],
+    "Platform Performance": [
+        "Airbnb revenue (€)",
+        "Booking.com revenue (€)",
+        "Airbnb share of revenue (%)",
+        "Booking.com share of revenue (%)",
+        "Airbnb nights",
+        "Booking.com nights",
+        "Airbnb ADR (€)",
+        "Booking.com ADR (€)",
+        "Airbnb Occupancy (%)",
+        "Booking.com Occupancy (%)",
+        "Airbnb RevPAR (€)",
+        "Booking.com RevPAR (€)",
+        "Platform Profitability Difference (€)",
+        "Average Stay Length by Platform (nights)",
+        "Platform Revenue per Reservation (€)",
+        "Platform Cost per Reservation (€)",
+        "Platform Mix (%)",
+        "Revenue Concentration Risk (%)",
+    ],
+    "Guest Behavior": [
+        "Average group size",
+        "Average Revenue per Stay (€)",
+        "Average Cost per Stay (€)",
+        "Average Guests per Booking by Platform",
+        "Parking Usage (%)",
+        "Revenue per Guest (€)",
+        "Baby Crib usage (%)",
+        "Sofa Bed usage (%)",
+    ],
+    "Operational Efficiency": [
+        "Total Per-Stay Expenses (€)",
+        "Total Fixed Costs (€)",
+        "Average Cost per Night (€)",
+        "Fixed Cost per Night (€)",
+        "Fixed Cost per Reservation (€)",
+        "Variable vs Fixed Cost Ratio",
+        "Break-even Occupancy (%)",
+        "Break-even Nights",
+        "Revenue per Available Night (€)",
+        "Average Daily Rate (€)",
+    ],
+    "Seasonality & Trends": [
+        "Best month by revenue",
+        "Best Month by Profit (€)",
+        "Worst Month by Revenue (€)",
+        "Projected next-year revenue",
+        "Projected Next-Year Revenue (Weighted)",
+        "Projected Next-Year Profit (€)",
+        "Month-over-Month Revenue Change (%)",
+        "Year-over-Year Revenue Change (%)",
+        "3-Month Moving Average Revenue (€)",
+        "Seasonal Index",
+    ],
+    "Cost Breakdown": [
+        "Transportation Cost per Stay (€)",
+        "Laundry Cost per Stay (€)",
+        "Consumable Cost per Stay (€)",
+        "Bank Fees per Stay (€)",
+    ],
+    "Guest Demographics": [
+        "Top Countries by Bookings",
+        "Top Countries by Revenue",
+        "Average Revenue by Country (€)",
+        "Average Stay Length by Country (nights)",
+    ],
+}
+
+# Every metric calculate_all_metrics can report, in section order.
+# Static - used to pick metrics (e.g. for report templates) without computing anything.
+METRIC_CATALOG = [
+    key
+    for section, keys in METRIC_SECTIONS.items()
+    if section != "Custom"
+    for key in keys
+    if key in METRIC_INFO
+]
+
+# Section display names with icons
+SECTION_DISPLAY_NAMES = {
+    "Custom": "⭐ Custom Metrics",
+    "Core Financial & Occupancy": "💰 Core Financial & Occupancy",
+    "Profitability": "📈 Profitability",
+    "Platform Performance": "📊 Platform Performance",
+    "Guest Behavior": "👥 Guest Behavior",
+    "Operational Efficiency": "⚙️ Operational Efficiency",
+    "Seasonality & Trends": "📅 Seasonality & Trends",
+    "Cost Breakdown": "💸 Cost Breakdown",
+    "Guest Demographics": "🌍 Guest Demographics",
+}
+
+
+# ========== METRIC SEARCH ==========
+
+# How much a query word counts when found in each field of a metric
+SEARCH_FIELD_WEIGHTS = {"label": 8.0, "section": 3.0, "formula": 2.0, "description": 1.5, "insight": 1.0}
+SEARCH_PREFIX_FACTOR = 0.6  # a word only matching the start of a longer word
+
+
+def _search_words(text: str) -> list[str]:
+    """Lowercase words, plus the unit symbols so "%" and "€" can be searched for."""
+    return re.findall(r"[0-9a-z]+|[%€]", text.lower())
+
+
+class MetricSearchIndex:
+    """
+    In-memory search over the metric catalog: labels, section names and the
+    METRIC_INFO formula, description and insight text. Built once; a query is
+    a few dictionary and bisect lookups.
+
+    Every query word must match a word of the metric, exactly or as its
+    prefix ("occ" finds "Occupancy"). Metrics are ranked by the weighted
+    fields they matched in, labels first, then by catalog order.
+    """
+
+    def __init__(self, sections: dict, info: dict, section_names: Optional[dict] = None):
+        self.section_of: dict[str, str] = {}
+        self._labels: dict[str, str] = {}
+        postings: dict[str, dict[str, float]] = {}
+        for section, keys in sections.items():
+            section_text = f"{section} {(section_names or {}).get(section, '')}"
+            for key in keys:
+                if key in self.section_of:
+                    continue
+                self.section_of[key] = section
+                self._labels[key] = key.lower()
+                metric = info.get(key, {})
+                fields = {
+                    "label": key,
+                    "section": section_text,
+                    "formula": metric.get("formula", ""),
+                    "description": metric.get("description", ""),
+                    "insight": metric.get("insight", ""),
+                }
+                for field, text in fields.items():
+                    weight = SEARCH_FIELD_WEIGHTS[field]
+                    for word in set(_search_words(text)):
+                        scores = postings.setdefault(word, {})
+                        scores[key] = max(scores.get(key, 0.0), weight)
+        self._postings = postings
+        self._words = sorted(postings)
+        self._order = {key: position for position, key in enumerate(self.section_of)}
+
+    def _word_scores(self, word: str) -> dict[str, float]:
+        """Best score per metric for one query word: exact word matches, then longer words it starts."""
+        scores = dict(self._postings.get(word, {}))
+        start = bisect.bisect_left(self._words, word)
+        for candidate in self._words[start:bisect.bisect_right(self._words, word + "\uffff")]:
+            if candidate == word:
+                continue
+            for key, weight in self._postings[candidate].items():
+                scores[key] = max(scores.get(key, 0.0), weight * SEARCH_PREFIX_FACTOR)
+        return scores
+
+    @lru_cache(maxsize=512)
+    def search(self, query: str) -> tuple[str, ...]:
+        """Metric keys matching every word of `query`, best first (empty for an empty query)."""
+        words = _search_words(query)
+        if not words:
+            return ()
+        totals: Optional[dict[str, float]] = None
+        for word in words:
+            scores = self._word_scores(word)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {key: total + scores[key] for key, total in totals.items() if key in scores}
+            if not totals:
+                return ()
+        phrase = " ".join(words)
+        for key in totals:
+            # The label starting with (or containing) the whole query ranks first
+            label = " ".join(_search_words(self._labels[key]))
+            if label.startswith(phrase):
+                totals[key] += 10.0
+            elif phrase in label:
+                totals[key] += 5.0
+        return tuple(sorted(totals, key=lambda key: (-totals[key], self._order[key])))
+
+
+# Built once at import; the metric catalog does not change at runtime
+METRIC_SEARCH_INDEX = MetricSearchIndex(
+    {section: keys for section, keys in METRIC_SECTIONS.items() if section != "Custom"},
+    METRIC_INFO,
+    SECTION_DISPLAY_NAMES,
+)
+
+
+# ========== PERIOD FILTERS ==========
+
+def filter_bookings_by_period(
+    bookings: pd.DataFrame,
+    period_type: str,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """Filter bookings based on period type and parameters."""
+    df = clean_bookings(bookings.copy())
+    
+    if period_type == "month_year" and year is not None and month is not None:
+        df = df[
+            (df["Check-in Year"] == year) & (df["Check-in Month"] == month)
+        ]
+    elif period_type == "date_range" and start_date is not None and end_date is not None:
+        df = df[
+            (df["Check-in date"] >= pd.to_datetime(start_date)) &
+            (df["Check-in date"] <= pd.to_datetime(end_date))
+        ]
+    elif period_type == "year" and year is not None:
+        df = df[df["Check-in Year"] == year]
+    
+    return df
+
+
+def filter_monthly_costs_by_period(
+    monthly_costs: pd.DataFrame,
+    period_type: str,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    Filter monthly_costs based on period type and parameters.
+    
+    For month_year: filter by year AND month
+    For year: filter by year only (all months in that year)
+    For date_range: filter by months that fall within the date range
+    For no filter: return all monthly costs
+    """
+    df = monthly_costs.copy()
+    
+    # Find the month column (could be "Month", "Month (number)", etc.)
+    month_col = None
+    for col in df.columns:
+        if "month" in col.lower() and "name" not in col.lower():
+            month_col = col
+            break
+    
+    if period_type == "month_year" and year is not None and month is not None:
+        # Filter by both year AND month for monthly reports
+        if month_col:
+            df = df[
+                (df["Year"] == year) & 
+                (df[month_col] == month)
+            ]
+        else:
+            # Fallback: if no month column found, filter by year only
+            df = df[df["Year"] == year]
+    
+    elif period_type == "year" and year is not None:
+        # For yearly reports, filter by year only (all months in that year)
+        df = df[df["Year"] == year]
+    
+    elif period_type == "date_range" and start_date is not None and end_date is not None:
+        # For date range, filter by months that fall within the date range
+        start_dt = pd.to_datetime(start_date)
+        end_dt = pd.to_datetime(end_date)
+        
+        # Create a mask for months that fall within the date range
+        mask = pd.Series([False] * len(df), index=df.index)
+        
+        if month_col and "Year" in df.columns:
+            # Check each row to see if its year-month falls within the date range
+            for idx, row in df.iterrows():
+                try:
+                    year_val = int(row["Year"])
+                    month_val = int(row[month_col])
+                    # Create a date for the first day of this month
+                    month_date = pd.to_datetime(f"{year_val}-{month_val:02d}-01")
+                    # Check if this month falls within the date range
+                    if start_dt <= month_date <= end_dt:
+                        mask.loc[idx] = True
+                except (ValueError, TypeError):
+                    continue
+        
+        df = df[mask]
+    
+    # If no filter or invalid parameters, return all monthly costs
+    return df
+
+
+def resolve_period(
+    bookings: pd.DataFrame,
+    monthly_costs: pd.DataFrame,
+    period_type: Optional[str] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> dict:
+    """
+    Apply a Dashboard-style period selection to the raw frames.
+    
+    Args:
+        bookings: All bookings
+        monthly_costs: All monthly costs
+        period_type: "year", "month_year", "date_range", or None for all data
+        year, month, start_date, end_date: Period parameters for the chosen type
+    
+    Returns:
+        dict with bookings_filtered, monthly_costs_filtered, nights_available,
+        selected_year_int, period_start and period_end - ready for calculate_all_metrics
+    """
+    if period_type == "date_range" and start_date is not None and end_date is not None:
+        bookings_filtered = filter_bookings_by_period(bookings, "date_range", start_date=start_date, end_date=end_date)
+        return {
+            "bookings_filtered": bookings_filtered,
+            "monthly_costs_filtered": filter_monthly_costs_by_period(monthly_costs, "date_range", start_date=start_date, end_date=end_date),
+            "nights_available": compute_nights_available(bookings_filtered, None, "date_range", start_date=start_date, end_date=end_date),
+            "selected_year_int": None,
+            "period_start": pd.Timestamp(start_date),
+            "period_end": pd.Timestamp(end_date),
+        }
+
+    if period_type == "month_year" and year is not None and month is not None:
+        period_start, period_end = get_month_range(year, month)
+        bookings_filtered = filter_bookings_by_period(bookings, "month_year", year=year, month=month)
+        return {
+            "bookings_filtered": bookings_filtered,
+            "monthly_costs_filtered": filter_monthly_costs_by_period(monthly_costs, "month_year", year=year, month=month),
+            "nights_available": compute_nights_available(bookings_filtered, year, "month_year", month=month),
+            "selected_year_int": year,
+            "period_start": period_start,
+            "period_end": period_end,
+        }
+
+    if period_type == "year" and year is not None:
+        period_start, period_end = get_year_range(year)
+        bookings_filtered = filter_bookings_by_period(bookings, "year", year=year)
+        return {
+            "bookings_filtered": bookings_filtered,
+            "monthly_costs_filtered": filter_monthly_costs_by_period(monthly_costs, "year", year=year),
+            "nights_available": compute_nights_available(bookings_filtered, year, "year"),
+            "selected_year_int": year,
+            "period_start": period_start,
+            "period_end": period_end,
+        }
+
+    # "All" selected
+    return {
+        "bookings_filtered": bookings,
+        "monthly_costs_filtered": monthly_costs,
+        "nights_available": compute_nights_available(bookings, None),
+        "selected_year_int": None,
+        "period_start": None,
+        "period_end": None,
+    }
+
+
+# ========== BOOKINGS EDITOR WINDOW ==========
+
+def bookings_window(
+    bookings: pd.DataFrame,
+    years: tuple = (),
+    platforms: tuple = (),
+    guest: str = "",
+    page: int = 1,
+    page_size: int = 50,
+) -> tuple[pd.DataFrame, int]:
+    """
+    The page of bookings the editor shows: rows matching the check-in years,
+    platforms and guest name search (empty = no filter), `page_size` rows per
+    page. The index is kept, so each row still carries its booking id.
+
+    Returns (page rows, number of matching rows).
+    """
+    mask = pd.Series(True, index=bookings.index)
+    if years and "Check-in date" in bookings.columns:
+        mask &= pd.to_datetime(bookings["Check-in date"], errors="coerce").dt.year.isin(years)
+    if platforms and "Platform" in bookings.columns:
+        mask &= bookings["Platform"].isin(platforms)
+    if guest.strip() and "Guest Name" in bookings.columns:
+        mask &= bookings["Guest Name"].fillna("").astype(str).str.contains(guest.strip(), case=False, regex=False)
+    matches = bookings[mask]
+    start = (max(page, 1) - 1) * page_size
+    return matches.iloc[start:start + page_size], len(matches)
+
+
+def merge_bookings_window(bookings: pd.DataFrame, window_ids, edited: pd.DataFrame, id_column: str) -> pd.DataFrame:
+    """
+    Put an edited page back into the full bookings. `window_ids` are the
+    booking ids (index labels of `bookings`) the page showed and `edited` the
+    page after editing, with each row's id in `id_column` (empty for rows added
+    on the page). Edited rows replace their booking in place, shown bookings
+    missing from `edited` are removed and added rows are appended.
+    """
+    edited = edited.copy()
+    ids = pd.to_numeric(edited[id_column], errors="coerce")
+    edited = edited.drop(columns=[id_column])
+    kept = edited[ids.notna()].set_axis(ids[ids.notna()].astype(int), axis=0)
+    added = edited[ids.isna()]
+
+    # Ids are index labels, so sorting puts the edited rows back where they were
+    merged = pd.concat([bookings.drop(index=list(window_ids)), kept.reindex(columns=bookings.columns)]).sort_index()
+    return pd.concat([merged, added], ignore_index=True)
+
+
+# ========== EDITOR DIFFS ==========
+
+def frame_edits(base: pd.DataFrame, edited: pd.DataFrame, ignore=()) -> dict:
+    """
+    What an editor changed in `base`, small enough to keep in session state:
+    {"changed": {label: row}, "deleted": [labels], "added": [rows]} with each
+    row a {column: value} dict. Rows are matched by index label, which
+    st.data_editor keeps for existing rows and continues for added ones.
+    Columns in `ignore` (calculated ones) do not count as a change.
+    """
+    columns = [column for column in base.columns if column not in ignore]
+    common = edited.index.intersection(base.index)
+    old = base.loc[common, columns]
+    new = edited.reindex(index=common, columns=columns)
+    same = old.eq(new) | (old.isna() & new.isna())
+    changed = common[~same.all(axis=1).to_numpy()]
+    return {
+        "changed": edited.loc[changed].to_dict("index"),
+        "deleted": base.index.difference(edited.index).tolist(),
+        "added": edited[~edited.index.isin(base.index)].to_dict("records"),
+    }
+
+
+def apply_frame_edits(base: pd.DataFrame, edits: Optional[dict]) -> pd.DataFrame:
+    """`base` with frame_edits() applied: the editor's frame again, same index labels."""
+    if not edits or not any(edits.values()):
+        return base
+    changed = pd.DataFrame.from_dict(edits["changed"], orient="index").reindex(columns=base.columns)
+    added = pd.DataFrame(edits["added"]).reindex(columns=base.columns)
+    start = int(base.index.max()) + 1 if len(base) else 0
+    added.index = range(start, start + len(added))
+    kept = base.drop(index=list(edits["deleted"]) + list(edits["changed"]))
+    parts = [part for part in (kept, changed, added) if len(part)]
+    return pd.concat(parts).sort_index() if parts else base.iloc[:0]
+
+
+# ========== DATA QUALITY ==========
+
+# Rule -> (severity, description). Errors distort KPIs; warnings are stored
+# values that disagree with what they are calculated from.
+VALIDATION_RULES = {
+    "missing_check_in": ("error", "No check-in date - the stay is left out of every night and revenue total"),
+    "missing_check_out": ("error", "No check-out date - the stay counts no nights"),
+    "check_out_before_check_in": ("error", "Check-out is not after check-in - the stay counts no nights"),
+    "missing_revenue": ("error", "No revenue for the stay"),
+    "negative_amount": ("error", "Negative revenue or cost"),
+    "overlapping_stay": ("error", "Overlaps another stay in the apartment (double booking)"),
+    "missing_platform": ("warning", "No platform - left out of the platform views"),
+    "nights_mismatch": ("warning", "Nights does not match the check-in and check-out dates"),
+    "guests_mismatch": ("warning", "Total guests is not Adults + Children"),
+    "expenses_mismatch": ("warning", "Per-stay expenses is not the sum of the cost columns"),
+    "net_income_mismatch": ("warning", "Net income is not revenue minus per-stay expenses"),
+    "month_mismatch": ("warning", "Check-in Month / Year do not match the check-in date"),
+}
+VALIDATION_COLUMNS = ["Row", "Severity", "Rule", "Issue", "Check-in date", "Guest Name", "Platform", "Detail"]
+
+
+def _numeric(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    return pd.to_numeric(df[column], errors="coerce")
+
+
+def _mismatch(stored: pd.Series, expected: pd.Series, tolerance: float = 0.005) -> pd.Series:
+    """Rows where a stored value is present and differs from what it is calculated from."""
+    return stored.notna() & expected.notna() & ((stored - expected).abs() > tolerance)
+
+
+def validate_bookings(bookings: pd.DataFrame) -> pd.DataFrame:
+    """
+    Check every booking against VALIDATION_RULES in one pass of column-wide
+    operations, including a sorted sweep for overlapping stays.
+
+    Returns one row per finding (VALIDATION_COLUMNS), errors first. "Row" is
+    the booking's 1-based position in `bookings`, the "#" the bookings editor
+    shows for it.
+    """
+    df = bookings.reset_index(drop=True)
+    if df.empty or "Check-in date" not in df.columns:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS)
+
+    check_in = pd.to_datetime(df["Check-in date"], errors="coerce").dt.normalize()
+    check_out = (
+        pd.to_datetime(df["Check-out date"], errors="coerce").dt.normalize()
+        if "Check-out date" in df.columns else pd.Series(pd.NaT, index=df.index)
+    )
+    date_nights = (check_out - check_in).dt.days
+    revenue = _numeric(df, "Revenue for stay (€)")
+    costs = pd.concat([_numeric(df, column) for column in BOOKING_COST_COLUMNS], axis=1)
+    per_stay = _numeric(df, "Per-stay expenses (€)")
+    nights = _numeric(df, "Nights")
+    platform = df["Platform"] if "Platform" in df.columns else pd.Series(pd.NA, index=df.index)
+
+    def day(dates: pd.Series) -> pd.Series:
+        return dates.dt.strftime("%Y-%m-%d").fillna("")
+
+    def text(values: pd.Series) -> pd.Series:
+        return values.round(2).astype("string").fillna("")
+
+    # rule -> (mask, detail for the flagged rows or None); details are built
+    # for flagged rows only, which keeps clean data cheap
+    findings = {}
+
+    findings["missing_check_in"] = (
+        check_in.isna(),
+        lambda rows: ("Check-out " + day(check_out[rows])).where(check_out[rows].notna(), ""),
+    )
+    findings["missing_check_out"] = (check_in.notna() & check_out.isna(), None)
+    findings["check_out_before_check_in"] = (
+        check_in.notna() & check_out.notna() & (check_out <= check_in),
+        lambda rows: "Check-out " + day(check_out[rows]),
+    )
+    findings["missing_revenue"] = (revenue.isna(), None)
+    negative = (revenue < 0) | (costs < 0).any(axis=1)
+    findings["negative_amount"] = (negative, None)
+    findings["missing_platform"] = (platform.isna() | (platform.astype(str).str.strip() == ""), None)
+    findings["nights_mismatch"] = (
+        _mismatch(nights, date_nights.where(date_nights > 0)),
+        lambda rows: "Nights " + text(nights[rows]) + ", dates give " + text(date_nights[rows]),
+    )
+    findings["guests_mismatch"] = (
+        _mismatch(_numeric(df, "Total guests"), _numeric(df, "Adults") + _numeric(df, "Children").fillna(0)),
+        None,
+    )
+    expected_per_stay = costs.sum(axis=1, min_count=1)
+    findings["expenses_mismatch"] = (
+        _mismatch(per_stay, expected_per_stay),
+        lambda rows: "Stored " + text(per_stay[rows]) + ", costs add up to " + text(expected_per_stay[rows]),
+    )
+    findings["net_income_mismatch"] = (
+        _mismatch(_numeric(df, "Net Income Before Fixed Costs (€)"), revenue - per_stay.fillna(expected_per_stay)),
+        None,
+    )
+    findings["month_mismatch"] = (
+        _mismatch(_numeric(df, "Check-in Month"), check_in.dt.month.astype(float))
+        | _mismatch(_numeric(df, "Check-in Year"), check_in.dt.year.astype(float)),
+        None,
+    )
+
+    # Double bookings: sort stays by check-in; a stay overlaps an earlier one
+    # when it starts before the latest check-out seen so far. The partner is
+    # the stay holding that latest check-out.
+    stays = pd.DataFrame({"in": check_in, "out": check_out})
+    stays = stays[stays["in"].notna() & (stays["out"] > stays["in"])].sort_values(["in", "out"], kind="stable")
+    latest_out = stays["out"].cummax()
+    holder = pd.Series(stays.index, index=stays.index).where(stays["out"] >= latest_out).ffill()
+    overlapping = stays["in"] < latest_out.shift()
+    partner = holder.shift()[overlapping].astype(int)
+    overlap_mask = pd.Series(False, index=df.index)
+    overlap_mask[partner.index] = True
+
+    def overlap_detail(rows):
+        other = partner[rows].to_numpy()
+        guests = df["Guest Name"].astype(str).reindex(other).to_numpy() if "Guest Name" in df.columns else ""
+        return (
+            "Overlaps the stay of " + pd.Series(guests, index=rows) + " ("
+            + day(check_in[other]).to_numpy() + " to " + day(check_out[other]).to_numpy() + ")"
+        )
+
+    findings["overlapping_stay"] = (overlap_mask, overlap_detail)
+
+    frames = []
+    for rule, (mask, detail) in findings.items():
+        rows = mask[mask.fillna(False)].index
+        if not len(rows):
+            continue
+        severity, issue = VALIDATION_RULES[rule]
+        frames.append(pd.DataFrame({
+            "Row": rows + 1,
+            "Severity": severity,
+            "Rule": rule,
+            "Issue": issue,
+            "Check-in date": check_in[rows].to_numpy(),
+            "Guest Name": df["Guest Name"].reindex(rows).to_numpy() if "Guest Name" in df.columns else "",
+            "Platform": platform[rows].to_numpy(),
+            "Detail": detail(rows).to_numpy() if detail is not None else "",
+        }))
+    if not frames:
+        return pd.DataFrame(columns=VALIDATION_COLUMNS)
+    result = pd.concat(frames, ignore_index=True)
+    result["_order"] = result["Severity"].map({"error": 0, "warning": 1})
+    return result.sort_values(["_order", "Row"], kind="stable").drop(columns="_order").reset_index(drop=True)[VALIDATION_COLUMNS]
+
+
+# ========== TEXT SNAPSHOT ==========
+
+TRACKER_SHEETS = ("Bookings", "Monthly_Costs", "Toiletries")
+
+# Row order of each snapshot file (columns that are missing are skipped).
+# Toiletries has no key and keeps the order of the sheet.
+SNAPSHOT_SORT_KEYS = {
+    "Bookings": ["Check-in date", "Check-out date", "Platform", "Guest Name"],
+    "Monthly_Costs": ["Year", "MONTH"],
+}
+SNAPSHOT_DATE_COLUMNS = {
+    "Bookings": ["Check-in date", "Check-out date"],
+}
+
+
+def _canonical_frame(df: pd.DataFrame, sheet: str) -> pd.DataFrame:
+    df = df.copy()
+    for column in SNAPSHOT_DATE_COLUMNS.get(sheet, []):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_float_dtype(values):
+            present = values.dropna()
+            if len(present) and (present == present.round()).all():
+                df[column] = values.astype("Int64")
+    return df
+
+
+def snapshot_sheet_text(df: pd.DataFrame, sheet: str) -> str:
+    """
+    Canonical CSV text of one tracker sheet: rows sorted by the sheet's key,
+    dates as YYYY-MM-DD, whole-number floats written as integers and other
+    floats to 12 significant digits (Excel keeps 15), so the same data always
+    produces the same text whether it came from the workbook or from memory.
+    """
+    df = _canonical_frame(df, sheet)
+    keys = [column for column in SNAPSHOT_SORT_KEYS.get(sheet, []) if column in df.columns]
+    if keys:
+        df = df.sort_values(keys, kind="mergesort", na_position="last")
+    return df.to_csv(index=False, lineterminator="\n", date_format="%Y-%m-%d", float_format="%.12g")
+
+
+def tracker_snapshot_paths(snapshot_dir: Path = TRACKER_SNAPSHOT_DIR) -> list[Path]:
+    return [Path(snapshot_dir) / f"{sheet}.csv" for sheet in TRACKER_SHEETS]
+
+
+def write_tracker_snapshot(sheets: dict, snapshot_dir: Path = TRACKER_SNAPSHOT_DIR) -> list[Path]:
+    """Write the snapshot CSV of each sheet; files whose text is unchanged are left alone. Returns the files written."""
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for sheet, path in zip(TRACKER_SHEETS, tracker_snapshot_paths(snapshot_dir)):
+        text = snapshot_sheet_text(sheets[sheet], sheet)
+        if not path.is_file() or path.read_text(encoding="utf-8") != text:
+            path.write_text(text, encoding="utf-8", newline="\n")
+            written.append(path)
+    return written
+
+
+def read_tracker_snapshot(snapshot_dir: Path = TRACKER_SNAPSHOT_DIR) -> Optional[dict]:
+    """Sheets from the snapshot CSVs, or None if any of them is missing."""
+    paths = tracker_snapshot_paths(snapshot_dir)
+    if not all(path.is_file() for path in paths):
+        return None
+    sheets = {}
+    for sheet, path in zip(TRACKER_SHEETS, paths):
+        df = pd.read_csv(path, encoding="utf-8")
+        for column in SNAPSHOT_DATE_COLUMNS.get(sheet, []):
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], errors="coerce")
+        sheets[sheet] = df
+    return sheets
+
+
+def read_tracker_sheets(file_path: Path) -> dict:
+    """The tracker sheets exactly as stored in the workbook (no renaming or recalculation)."""
+    return pd.read_excel(file_path, sheet_name=list(TRACKER_SHEETS))
+
+
+def write_tracker_sheets(file_path: Path, sheets: dict) -> None:
+    """Replace the tracker sheets in the workbook, keeping any other sheets (e.g. Summary)."""
+    file_path = Path(file_path)
+    if file_path.is_file():
+        writer = pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="replace")
+    else:
+        writer = pd.ExcelWriter(file_path, engine="openpyxl")
+    with writer:
+        for sheet in TRACKER_SHEETS:
+            sheets[sheet].to_excel(writer, sheet_name=sheet, index=False)
+
+
+def sync_tracker_snapshot(
+    file_path: Path = FILE_PATH,
+    snapshot_dir: Path = TRACKER_SNAPSHOT_DIR,
+    snapshot_only: bool = False,
+) -> str:
+    """
+    Bring the workbook and its snapshot in line at startup.
+
+    With `snapshot_only` (only the CSVs are synced) or when the workbook is
+    missing, the snapshot is the source of truth and the workbook's tracker
+    sheets are rebuilt from it if they differ. Otherwise the workbook is the
+    source of truth and the snapshot is refreshed from it.
+
+    Returns "workbook" or "snapshot" for whichever was rewritten, "" if neither.
+    """
+    file_path = Path(file_path)
+    snapshot = read_tracker_snapshot(snapshot_dir)
+    if snapshot is not None and (snapshot_only or not file_path.is_file()):
+        if file_path.is_file():
+            workbook_sheets = read_tracker_sheets(file_path)
+            if all(
+                snapshot_sheet_text(workbook_sheets[sheet], sheet) == path.read_text(encoding="utf-8")
+                for sheet, path in zip(TRACKER_SHEETS, tracker_snapshot_paths(snapshot_dir))
+            ):
+                return ""
+        write_tracker_sheets(file_path, snapshot)
+        return "workbook"
+
+    if not file_path.is_file():
+        return ""
+    return "snapshot" if write_tracker_snapshot(read_tracker_sheets(file_path), snapshot_dir) else ""
+
+
+# ========== EDIT MERGING ==========
+
+# Rows are matched across versions by these columns (plus their occurrence
+# number when a key repeats)
+MERGE_KEYS = {
+    "Bookings": ["Check-in date", "Check-out date", "Platform", "Guest Name"],
+    "Monthly_Costs": ["Year", "MONTH"],
+    "Toiletries": ["Item"],
+}
+# Calculated from other columns: never a conflict on their own, recalculated
+# for rows that take changes from both sides
+MERGE_DERIVED_COLUMNS = {
+    "Bookings": ["Per-stay expenses (€)", "Net Income Before Fixed Costs (€)"],
+    "Monthly_Costs": ["Electricity (€)", "Water (€)", "Property Management Fee (€)", "Total Fixed Costs (€)"],
+    "Toiletries": ["Total (MKD)"],
+}
+MERGE_RECALC = {
+    "Bookings": recalc_booking_totals,
+    "Monthly_Costs": recalc_monthly_costs,
+    "Toiletries": recalc_toiletries,
+}
+
+
+class EditConflict(Exception):
+    """A save collided with changes someone else saved to the same cells."""
+
+    def __init__(self, sheet: str, conflicts: list[str]):
+        self.sheet = sheet
+        self.conflicts = conflicts
+        super().__init__(f"{sheet}: {len(conflicts)} conflicting row(s)")
+
+
+def _canonical_cells(df: pd.DataFrame, sheet: str) -> list[list[str]]:
+    """Each row as the strings snapshot_sheet_text would write for it (so 4 == 4.0, NaN == "")."""
+    text = _canonical_frame(df, sheet).to_csv(
+        index=False, header=False, lineterminator="\n", date_format="%Y-%m-%d", float_format="%.12g"
+    )
+    return list(csv.reader(io.StringIO(text)))
+
+
+def merge_sheet_edits(base: pd.DataFrame, mine: pd.DataFrame, theirs: pd.DataFrame, sheet: str) -> pd.DataFrame:
+    """
+    Three-way merge of one sheet. `base` is what we started editing from,
+    `mine` our edited copy and `theirs` what is saved now.
+
+    A row changed on one side only takes that side; a row changed on both sides
+    is merged cell by cell. Raises EditConflict listing every row where both
+    sides changed the same cell, or where one side edited a row the other
+    deleted.
+    """
+    columns = list(mine.columns) + [column for column in theirs.columns if column not in mine.columns]
+    frames = {
+        "base": base.reindex(columns=columns).reset_index(drop=True),
+        "mine": mine.reindex(columns=columns).reset_index(drop=True),
+        "theirs": theirs.reindex(columns=columns).reset_index(drop=True),
+    }
+    cells = {name: _canonical_cells(df, sheet) for name, df in frames.items()}
+    key_positions = [columns.index(column) for column in MERGE_KEYS.get(sheet, []) if column in columns]
+    derived = {columns.index(column) for column in MERGE_DERIVED_COLUMNS.get(sheet, []) if column in columns}
+    inputs = [i for i in range(len(columns)) if i not in derived]
+
+    def keyed(name: str) -> dict:
+        rows, seen = {}, {}
+        for position, row in enumerate(cells[name]):
+            key = tuple(row[i] for i in key_positions) if key_positions else tuple(row)
+            seen[key] = seen.get(key, 0) + 1
+            rows[key + (seen[key],)] = position
+        return rows
+
+    def same(a: list, b: list) -> bool:
+        return all(a[i] == b[i] for i in inputs)
+
+    base_rows, mine_rows, theirs_rows = keyed("base"), keyed("mine"), keyed("theirs")
+    merged_rows, mixed, conflicts = [], [], []
+    for key in list(theirs_rows) + [key for key in mine_rows if key not in theirs_rows]:
+        b, m, t = base_rows.get(key), mine_rows.get(key), theirs_rows.get(key)
+        bc = cells["base"][b] if b is not None else None
+        mc = cells["mine"][m] if m is not None else None
+        tc = cells["theirs"][t] if t is not None else None
+        label = " / ".join(part for part in key[:-1] if part) or f"row {key[-1]}"
+
+        if b is None:
+            # Added since the base - by us, by them, or by both
+            if mc is not None and tc is not None and not same(mc, tc):
+                conflicts.append(f"{label} (added on both sides with different values)")
+            else:
+                merged_rows.append(frames["theirs"].iloc[t] if t is not None else frames["mine"].iloc[m])
+        elif m is None and t is None:
+            continue
+        elif m is None:
+            if not same(tc, bc):
+                conflicts.append(f"{label} (deleted here, edited by someone else)")
+        elif t is None:
+            if not same(mc, bc):
+                conflicts.append(f"{label} (edited here, deleted by someone else)")
+        elif same(mc, bc):
+            merged_rows.append(frames["theirs"].iloc[t])
+        elif same(tc, bc) or same(mc, tc):
+            merged_rows.append(frames["mine"].iloc[m])
+        else:
+            row = frames["theirs"].iloc[t].copy()
+            clashes = []
+            for i in inputs:
+                if mc[i] == bc[i]:
+                    continue
+                if tc[i] not in (bc[i], mc[i]):
+                    clashes.append(columns[i])
+                else:
+                    row.iloc[i] = frames["mine"].iloc[m, i]
+            if clashes:
+                conflicts.append(f"{label} ({', '.join(clashes)})")
+            else:
+                mixed.append(len(merged_rows))
+                merged_rows.append(row)
+
+    if conflicts:
+        raise EditConflict(sheet, conflicts)
+
+    merged = pd.DataFrame(merged_rows, columns=columns).reset_index(drop=True).infer_objects()
+    for column in SNAPSHOT_DATE_COLUMNS.get(sheet, []):
+        if column in merged.columns:
+            merged[column] = pd.to_datetime(merged[column], errors="coerce")
+    if mixed and sheet in MERGE_RECALC:
+        merged.loc[mixed] = MERGE_RECALC[sheet](merged.loc[mixed].copy())
+    return merged
+
+
+# ========== JOURNAL ==========
+
+JOURNAL_COMPACT_SECONDS = 30.0  # background compaction interval
+
+
+def journal_path_for(file_path: Path) -> Path:
+    """Write-ahead journal kept next to the workbook ("<name>.journal.jsonl")."""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.journal.jsonl")
+
+
+def checkpoint_path_for(file_path: Path) -> Path:
+    """Records which journal entries the workbook already contains ("<name>.checkpoint.json")."""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.checkpoint.json")
+
+
+def tracker_file_signature(file_path: Path) -> tuple:
+    """(mtime, size) of the workbook, its journal and the FX rate table - changes on every save."""
+    stat = Path(file_path).stat()
+    journal = journal_path_for(file_path)
+    journal_stat = journal.stat() if journal.is_file() else None
+    return (
+        stat.st_mtime_ns,
+        stat.st_size,
+        journal_stat.st_mtime_ns if journal_stat else 0,
+        journal_stat.st_size if journal_stat else 0,
+        _fx_signature(FX_RATES_FILE),
+    )
+
+
+def _update_with_fx_version(digest) -> None:
+    """Euro amounts depend on the rate table, so its version is part of the data version."""
+    version = fx_rates_version()
+    if version != "default":
+        digest.update(f"fx:{version}".encode("utf-8"))
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return None if pd.isna(value) else value.isoformat()
+    if pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalar -> Python scalar
+    return value
+
+
+def _entry_frame(entry: dict) -> pd.DataFrame:
+    df = pd.DataFrame(entry["rows"], columns=entry["columns"])
+    for column in SNAPSHOT_DATE_COLUMNS.get(entry["sheet"], []):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    return df
+
+
+def _fsync_file(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Write to a temp file, fsync and rename over `path` - readers see the old or the new file, never half of one."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def sheet_row_patch(current: pd.DataFrame, new: pd.DataFrame, sheet: str) -> tuple[list, list]:
+    """
+    The rows to change to turn `current` into `new`, keeping row order:
+    (positions of the rows to delete from `current`, positions in `new` of the
+    rows to add). An edited row is one deletion plus one addition. Rows are
+    compared as snapshot text, so 4 == 4.0 and NaN == "".
+    """
+    old_rows = ["\x1f".join(row) for row in _canonical_cells(current, sheet)]
+    new_rows = ["\x1f".join(row) for row in _canonical_cells(new, sheet)]
+    deleted, added = [], []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_rows, new_rows, autojunk=False).get_opcodes():
+        if tag in ("replace", "delete"):
+            deleted.extend(range(i1, i2))
+        if tag in ("replace", "insert"):
+            added.extend(range(j1, j2))
+    return deleted, added
+
+
+def _apply_row_patch(df: pd.DataFrame, entry: dict, frame: pd.DataFrame) -> pd.DataFrame:
+    """A "patch_rows" entry on `df`: drop the deleted positions, insert the added rows where they go."""
+    kept = df.reset_index(drop=True).drop(index=entry["deleted"]).reset_index(drop=True)
+    added_at = set(entry["positions"])
+    kept_at = [position for position in range(len(kept) + len(frame)) if position not in added_at]
+    parts = [
+        part for part in (kept.set_axis(kept_at), frame.reindex(columns=df.columns).set_axis(entry["positions"]))
+        if len(part)
+    ]
+    return pd.concat(parts).sort_index().reset_index(drop=True) if parts else df.iloc[:0]
+
+
+def replay_journal(entries: list, bookings: pd.DataFrame, monthly_costs: pd.DataFrame, toiletries: pd.DataFrame):
+    """Apply journal entries, oldest first, on top of the checkpoint sheets."""
+    sheets = {"Bookings": bookings, "Monthly_Costs": monthly_costs, "Toiletries": toiletries}
+    bookings_touched = False
+    for entry in entries:
+        frame = _entry_frame(entry)
+        sheet = entry["sheet"]
+        if entry["op"] == "append_rows":
+            sheets[sheet] = pd.concat([sheets[sheet], frame], ignore_index=True)
+        elif entry["op"] == "replace_sheet":
+            sheets[sheet] = frame
+        elif entry["op"] == "patch_rows":
+            if sheet == "Bookings" and bookings_touched:
+                # Positions refer to the bookings as loaded at save time, which were sorted
+                sheets[sheet] = sort_bookings(clean_bookings(sheets[sheet]))
+            sheets[sheet] = _apply_row_patch(sheets[sheet], entry, frame)
+        bookings_touched = bookings_touched or sheet == "Bookings"
+    if bookings_touched:
+        sheets["Bookings"] = sort_bookings(clean_bookings(sheets["Bookings"]))
+    return sheets["Bookings"], sheets["Monthly_Costs"], sheets["Toiletries"]
+
+
+class FileLock:
+    """
+    Exclusive lock on a file shared by every process on the machine (flock on
+    POSIX, msvcrt on Windows). Used as a context manager around writes only.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s; keep waiting
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class TrackerJournal:
+    """
+    Append-only, fsync'd log of tracker edits on top of the workbook.
+
+    A save appends one JSON line instead of rewriting the xlsx: a new booking,
+    or the rows an edit deleted and added (an edited row is both). The line
+    grows with the size of the change, not of the workbook, and a crash can at
+    worst lose a half-written last line, which is ignored on read. Working out
+    that change (and merging with other saves) still reads the current data. The workbook is the checkpoint: load()
+    replays the journal over it, and compact() folds the journal into the
+    workbook and its CSV snapshot, then trims the folded entries.
+
+    The checkpoint file stores the last folded entry together with the hash of
+    the workbook it went into, so an interrupted compaction never applies an
+    entry twice or loses one.
+
+    Writers (appends, the compaction swap) take a cross-process file lock;
+    readers take no lock and retry if the workbook was swapped under them.
+    """
+
+    def __init__(self, file_path: Path = FILE_PATH, snapshot_dir: Path = TRACKER_SNAPSHOT_DIR):
+        self.file_path = Path(file_path)
+        self.snapshot_dir = Path(snapshot_dir)
+        self.journal_path = journal_path_for(self.file_path)
+        self.checkpoint_path = checkpoint_path_for(self.file_path)
+        self.lock_path = self.file_path.with_name(f"{self.file_path.stem}.journal.lock")
+        self.compact_lock_path = self.file_path.with_name(f"{self.file_path.stem}.compact.lock")
+        self.last_compacted_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._base: Optional[tuple] = None  # (workbook signature, workbook hash object, sheets, FX rates version)
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+    # ----- reading -----
+
+    @staticmethod
+    def _parse_entries(data: bytes) -> list:
+        entries = []
+        for line in data.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn line from a crash mid-append
+        return entries
+
+    def entries(self) -> list:
+        if not self.journal_path.is_file():
+            return []
+        return self._parse_entries(self.journal_path.read_bytes())
+
+    def _checkpoint(self) -> dict:
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {"seq": 0, "workbook": None}
+
+    def _base_sheets(self) -> tuple:
+        """(signature, hash object, normalized sheets) of the workbook - re-read when the file or the FX rates change."""
+        stat = self.file_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            fx_version = fx_rates_version()
+            if self._base is None or self._base[0] != signature or self._base[3] != fx_version:
+                content = self.file_path.read_bytes()
+                self._base = (signature, hashlib.sha256(content), read_tracker(self.file_path), fx_version)
+            return self._base[:3]
+
+    def _read_state(self) -> tuple[str, tuple, list, int]:
+        """
+        One consistent view of the tracker: (version, checkpoint sheets, pending
+        entries, last sequence number). Retried if a compaction swaps the
+        workbook while the journal is being read.
+        """
+        while True:
+            signature, digest, sheets = self._base_sheets()
+            checkpoint = self._checkpoint()
+            journal = self.journal_path.read_bytes() if self.journal_path.is_file() else b""
+            stat = self.file_path.stat()
+            if (stat.st_mtime_ns, stat.st_size) == signature:
+                break
+
+        digest = digest.copy()
+        # Entries up to the checkpoint are in the workbook - unless the workbook
+        # on disk is not the one the checkpoint was written for
+        folded = checkpoint["seq"] if checkpoint.get("workbook") == digest.hexdigest() else 0
+        digest.update(journal)
+        _update_with_fx_version(digest)
+        entries = self._parse_entries(journal)
+        last_seq = max([checkpoint["seq"]] + [entry["seq"] for entry in entries])
+        return digest.hexdigest()[:16], sheets, [entry for entry in entries if entry["seq"] > folded], last_seq
+
+    def load_versioned(self) -> tuple[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+        """(version, (bookings, monthly_costs, toiletries)); version matches tracker_content_hash()."""
+        version, sheets, pending, _ = self._read_state()
+        return version, replay_journal(pending, *(df.copy() for df in sheets))
+
+    def load(self) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Current (bookings, monthly_costs, toiletries): the workbook with the journal replayed over it."""
+        return self.load_versioned()[1]
+
+    # ----- writing -----
+
+    def _last_seq(self) -> int:
+        """
+        Sequence number of the newest entry, from the end of the journal (the
+        last complete line) or from the checkpoint when the journal is empty;
+        the journal is not parsed as a whole.
+        """
+        last_seq = self._checkpoint()["seq"]
+        if not self.journal_path.is_file():
+            return last_seq
+        with open(self.journal_path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            chunk, tail = 4096, b""
+            while end > 0:
+                start = max(end - chunk, 0)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+                # Complete lines are the ones after a newline (or starting the file)
+                lines = tail.splitlines()
+                for line in reversed(lines if start == 0 else lines[1:]):
+                    try:
+                        return max(last_seq, json.loads(line)["seq"])
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # torn line from a crash mid-append
+                chunk *= 2
+        return last_seq
+
+    def _append_locked(self, seq: int, op: str, sheet: str, df: pd.DataFrame, **fields) -> None:
+        entry = {
+            "seq": seq,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "op": op,
+            "sheet": sheet,
+            **fields,
+            "columns": [str(column) for column in df.columns],
+            "rows": [[_json_value(value) for value in row] for row in df.itertuples(index=False, name=None)],
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            if os.fstat(fd).st_size and os.lseek(fd, -1, os.SEEK_END) >= 0 and os.read(fd, 1) != b"\n":
+                line = b"\n" + line  # end a line torn by an earlier crash
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def append(self, op: str, sheet: str, df: pd.DataFrame) -> int:
+        """Durably record one edit ("append_rows" or "replace_sheet"); returns its sequence number."""
+        with self._lock, FileLock(self.lock_path):
+            last_seq = self._last_seq()
+            self._append_locked(last_seq + 1, op, sheet, df)
+            return last_seq + 1
+
+    def append_unique(self, sheet: str, df: pd.DataFrame, keys: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Append the rows of `df` that are not in the sheet yet, as a single
+        journal entry. `keys` maps a frame to one or more key columns; a row is
+        left out when any of its keys is already in the sheet. The check and the
+        append happen under the write lock, so two imports of the same file
+        cannot both add a row. Returns the rows that were appended.
+        """
+        with self._lock, FileLock(self.lock_path):
+            _, checkpoint_sheets, pending, last_seq = self._read_state()
+            current = dict(zip(TRACKER_SHEETS, replay_journal(pending, *(frame.copy() for frame in checkpoint_sheets))))
+            existing = set(pd.unique(keys(current[sheet]).to_numpy().ravel())) - {None}
+            new_rows = df[~keys(df).isin(existing).any(axis=1).to_numpy()]
+            if len(new_rows):
+                self._append_locked(last_seq + 1, "append_rows", sheet, new_rows)
+            return new_rows
+
+    def save_sheets(
+        self,
+        sheets: dict,
+        base_version: Optional[str] = None,
+        base_sheets: Optional[dict] = None,
+    ) -> list[str]:
+        """
+        Record new contents for some sheets, optimistically.
+
+        `base_version` / `base_sheets` are the data the caller started editing
+        from. If someone else saved since then, each sheet they changed is
+        three-way merged (base, ours, theirs) with merge_sheet_edits, which
+        raises EditConflict when both sides changed the same cell. Without a
+        base version the save simply replaces the sheets. Each changed sheet is
+        journaled as the rows it lost and gained (see sheet_row_patch).
+
+        Returns the names of the sheets that had to be merged.
+        """
+        merged = []
+        with self._lock, FileLock(self.lock_path):
+            version, checkpoint_sheets, pending, last_seq = self._read_state()
+            current = dict(zip(TRACKER_SHEETS, replay_journal(pending, *(df.copy() for df in checkpoint_sheets))))
+
+            if base_version is not None and version != base_version:
+                for sheet, base in (base_sheets or {}).items():
+                    if sheet not in sheets:
+                        continue
+                    if snapshot_sheet_text(current[sheet], sheet) == snapshot_sheet_text(base, sheet):
+                        continue  # nobody else touched this sheet
+                    sheets[sheet] = merge_sheet_edits(base, sheets[sheet], current[sheet], sheet)
+                    merged.append(sheet)
+
+            for sheet, df in sheets.items():
+                if snapshot_sheet_text(df, sheet) == snapshot_sheet_text(current[sheet], sheet):
+                    continue
+                last_seq += 1
+                if [str(column) for column in df.columns] != [str(column) for column in current[sheet].columns]:
+                    # Different columns: there are no rows to match, record the whole sheet
+                    self._append_locked(last_seq, "replace_sheet", sheet, df)
+                    continue
+                deleted, added = sheet_row_patch(current[sheet], df, sheet)
+                self._append_locked(
+                    last_seq, "patch_rows", sheet, df.iloc[added], deleted=deleted, positions=added
+                )
+        return merged
+
+    def compact(self) -> int:
+        """Fold pending entries into the workbook and CSV snapshot; returns how many were folded."""
+        with self._compact_lock, FileLock(self.compact_lock_path):
+            _, sheets, pending, _ = self._read_state()
+            if not pending:
+                with self._lock, FileLock(self.lock_path):
+                    self._trim(self._checkpoint()["seq"])
+                return 0
+            bookings, monthly_costs, toiletries = replay_journal(pending, *(df.copy() for df in sheets))
+            last_seq = pending[-1]["seq"]
+            folded = {"Bookings": bookings, "Monthly_Costs": monthly_costs, "Toiletries": toiletries}
+
+            # Build the new workbook beside the old one; saves keep appending meanwhile
+            tmp_path = self.file_path.with_name(f".{self.file_path.name}.tmp")
+            shutil.copyfile(self.file_path, tmp_path)
+            write_tracker_sheets(tmp_path, folded)
+            _fsync_file(tmp_path)
+            new_hash = hashlib.sha256(tmp_path.read_bytes()).hexdigest()
+
+            with self._lock, FileLock(self.lock_path):
+                # Checkpoint first: until the rename below it names a workbook that
+                # does not exist yet, so readers still replay everything
+                _write_file_atomic(
+                    self.checkpoint_path,
+                    json.dumps({"seq": last_seq, "workbook": new_hash}).encode("utf-8"),
+                )
+                os.replace(tmp_path, self.file_path)
+                self._trim(last_seq)
+            write_tracker_snapshot(folded, self.snapshot_dir)
+            self.last_compacted_at = datetime.now()
+            return len(pending)
+
+    def _trim(self, folded_seq: int) -> None:
+        """Drop journal entries that are already in the workbook."""
+        entries = self.entries()
+        if not any(entry["seq"] <= folded_seq for entry in entries):
+            return
+        remaining = [entry for entry in entries if entry["seq"] > folded_seq]
+        if remaining:
+            _write_file_atomic(
+                self.journal_path,
+                "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in remaining).encode("utf-8"),
+            )
+        else:
+            self.journal_path.unlink()
+
+    # ----- background compaction -----
+
+    def start_background_compaction(self, interval: float = JOURNAL_COMPACT_SECONDS) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                    self.last_error = None
+                except Exception as exc:
+                    self.last_error = str(exc)
+
+        self._compactor = threading.Thread(target=run, name="lynx-journal-compaction", daemon=True)
+        self._compactor.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def load_tracker(file_path: Path = FILE_PATH):
+    """Current tracker data: the workbook plus any journaled edits not yet compacted into it."""
+    return TrackerJournal(file_path).load()
+
+
+# ========== WARM ENGINE ==========
+
+def tracker_content_hash(file_path: Path) -> str:
+    """Short SHA-256 of the workbook, its pending journal and the FX rates - identifies one version of the tracker data."""
+    digest = hashlib.sha256(Path(file_path).read_bytes())
+    journal = journal_path_for(file_path)
+    if journal.is_file():
+        digest.update(journal.read_bytes())
+    _update_with_fx_version(digest)
+    return digest.hexdigest()[:16]
+
+
+class MetricsEngine:
+    """
+    Long-lived, thread-safe holder of the tracker data and of everything computed from it.
+    
+    The workbook (plus its edit journal) is read once and re-read only when its
+    modification time or size changes (checked at most every `check_interval` seconds). Results are memoized
+    per (data version, request), and concurrent callers asking for the same result
+    wait for a single computation instead of repeating it.
+    
+    Every public method returns (version, result) so callers can tag responses
+    with the exact data version they were computed from.
+    """
+
+    def __init__(self, file_path: Path = FILE_PATH, check_interval: float = 1.0, max_results: int = 256):
+        self.file_path = Path(file_path)
+        self.check_interval = check_interval
+        self.max_results = max_results
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+        self._bookings: Optional[pd.DataFrame] = None
+        self._monthly_costs: Optional[pd.DataFrame] = None
+        self._toiletries: Optional[pd.DataFrame] = None
+        self._signature: Optional[tuple] = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self._results: OrderedDict = OrderedDict()
+        self._pending: dict = {}
+
+    def refresh(self) -> str:
+        """Reload the workbook if it changed on disk; return the current data version."""
+        with self._lock:
+            now = time.monotonic()
+            if self.version is not None and now - self._last_check < self.check_interval:
+                return self.version
+            self._last_check = now
+
+            signature = tracker_file_signature(self.file_path)
+            if signature == self._signature:
+                return self.version
+
+            version = tracker_content_hash(self.file_path)
+            if version != self.version:
+                self._bookings, self._monthly_costs, self._toiletries = load_tracker(self.file_path)
+                self.version = version
+                self.loaded_at = datetime.now()
+                self._results.clear()
+            self._signature = signature
+            return self.version
+
+    def snapshot(self) -> tuple[str, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Return (version, bookings, monthly_costs, toiletries) as one consistent set."""
+        with self._lock:
+            version = self.refresh()
+            return version, self._bookings, self._monthly_costs, self._toiletries
+
+    def _cached(self, name: str, params: dict, compute) -> tuple[str, Any]:
+        version, bookings, monthly_costs, toiletries = self.snapshot()
+        key = (version, name, tuple(sorted(params.items())))
+
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return version, self._results[key]
+            key_lock = self._pending.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                with self._lock:
+                    if key in self._results:
+                        return version, self._results[key]
+
+                # Compute outside the engine lock so unrelated requests are not serialized
+                value = compute(bookings, monthly_costs, toiletries)
+
+                with self._lock:
+                    self._results[key] = value
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+            finally:
+                # Also when compute raises, so a failing key does not keep its lock forever
+                with self._lock:
+                    if self._pending.get(key) is key_lock:
+                        del self._pending[key]
+        return version, value
+
+    def metrics(self, view_mode: str = "Overall", **period) -> tuple[str, dict[str, dict]]:
+        """calculate_all_metrics for a view mode and a resolve_period() selection."""
+        def compute(bookings, monthly_costs, _toiletries):
+            selection = resolve_period(bookings, monthly_costs, **period)
+            return calculate_all_metrics(
+                selection["bookings_filtered"],
+                selection["monthly_costs_filtered"],
+                view_mode,
+                selection["nights_available"],
+                selection["selected_year_int"],
+                start_date=selection["period_start"],
+                end_date=selection["period_end"],
+                bookings_all=bookings,
+            )
+
+        return self._cached("metrics", {"view_mode": view_mode, **period}, compute)
+
+    def monthly_cube(self, view_mode: str = "Overall", **period) -> tuple[str, dict[str, pd.DataFrame]]:
+        """Monthly chart data (CHART_METRIC_KEYS) for a view mode and period selection."""
+        def compute(bookings, monthly_costs, _toiletries):
+            selection = resolve_period(bookings, monthly_costs, **period)
+            return {
+                metric_key: prepare_chart_data(
+                    get_monthly_metric_data(selection["bookings_filtered"], metric_key),
+                    view_mode,
+                )
+                for metric_key in CHART_METRIC_KEYS
+            }
+
+        return self._cached("cube", {"view_mode": view_mode, **period}, compute)
+
+    def bookings(self, view_mode: str = "Overall", **period) -> tuple[str, pd.DataFrame]:
+        """Bookings checked in during the selected period, optionally for one platform."""
+        def compute(bookings, monthly_costs, _toiletries):
+            df = resolve_period(bookings, monthly_costs, **period)["bookings_filtered"]
+            if view_mode in ("Airbnb", "Booking.com") and "Platform" in df.columns:
+                df = df[df["Platform"].replace({"Booking": "Booking.com"}) == view_mode]
+            return df
+
+        return self._cached("bookings", {"view_mode": view_mode, **period}, compute)
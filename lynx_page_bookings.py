@@ -0,0 +1,484 @@
+"""
+Bookings page: add a booking, import platform exports, data quality findings
+and the bookings editor.
+"""
+import streamlit as st
+import pandas as pd
+
+from lynx_metrics import (
+    FILE_PATH,
+    recalc_booking_totals,
+    get_current_consumables_totals,
+    BOOKING_COM_COMMISSION,
+    EditConflict,
+    bookings_window,
+    merge_bookings_window,
+)
+from lynx_import import (
+    IMPORT_FORMATS,
+    import_reservations,
+)
+from lynx_ui import (
+    get_tracker_journal,
+    save_data,
+    append_booking,
+    editor_base,
+    editor_has_edits,
+    reset_editor,
+    show_edit_conflict,
+    load_data_quality,
+    render_data_quality_panel,
+    queue_github_push,
+    remember_github_push_result,
+)
+
+
+# ========== PAGE ==========
+
+def render(bookings: pd.DataFrame, monthly_costs: pd.DataFrame, toiletries: pd.DataFrame, loaded_base: tuple) -> None:
+    """Render the Bookings page."""
+    st.title("📒 Bookings")
+
+    # ----- Add new booking -----
+    st.markdown("---")
+    st.markdown("#### ➕ Add New Booking")
+    
+    # Add new booking form in expandable section (collapsed by default)
+    with st.expander("Add a new booking", expanded=False):
+        # Helper function to calculate revenue based on platform (commission adjustment)
+        def calculate_revenue(platform, user_value):
+            """
+            Calculate the revenue to be saved based on platform.
+            - Airbnb: Save the full value as entered
+            - Booking.com: Apply 12% commission deduction (save 88% of user input)
+            """
+            if platform == "Booking.com":
+                return round(user_value * (1 - BOOKING_COM_COMMISSION), 2)
+            return user_value
+        
+        with st.form("new_booking_form", clear_on_submit=False):
+            c1, c2 = st.columns(2)
+
+            # ---------------- LEFT COLUMN ----------------
+            with c1:
+                check_in = st.date_input(
+                    "Check-in date *",
+                    format="DD-MM-YYYY",
+                )
+                adults = st.number_input("Adults *", min_value=0, value=2, step=1)
+                children = st.number_input("Children *", min_value=0, value=0, step=1)
+                platform = st.selectbox("Platform *", ["Airbnb", "Booking.com"])
+
+            # ---------------- RIGHT COLUMN ----------------
+            with c2:
+                check_out = st.date_input(
+                    "Check-out date *",
+                    format="DD-MM-YYYY",
+                )
+                guest_name = st.text_input("Guest Name *")
+
+                # ---- Country dropdown with search + Add country ----
+                # session_state за земји додадени во тековната сесија
+                if "added_countries" not in st.session_state:
+                    st.session_state["added_countries"] = set()
+
+                # земји кои веќе постојат во Bookings sheet
+                if "Country" in bookings.columns:
+                    existing_countries = (
+                        bookings["Country"]
+                        .dropna()
+                        .astype(str)
+                        .str.strip()
+                        .replace("", pd.NA)
+                        .dropna()
+                        .unique()
+                        .tolist()
+                    )
+                else:
+                    existing_countries = []
+
+                # неколку најчести земји
+                common_countries = [
+                    "North Macedonia", "Serbia", "Bulgaria", "Greece", "Albania",
+                    "Kosovo", "Turkey", "Germany", "Switzerland", "Italy",
+                    "Slovenia", "Croatia", "Austria", "Hungary",
+                ]
+
+                add_country_label = "+ Add country"
+
+                # база: common + existing + во сесија додадени
+                country_base = sorted(
+                    set(common_countries)
+                    | set(existing_countries)
+                    | set(st.session_state["added_countries"]),
+                    key=str.casefold,
+                )
+
+                # финална листа: placeholder + земји + "+ Add country"
+                country_options = ["Select Country"] + country_base + [add_country_label]
+
+                country_choice = st.selectbox(
+                    "Country *",
+                    country_options,
+                    index=0,          # покажи "Select Country" како default
+                    key="country_select",
+                )
+
+                # логика за избор/додавање на земја
+                if country_choice == "Select Country":
+                    country = ""      # невалидно - ќе фатиме во валидација
+                elif country_choice == add_country_label:
+                    new_country = st.text_input(
+                        "Add new country *",
+                        key="country_new_input",
+                        placeholder="Type country name..."
+                    ).strip()
+
+                    if new_country:
+                        st.session_state["added_countries"].add(new_country)
+                        country = new_country
+                    else:
+                        country = ""  # уште невалидно додека не внесе нешто
+                else:
+                    country = country_choice
+
+                st.checkbox(
+                    "Push this booking to GitHub after save",
+                    value=True,
+                    disabled=True,
+                    key="push_new_booking_to_git",
+                    help="Always enabled: every saved booking is pushed to GitHub automatically.",
+                )
+
+                commit_message = st.text_input(
+                    "Git commit message",
+                    value=(
+                        f"Add new booking via Streamlit app: {guest_name} - {country}"
+                        if guest_name and country else
+                        "Add new booking via Streamlit app"
+                    ),
+                    key="git_commit_message",
+                )
+
+                # Use text input for revenue to allow clearing placeholder on focus
+                # Text input with placeholder - when clicked, placeholder disappears and user can type fresh number
+                # Don't use key to avoid session state conflicts - form's clear_on_submit=False handles preservation
+                revenue_text = st.text_input(
+                    "Revenue for stay (€) *",
+                    value="",  # Empty by default - placeholder will show
+                    placeholder="0.00",
+                    help="Enter the revenue amount (e.g., 120 or 120.50). Click to clear and type."
+                )
+                
+                # Convert to float, defaulting to 0.0 if empty or invalid
+                try:
+                    revenue = float(revenue_text.strip()) if revenue_text.strip() else 0.0
+                except (ValueError, AttributeError):
+                    revenue = 0.0
+
+                c3, c4, c5 = st.columns(3)
+
+                with c3:
+                    sofa_bed = st.selectbox("Sofa Bed *", ["No", "Yes"])
+                    baby_crib = st.selectbox("Baby Crib *", ["No", "Yes"])
+                    parking = st.selectbox("Parking *", ["No", "Yes"])
+
+                with c4:
+                    transportation_cost = st.number_input(
+                        "Transportation Cost *", min_value=0.0, step=1.0, value=5.0
+                    )
+                    laundry_cost = st.number_input(
+                        "Laundry Cost *", min_value=0.0, step=1.0, value=5.0
+                    )
+
+                with c5:
+                    # Get current consumables total as default value
+                    _, default_consumable_cost = get_current_consumables_totals(toiletries)
+                    consumable_cost = st.number_input(
+                        "Consumable Cost *", min_value=0.0, step=0.01, value=round(default_consumable_cost, 2)
+                    )
+                    bank_fees = st.number_input(
+                        "Bank Fees *", min_value=0.0, step=1.0, value=6.0
+                    )
+
+            # Responsive text area - height adapts on mobile
+            notes = st.text_area("Notes", height=100)
+
+            submitted = st.form_submit_button("➕ Add booking")
+
+            if submitted:
+                missing_fields = []
+
+                # Basic validation (Notes is optional, no validation needed)
+                if not guest_name.strip():
+                    missing_fields.append("Guest Name")
+                if not country:
+                    missing_fields.append("Country")
+                if revenue <= 0:
+                    missing_fields.append("Revenue for stay (€)")
+
+                date_errors = []
+                if check_out <= check_in:
+                    date_errors.append("Check-out date must be after check-in date.")
+
+                # If there are errors -> don't save anything
+                if missing_fields or date_errors:
+                    if missing_fields:
+                        msg = (
+                            "The following required fields are missing: "
+                            + ", ".join(missing_fields)
+                        )
+                        st.error(msg)
+                        st.toast(msg, icon="⚠️")
+
+                    for err in date_errors:
+                        st.error(err)
+                        st.toast(err, icon="⚠️")
+
+                else:
+                    # All conditions met -> calculate and save
+                    # Auto-format currency fields to 2 decimals
+                    user_revenue = round(float(revenue), 2)
+                    transportation_cost = round(float(transportation_cost), 2)
+                    laundry_cost = round(float(laundry_cost), 2)
+                    consumable_cost = round(float(consumable_cost), 2)
+                    bank_fees = round(float(bank_fees), 2)
+                    
+                    # Calculate adjusted revenue based on platform (Booking.com has 12% commission)
+                    revenue_for_stay = calculate_revenue(platform, user_revenue)
+                    
+                    total_guests = adults + children
+                    nights = (pd.to_datetime(check_out) - pd.to_datetime(check_in)).days
+                    month = check_in.month
+                    year = check_in.year
+
+                    per_stay_expenses = round(transportation_cost + laundry_cost + consumable_cost + bank_fees, 2)
+                    # Use adjusted revenue for net income calculation
+                    net_before_fixed = round(revenue_for_stay - per_stay_expenses, 2)
+
+                    new_row = {
+                        "Check-in date": pd.to_datetime(check_in),
+                        "Check-out date": pd.to_datetime(check_out),
+                        "Guest Name": guest_name,
+                        "Country": country,
+                        "Adults": adults,
+                        "Children": children,
+                        "Total guests": total_guests,
+                        "Sofa Bed": sofa_bed,
+                        "Baby Crib": baby_crib,
+                        "Parking": parking,
+                        "Platform": "Booking" if platform == "Booking.com" else "Airbnb",
+                        "Nights": nights,
+                        "Revenue for stay (€)": revenue_for_stay,
+                        "Transportation Cost (€)": transportation_cost,
+                        "Laundry Cost (€)": laundry_cost,
+                        "Consumable Cost (€)": consumable_cost,
+                        "Bank Fees (€)": bank_fees,
+                        "Per-stay expenses (€)": per_stay_expenses,
+                        "Net Income Before Fixed Costs (€)": net_before_fixed,
+                        "Check-in Month": month,
+                        "Check-in Year": year,
+                        "Notes": notes if notes else "",  # Allow empty notes
+                    }
+
+                    append_booking(new_row, FILE_PATH)
+
+                    sync_state = queue_github_push(
+                        commit_message or "Add new booking via Streamlit app",
+                    )
+                    remember_github_push_result(sync_state, context="New booking")
+
+                    st.rerun()  # Refresh form after successful save
+
+    # ----- Import platform exports -----
+    with st.expander("📥 Import an Airbnb or Booking.com export", expanded=False):
+        st.caption(
+            "Upload a reservations CSV exported from Airbnb or the Booking.com extranet. "
+            "Cancelled and already tracked reservations are skipped; new ones get the "
+            "default per-stay costs and can be adjusted below after importing."
+        )
+        export_file = st.file_uploader("Reservations CSV", type=["csv"], key="import_export_file")
+        import_format = st.selectbox(
+            "Export format",
+            ["Detect automatically"] + list(IMPORT_FORMATS),
+            key="import_export_format",
+        )
+        if export_file is not None:
+            chosen_format = None if import_format == "Detect automatically" else import_format
+            try:
+                preview = import_reservations(
+                    export_file, get_tracker_journal(FILE_PATH), chosen_format, dry_run=True
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.write(
+                    f"**{preview['format']}** export: {preview['read']} rows, "
+                    f"**{preview['imported']} new**, {preview['duplicates']} already tracked, "
+                    f"{preview['cancelled']} cancelled, {preview['invalid']} without dates or price."
+                )
+                if preview["imported"]:
+                    st.dataframe(preview["rows"], use_container_width=True, hide_index=True)
+                    if st.button(f"Import {preview['imported']} bookings", type="primary", key="import_export_save"):
+                        result = import_reservations(export_file, get_tracker_journal(FILE_PATH), chosen_format)
+                        sync_state = queue_github_push(
+                            f"Import {result['imported']} {result['format']} bookings via Streamlit app"
+                        )
+                        remember_github_push_result(
+                            sync_state, context=f"{result['imported']} bookings from the {result['format']} export"
+                        )
+                        st.rerun()
+
+    # ----- Edit & delete existing bookings -----
+    st.markdown("#### Edit existing bookings")
+    render_data_quality_panel(load_data_quality(FILE_PATH))
+    show_edit_conflict("bookings_editor", "Bookings")
+
+    bookings_base = editor_base("bookings_editor", loaded_base)
+    all_bookings = bookings_base[1]["Bookings"].reset_index(drop=True)
+    all_bookings.index += 1  # booking ids are row numbers starting from 1, as shown in "#"
+
+    # Filters and paging are applied here and only the visible page is sent to the
+    # editor; the "#" column is each row's booking id (its row in the pinned data),
+    # which the save uses to put the edited page back into the full sheet. While
+    # the page has unsaved edits it stays put, since the editor tracks edits by
+    # position on the page; a save clears the edits (reset_editor) and unlocks it.
+    has_edits = editor_has_edits("bookings_editor")
+    check_in_years = pd.to_datetime(all_bookings["Check-in date"], errors="coerce").dt.year.dropna()
+    year_options = sorted(check_in_years.astype(int).unique().tolist(), reverse=True)
+    platform_options = sorted(all_bookings["Platform"].dropna().astype(str).unique().tolist()) if "Platform" in all_bookings.columns else []
+    if "bookings_filter_years" not in st.session_state:
+        st.session_state["bookings_filter_years"] = year_options[:1]
+
+    filter_cols = st.columns([2, 2, 2, 1, 1])
+    with filter_cols[0]:
+        filter_years = st.multiselect("Check-in year", year_options, key="bookings_filter_years", disabled=has_edits, placeholder="All years")
+    with filter_cols[1]:
+        filter_platforms = st.multiselect("Platform", platform_options, key="bookings_filter_platforms", disabled=has_edits, placeholder="All platforms")
+    with filter_cols[2]:
+        filter_guest = st.text_input("Guest", key="bookings_filter_guest", disabled=has_edits, placeholder="Search guest name")
+    with filter_cols[3]:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="bookings_page_size", disabled=has_edits)
+
+    _, matching = bookings_window(all_bookings, tuple(filter_years), tuple(filter_platforms), filter_guest, page_size=0)
+    page_count = max((matching + page_size - 1) // page_size, 1)
+    if st.session_state.get("bookings_page", 1) > page_count:
+        st.session_state["bookings_page"] = page_count
+    with filter_cols[4]:
+        page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="bookings_page", disabled=has_edits)
+
+    window, matching = bookings_window(
+        all_bookings, tuple(filter_years), tuple(filter_platforms), filter_guest, int(page_number), page_size
+    )
+    st.caption(
+        f"Showing {len(window)} of {matching} matching bookings ({len(all_bookings)} in total), page {int(page_number)} of {page_count}."
+        + (" Save your edits to change the filters or page." if has_edits else "")
+    )
+
+    bookings_for_edit = window.copy()
+    bookings_for_edit["Delete?"] = False
+    
+    # Ensure date columns are proper datetime (keep internal values as datetime)
+    if "Check-in date" in bookings_for_edit.columns:
+        bookings_for_edit["Check-in date"] = pd.to_datetime(
+            bookings_for_edit["Check-in date"],
+            errors="coerce",
+        )
+    if "Check-out date" in bookings_for_edit.columns:
+        bookings_for_edit["Check-out date"] = pd.to_datetime(
+            bookings_for_edit["Check-out date"],
+            errors="coerce",
+        )
+    
+    # Booking id as first column (its row number in the full sheet)
+    bookings_for_edit.insert(0, "#", bookings_for_edit.index)
+
+    edited_page = st.data_editor(
+        bookings_for_edit,
+        num_rows="dynamic",
+        use_container_width=True,
+        key="bookings_editor",
+        hide_index=True,
+        column_config={
+            "#": st.column_config.NumberColumn(
+                "#",
+                help="Booking row number",
+                width="small",
+                disabled=True,  # Make index non-editable
+            ),
+            "Check-in date": st.column_config.DateColumn(
+                "Check-in date",
+                format="DD-MM-YYYY",
+            ),
+            "Check-out date": st.column_config.DateColumn(
+                "Check-out date",
+                format="DD-MM-YYYY",
+            ),
+            "Delete?": st.column_config.CheckboxColumn(
+                "Delete?",
+                help="Tick to remove this booking (cancelled / deleted).",
+                default=False,
+            ),
+        },
+    )
+
+    if st.button("💾 Save bookings"):
+        if "Delete?" in edited_page.columns:
+            edited_page = edited_page[~edited_page["Delete?"].fillna(False).astype(bool)]
+            edited_page = edited_page.drop(columns=["Delete?"])
+
+        # Convert date columns back to datetime for saving (they were converted to date objects for display)
+        if "Check-in date" in edited_page.columns:
+            edited_page["Check-in date"] = pd.to_datetime(edited_page["Check-in date"])
+        if "Check-out date" in edited_page.columns:
+            edited_page["Check-out date"] = pd.to_datetime(edited_page["Check-out date"])
+
+        # Put the page back into the full sheet by booking id ("#" is dropped there)
+        edited_bookings = merge_bookings_window(all_bookings, window.index, edited_page, "#")
+
+        # Optionally fill empty Consumable Cost (€) values with current consumables total
+        # Only fill if the value is truly empty/NaN (not overwriting existing historical values)
+        if "Consumable Cost (€)" in edited_bookings.columns:
+            empty_mask = edited_bookings["Consumable Cost (€)"].isna() | (pd.to_numeric(edited_bookings["Consumable Cost (€)"], errors='coerce').fillna(0) == 0)
+            if empty_mask.any():
+                _, current_total_eur = get_current_consumables_totals(toiletries)
+                edited_bookings.loc[empty_mask, "Consumable Cost (€)"] = current_total_eur
+
+        # Auto-format currency fields to 2 decimals before saving
+        currency_columns = [
+            "Revenue for stay (€)",
+            "Transportation Cost (€)",
+            "Laundry Cost (€)",
+            "Consumable Cost (€)",  # Updated from Guest Supplies Cost
+            "Bank Fees (€)",  # Use standardized column name
+            "Per-stay expenses (€)",
+            "Net Income Before Fixed Costs (€)",
+        ]
+        
+        for col in currency_columns:
+            if col in edited_bookings.columns:
+                # Convert to numeric, handling any non-numeric values
+                edited_bookings[col] = pd.to_numeric(edited_bookings[col], errors='coerce')
+                # Round to 2 decimals
+                edited_bookings[col] = edited_bookings[col].round(2)
+        
+        # Recalculate "Per-stay expenses (€)" and "Net Income Before Fixed Costs (€)" after edits
+        edited_bookings = recalc_booking_totals(edited_bookings)
+        
+        # Ensure Notes field can be empty (fill NaN with empty string)
+        if "Notes" in edited_bookings.columns:
+            edited_bookings["Notes"] = edited_bookings["Notes"].fillna("")
+
+        try:
+            merged = save_data(edited_bookings, monthly_costs, toiletries, FILE_PATH, base=bookings_base)
+        except EditConflict as conflict:
+            st.session_state["bookings_editor_conflict"] = conflict.conflicts
+            st.rerun()
+
+        # The edits are saved: the editor starts over on the saved data
+        reset_editor("bookings_editor")
+        if merged:
+            st.toast("Merged with changes someone else saved meanwhile.", icon="🔀")
+        sync_state = queue_github_push("Update bookings via Streamlit app")
+        remember_github_push_result(sync_state, context="Bookings")
+        st.rerun()
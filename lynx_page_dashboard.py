@@ -0,0 +1,1005 @@
+"""
+Dashboard page: KPI overview, custom and additional metrics, the chart
+carousel and custom graphs, or the Airbnb vs Booking.com comparison.
+"""
+import streamlit as st
+import pandas as pd
+import calendar
+
+from lynx_metrics import (
+    FILE_PATH,
+    METRIC_SECTIONS,
+    SECTION_DISPLAY_NAMES,
+    METRIC_SEARCH_INDEX,
+    CHART_LAYOUTS,
+    CHART_METRIC_KEYS,
+    CHART_METRIC_LABELS,
+    compute_nights_available,
+    get_year_range,
+    get_month_range,
+    go_to_previous_month,
+    go_to_next_month,
+    monthly_revenue_by_platform,
+    revenue_heatmap_frame,
+    monthly_metric_cube,
+    prepare_chart_data,
+    calculate_all_metrics,
+    filter_bookings_by_period,
+    filter_monthly_costs_by_period,
+)
+from lynx_charts import metric_chart_spec, revenue_heatmap_spec
+from lynx_ui import (
+    load_data_quality,
+    get_metric_info,
+    metric_grid_card,
+    kpi_grid,
+    get_metric_section,
+    save_custom_metrics,
+    initialize_custom_metrics,
+    save_custom_graphs,
+    initialize_custom_graphs,
+)
+
+
+# ========== DASHBOARD FRAGMENTS ==========
+# Parts of the dashboard that rerun on their own: a click inside them reruns
+# only the fragment, with the data and metrics the last full run calculated,
+# instead of reloading and recalculating the whole page.
+
+@st.cache_data(max_entries=8)
+def cached_monthly_metric_cube(bookings_filtered: pd.DataFrame) -> dict:
+    """monthly_metric_cube of a period's bookings, reused by the chart carousel and custom graphs."""
+    return monthly_metric_cube(bookings_filtered)
+
+
+def _sync_chart_selects(chart: dict) -> None:
+    """Point the carousel's Metric / Layout dropdowns at `chart`."""
+    st.session_state["chart_metric_select"] = chart["metric_key"]
+    st.session_state["chart_layout_select"] = chart["layout"]
+
+
+def _step_chart(predefined_charts: list[dict], step: int) -> None:
+    """◀ / ▶ callback: move the carousel and its dropdowns by `step` charts."""
+    index = st.session_state.get("chart_index", 0) + step
+    index = min(max(index, 0), len(predefined_charts) - 1)
+    st.session_state["chart_index"] = index
+    _sync_chart_selects(predefined_charts[index])
+
+
+def _select_suggested_metric(section_name: str, metric_key: str) -> None:
+    """Search suggestion callback: add the metric to its section's selection."""
+    selected = st.session_state["more_metrics_selected"].setdefault(section_name, [])
+    if metric_key not in selected:
+        selected.append(metric_key)
+    # Tick its checkbox too, or the checkbox's own (unticked) state drops it again
+    st.session_state[f"metric_checkbox_{section_name}_{metric_key}"] = True
+
+
+@st.fragment
+def render_more_metrics(metric_info: dict, valid_custom_metrics: list[str]) -> None:
+    """Metric search, the "More metrics" picker and the selected metric cards."""
+    # ----- More Metrics Section -----
+    st.markdown("---")
+    st.markdown("#### 📊 More Metrics")
+
+    # Get selected metrics per section (stored in session state for persistence across expander toggle)
+    if "more_metrics_selected" not in st.session_state:
+        st.session_state["more_metrics_selected"] = {}
+
+    # Global metric search input state (for autocomplete-style filtering).
+    if "metric_search" not in st.session_state:
+        st.session_state["metric_search"] = ""
+
+    # More Metrics expander - contains the selection UI
+    with st.expander("Select additional metrics to display", expanded=False):
+        # Build a master list of all available metrics across sections (excluding Custom)
+        all_available_metrics = []  # list[tuple[str, str]] -> (section_name, metric_key)
+        for section_name in METRIC_SECTIONS.keys():
+            if section_name == "Custom":
+                continue
+            section_metrics = METRIC_SECTIONS[section_name]
+            available_section_metrics = [m for m in section_metrics if m in metric_info]
+            if not available_section_metrics:
+                continue
+            available_section_metrics = [m for m in available_section_metrics if m not in valid_custom_metrics]
+            if not available_section_metrics:
+                continue
+            for mk in available_section_metrics:
+                all_available_metrics.append((section_name, mk))
+
+        # --- REAL-TIME AUTOCOMPLETE SEARCH FIELD ---
+        search_query = st.text_input(
+            "Search metrics",
+            key="metric_search",
+            placeholder="Type to search...",
+        )
+
+        current_search = search_query.lower().strip()
+        # Ranked matches from the prebuilt index (no metric is recomputed while typing)
+        search_results = METRIC_SEARCH_INDEX.search(current_search) if current_search else ()
+        search_matches = set(search_results)
+
+        # ---- Autocomplete Suggestions ----
+        suggestion_container = st.container()
+        with suggestion_container:
+            available_sections = {metric_key: section_name for section_name, metric_key in all_available_metrics}
+            suggestions = [
+                (available_sections[metric_key], metric_key, str(metric_info.get(metric_key, {}).get("label", metric_key)))
+                for metric_key in search_results
+                if metric_key in available_sections
+            ]
+
+            max_suggestions = 8
+            suggestions = suggestions[:max_suggestions]
+
+            if suggestions:
+                st.caption("Suggestions:")
+                for section_name, metric_key, label in suggestions:
+                    section_label = SECTION_DISPLAY_NAMES.get(section_name, section_name)
+                    button_label = f"{label} · {section_label}"
+                    # Auto-select this metric in its category (the callback runs before the fragment redraws)
+                    st.button(
+                        button_label,
+                        key=f"suggest_{section_name}_{metric_key}",
+                        on_click=_select_suggested_metric,
+                        args=(section_name, metric_key),
+                    )
+            elif current_search:
+                st.caption("No matching metrics found.")
+
+        # Get selected metrics per section
+        selected_metrics_by_section = {}
+        # current_search already derived above from session_state
+
+        # Iterate through sections (excluding Custom)
+        for section_name in METRIC_SECTIONS.keys():
+            if section_name == "Custom":
+                continue
+
+            section_metrics = METRIC_SECTIONS[section_name]
+            # Filter to only metrics that exist in metric_info
+            available_section_metrics = [m for m in section_metrics if m in metric_info]
+
+            if not available_section_metrics:
+                continue
+
+            # Skip metrics that are in Custom section (they're already shown above)
+            available_section_metrics = [m for m in available_section_metrics if m not in valid_custom_metrics]
+
+            if not available_section_metrics:
+                continue
+
+            # Apply global search filter
+            filtered_section_metrics = (
+                [m for m in available_section_metrics if m in search_matches] if current_search else available_section_metrics
+            )
+
+            st.markdown(f"##### {SECTION_DISPLAY_NAMES.get(section_name, section_name)}")
+
+            # Preserve previously selected metrics even if they are currently filtered out
+            selected_in_section = st.session_state["more_metrics_selected"].get(section_name, []).copy()
+
+            if not filtered_section_metrics:
+                st.caption("No results for this category with the current search.")
+                selected_metrics_by_section[section_name] = selected_in_section
+                continue
+
+            # Use checkboxes for each metric in the filtered list
+            cols = st.columns(min(3, len(filtered_section_metrics)))
+            for idx, metric_key in enumerate(filtered_section_metrics):
+                with cols[idx % 3]:
+                    is_selected = metric_key in selected_in_section
+                    checkbox_value = st.checkbox(
+                        metric_key,
+                        key=f"metric_checkbox_{section_name}_{metric_key}",
+                        value=is_selected,
+                    )
+                    if checkbox_value and metric_key not in selected_in_section:
+                        selected_in_section.append(metric_key)
+                    elif not checkbox_value and metric_key in selected_in_section:
+                        selected_in_section.remove(metric_key)
+
+            selected_metrics_by_section[section_name] = selected_in_section
+
+        # Update session state with current selections
+        st.session_state["more_metrics_selected"] = selected_metrics_by_section
+
+    # Display selected metrics grouped by section (always visible, even when expander is closed)
+    any_selected = any(st.session_state["more_metrics_selected"].values())
+    if any_selected:
+        st.markdown("---")
+        st.markdown("#### Selected Additional Metrics")
+
+        for section_name, selected_metrics in st.session_state["more_metrics_selected"].items():
+            if not selected_metrics:
+                continue
+
+            # Filter to only metrics that still exist
+            selected_metrics = [k for k in selected_metrics if k in metric_info]
+            if not selected_metrics:
+                continue
+
+            st.markdown(f"##### {SECTION_DISPLAY_NAMES.get(section_name, section_name)}")
+            # Do NOT append section name here - this is the original section display
+            kpi_grid([metric_grid_card(metric_info, key) for key in selected_metrics])
+
+
+@st.fragment
+def render_chart_carousel(bookings_filtered: pd.DataFrame, view_mode: str) -> None:
+    """Predefined chart carousel: ◀ / ▶ and the dropdowns redraw only the chart."""
+    # Initialize chart index in session state if not exists
+    if "chart_index" not in st.session_state:
+        st.session_state["chart_index"] = 0
+
+    # Create predefined chart configs list
+    predefined_charts = []
+    for metric_key in CHART_METRIC_KEYS:
+        for layout in CHART_LAYOUTS:
+            predefined_charts.append({
+                "metric_key": metric_key,
+                "layout": layout,
+            })
+
+    # Ensure chart_index is within bounds
+    max_index = len(predefined_charts) - 1
+    if st.session_state["chart_index"] < 0:
+        st.session_state["chart_index"] = 0
+    elif st.session_state["chart_index"] > max_index:
+        st.session_state["chart_index"] = max_index
+
+    # Get current chart config
+    current_chart = predefined_charts[st.session_state["chart_index"]]
+    current_metric_key = current_chart["metric_key"]
+    current_layout = current_chart["layout"]
+
+    if "chart_metric_select" not in st.session_state:
+        _sync_chart_selects(current_chart)
+
+    # Header with title and controls
+    col_left, col_right = st.columns([3, 2])
+    with col_left:
+        st.markdown("#### 📊 Revenue and performance charts")
+    with col_right:
+        # Carousel navigation buttons
+        col_prev, col_next, col_spacer = st.columns([1, 1, 3])
+        with col_prev:
+            st.button("◀ Previous", key="chart_prev", on_click=_step_chart, args=(predefined_charts, -1))
+        with col_next:
+            st.button("Next ▶", key="chart_next", on_click=_step_chart, args=(predefined_charts, 1))
+
+    # Dropdowns for direct selection
+    col_metric, col_layout = st.columns(2)
+    with col_metric:
+        metric_option = st.selectbox(
+            "Metric",
+            options=CHART_METRIC_KEYS,
+            format_func=lambda x: CHART_METRIC_LABELS.get(x, x),
+            key="chart_metric_select",
+        )
+    with col_layout:
+        layout_option = st.selectbox(
+            "Layout",
+            options=CHART_LAYOUTS,
+            key="chart_layout_select",
+        )
+
+    # Update chart_index if dropdowns changed
+    if metric_option != current_metric_key or layout_option != current_layout:
+        # Find the index of the new combination
+        for idx, chart in enumerate(predefined_charts):
+            if chart["metric_key"] == metric_option and chart["layout"] == layout_option:
+                st.session_state["chart_index"] = idx
+                break
+
+    # Get the current chart config again (in case it changed)
+    current_chart = predefined_charts[st.session_state["chart_index"]]
+    current_metric_key = current_chart["metric_key"]
+    current_layout = current_chart["layout"]
+
+    # The monthly series come from the cached aggregation of the period's
+    # bookings, so switching charts only builds and sends the chart
+    try:
+        monthly_metric_data = cached_monthly_metric_cube(bookings_filtered)[current_metric_key]
+
+        # Prepare chart data based on view mode
+        chart_df = prepare_chart_data(monthly_metric_data, view_mode)
+
+        # Build and display chart
+        if not chart_df.empty:
+            chart_spec = metric_chart_spec(
+                chart_df,
+                current_metric_key,
+                current_layout,
+                view_mode,
+            )
+            st.vega_lite_chart(chart_spec, use_container_width=True)
+        else:
+            st.info(f"No data available for {CHART_METRIC_LABELS.get(current_metric_key, current_metric_key)}.")
+    except Exception as e:
+        st.error(f"Error generating chart: {e}")
+        st.info("Please check your data and try again.")
+
+
+# ========== PAGE ==========
+
+def render(bookings: pd.DataFrame, monthly_costs: pd.DataFrame, toiletries: pd.DataFrame, loaded_base: tuple) -> None:
+    """Render the Dashboard page."""
+    # Reserve a container at the very top for the page header (Dashboard + Target)
+    header_container = st.container()
+
+    view_mode = st.segmented_control(
+        "View mode",
+        options=["Overall", "Airbnb", "Booking.com", "Comparison"],
+        default="Overall",
+    )
+
+    data_errors = load_data_quality(FILE_PATH)
+    data_errors = data_errors.loc[data_errors["Severity"] == "error", "Row"].nunique()
+    if data_errors:
+        st.caption(f"⚠️ {data_errors} bookings have data errors that can skew these KPIs - see Bookings → Data quality.")
+
+    # -------- DATE FILTERS (YEAR + OPTIONAL CUSTOM RANGE) --------
+    # Available years (for year-based filter)
+    available_years_bookings = (
+        bookings["Check-in Year"].dropna().astype(int).sort_values().unique()
+        if "Check-in Year" in bookings.columns
+        else []
+    )
+    available_years_costs = (
+        monthly_costs["Year"].dropna().astype(int).sort_values().unique()
+        if "Year" in monthly_costs.columns
+        else []
+    )
+
+    all_years = sorted(set(available_years_bookings) | set(available_years_costs))
+    year_options = ["All", "Custom range"] + [str(y) for y in all_years]
+
+    # Initialize month selection in session state
+    if "selected_month" not in st.session_state:
+        st.session_state["selected_month"] = None
+    if "selected_year_for_month" not in st.session_state:
+        st.session_state["selected_year_for_month"] = None
+
+    # Period selection row
+    period_col1, period_col2 = st.columns([1, 1.5])
+    
+    with period_col1:
+        # Get default index based on session state or current selection
+        default_index = 0
+        if "dashboard_period_select" in st.session_state:
+            selected_value = st.session_state["dashboard_period_select"]
+            if selected_value in year_options:
+                default_index = year_options.index(selected_value)
+        
+        selected_year = st.selectbox("Select period", year_options, index=default_index, key="dashboard_period_select")
+    
+    # Determine if we should show month selector
+    show_month_selector = False
+    selected_year_int = None
+    if selected_year not in ["All", "Custom range"]:
+        selected_year_int = int(selected_year)
+        show_month_selector = True
+        
+        # Reset month if year changed
+        if st.session_state.get("selected_year_for_month") != selected_year_int:
+            st.session_state["selected_month"] = None
+            st.session_state["selected_year_for_month"] = selected_year_int
+    else:
+        # Reset month selection when switching to "All" or "Custom range"
+        st.session_state["selected_month"] = None
+        st.session_state["selected_year_for_month"] = None
+    
+    # Handle pending month navigation (set by arrow clicks before rerun)
+    month_options_full = ["All months"] + [calendar.month_name[i] for i in range(1, 13)]
+    if "month_nav_action" in st.session_state:
+        nav_action = st.session_state.pop("month_nav_action")
+        current_month_name = st.session_state.get("selected_month", "All months")
+        base_year = st.session_state.get("selected_year_for_month", selected_year if selected_year not in ["All", "Custom range"] else None)
+        try:
+            if current_month_name in month_options_full and current_month_name != "All months" and base_year is not None:
+                current_idx = month_options_full.index(current_month_name)
+                if nav_action == "prev":
+                    new_year, new_month = go_to_previous_month(int(base_year), current_idx)
+                elif nav_action == "next":
+                    new_year, new_month = go_to_next_month(int(base_year), current_idx)
+                else:
+                    new_year, new_month = int(base_year), current_idx
+                st.session_state["selected_month"] = calendar.month_name[new_month]
+                st.session_state["selected_year_for_month"] = new_year
+                st.session_state["selected_year"] = new_year
+                # Pre-set year dropdown before it renders
+                st.session_state["dashboard_period_select"] = str(new_year)
+        except Exception:
+            pass
+
+    # Month selector (only shown when a year is selected)
+    selected_month = None
+    if show_month_selector:
+        with period_col2:
+            month_options = month_options_full
+            
+            # Resolve current month from session (default to All months)
+            current_month_name = st.session_state.get("selected_month", "All months")
+            if current_month_name not in month_options:
+                current_month_name = "All months"
+            current_month_index = month_options.index(current_month_name)
+
+            # Centered compact row: [◀] [Select Month] [▶]
+            pad_left, month_block, pad_right = st.columns([1, 3, 1])
+            with month_block:
+                col_prev, col_month, col_next = st.columns([1, 4, 1], gap="small")
+
+                # Month dropdown (center)
+                with col_month:
+                    selected_month_str = st.selectbox(
+                        "Select Month",
+                        options=month_options,
+                        index=current_month_index,
+                        key="dashboard_month_select",
+                        label_visibility="visible",
+                    )
+                    st.session_state["selected_month"] = selected_month_str
+                    st.session_state["selected_year"] = selected_year_int
+                    st.session_state["selected_year_for_month"] = selected_year_int
+
+                # Left arrow
+                with col_prev:
+                    if selected_month_str != "All months":
+                        if st.button("◀", key="prev_month", help="Previous month", use_container_width=True):
+                            st.session_state["month_nav_action"] = "prev"
+                            st.rerun()
+
+                # Right arrow
+                with col_next:
+                    if selected_month_str != "All months":
+                        if st.button("▶", key="next_month", help="Next month", use_container_width=True):
+                            st.session_state["month_nav_action"] = "next"
+                            st.rerun()
+
+            # Convert month name to number for filtering
+            if selected_month_str != "All months":
+                selected_month = month_options.index(selected_month_str)  # 1-12
+            else:
+                selected_month = None
+
+    # Compute default custom date range: earliest check-in to latest check-out
+    start_date_default = None
+    end_date_default = None
+    if "Check-in date" in bookings.columns and not bookings["Check-in date"].dropna().empty:
+        earliest_check_in = bookings["Check-in date"].min()
+        if pd.notna(earliest_check_in):
+            start_date_default = earliest_check_in.date()
+    if "Check-out date" in bookings.columns and not bookings["Check-out date"].dropna().empty:
+        latest_check_out = bookings["Check-out date"].max()
+        if pd.notna(latest_check_out):
+            end_date_default = latest_check_out.date()
+
+    # Custom range is a special option in the same dropdown
+    use_custom_range = selected_year == "Custom range"
+
+    start_date = None
+    end_date = None
+
+    if use_custom_range:
+        c_start, c_end = st.columns(2)
+        with c_start:
+            start_date = st.date_input(
+                "Start date",
+                value=start_date_default,
+                format="DD-MM-YYYY",
+                key="dashboard_start_date",
+            )
+        with c_end:
+            end_date = st.date_input(
+                "End date",
+                value=end_date_default,
+                format="DD-MM-YYYY",
+                key="dashboard_end_date",
+            )
+
+    # Determine effective period boundaries for metrics calculation
+    effective_period_start = None
+    effective_period_end = None
+    
+    # Decide which filter to apply
+    if use_custom_range and start_date is not None and end_date is not None:
+        # Custom date range overrides year selection
+        selected_year_int = None
+        selected_month = None
+        effective_period_start = pd.Timestamp(start_date)
+        effective_period_end = pd.Timestamp(end_date)
+        
+        bookings_filtered = filter_bookings_by_period(
+            bookings,
+            period_type="date_range",
+            start_date=start_date,
+            end_date=end_date,
+        )
+        monthly_costs_filtered = filter_monthly_costs_by_period(
+            monthly_costs,
+            period_type="date_range",
+            start_date=start_date,
+            end_date=end_date,
+        )
+        nights_available = compute_nights_available(
+            bookings_filtered,
+            selected_year=None,
+            period_type="date_range",
+            start_date=start_date,
+            end_date=end_date,
+        )
+    elif selected_year not in ["All", "Custom range"]:
+        # Year selected - check if month is also selected
+        # Note: selected_month is set above in the month selector section
+        if 'selected_month' not in locals():
+            selected_month = None
+        
+        if selected_month is not None and selected_month != 0:
+            # Specific month selected (selected_month is 1-12, where 1=January)
+            effective_period_start, effective_period_end = get_month_range(selected_year_int, selected_month)
+            
+            bookings_filtered = filter_bookings_by_period(
+                bookings,
+                period_type="month_year",
+                year=selected_year_int,
+                month=selected_month,
+            )
+            monthly_costs_filtered = filter_monthly_costs_by_period(
+                monthly_costs,
+                period_type="month_year",
+                year=selected_year_int,
+                month=selected_month,
+            )
+            nights_available = compute_nights_available(
+                bookings_filtered,
+                selected_year=selected_year_int,
+                period_type="month_year",
+                month=selected_month,
+            )
+        else:
+            # Year selected, but "All months" - use entire year
+            effective_period_start, effective_period_end = get_year_range(selected_year_int)
+            
+            bookings_filtered = filter_bookings_by_period(
+                bookings,
+                period_type="year",
+                year=selected_year_int,
+            )
+            monthly_costs_filtered = filter_monthly_costs_by_period(
+                monthly_costs,
+                period_type="year",
+                year=selected_year_int,
+            )
+            nights_available = compute_nights_available(
+                bookings_filtered,
+                selected_year=selected_year_int,
+                period_type="year",
+            )
+    else:
+        # "All" selected
+        selected_year_int = None
+        selected_month = None
+        effective_period_start = None
+        effective_period_end = None
+        
+        bookings_filtered = bookings
+        # For "All" years, use all monthly costs (no filter)
+        monthly_costs_filtered = monthly_costs
+        nights_available = compute_nights_available(bookings_filtered, None)
+
+    # ===== TARGET REVENUE HEADER ROW (renders at very top via header_container) =====
+    with header_container:
+        # Total revenue for the currently selected period (year or custom range)
+        total_revenue_period = 0.0
+        if "Revenue for stay (€)" in bookings_filtered.columns:
+            total_revenue_period = float(
+                bookings_filtered["Revenue for stay (€)"].fillna(0).sum()
+            )
+
+        # Match KPI card width by using a narrower right column
+        header_left, header_right = st.columns([2, 1])
+
+        with header_left:
+            st.title("📊 Dashboard")
+
+        with header_right:
+            # Card-like Target block - simplified without wrapper div
+            st.markdown(
+                "<div style='font-size:0.75rem; color:#9CA3AF; text-transform:uppercase; "
+                "letter-spacing:0.06em; margin-bottom:0.15rem;'>Target (€)</div>",
+                unsafe_allow_html=True,
+            )
+
+            # Compact input (no visible label) inside the card
+            # Initialize default value in session_state if not present
+            if "target_revenue" not in st.session_state:
+                st.session_state["target_revenue"] = 5000.0  # default EUR target
+            
+            # Use key only - Streamlit automatically uses session_state value
+            target = st.number_input(
+                label="",
+                min_value=0.0,
+                step=100.0,
+                key="target_revenue",
+                label_visibility="collapsed",
+                format="%.0f",
+            )
+
+            # Compute progress
+            if target > 0:
+                progress_pct = (total_revenue_period / target) * 100.0
+                # Clamp visual progress to 100% max
+                display_pct = max(0.0, min(progress_pct, 100.0))
+
+                # Strong, high-contrast progress bar + bold percentage
+                st.markdown(
+                    f"""
+                    <div style="margin-top:0.4rem; height:6px; border-radius:999px; 
+                                background-color:#020617; border:1px solid #1f2937;">
+                        <div style="
+                            height:100%;
+                            width:{display_pct}%;
+                            border-radius:999px;
+                            background:linear-gradient(90deg,#22C55E,#A3E635);
+                            transition:width 0.3s ease-out;
+                        "></div>
+                    </div>
+                    <div style="font-size:0.9rem; color:#F9FAFB; margin-top:0.35rem; font-weight:700;">
+                        {progress_pct:.1f}% of target
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+            else:
+                # No target set: just show text, no bar
+                st.markdown(
+                    """
+                    <div style="font-size:0.85rem; color:#F9FAFB; margin-top:0.75rem; font-weight:600;">
+                        No target set
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+    if view_mode != "Comparison":
+        # Initialize custom metrics session state
+        initialize_custom_metrics()
+        # Initialize custom graphs session state
+        initialize_custom_graphs()
+
+        # Calculate all metrics using the comprehensive function
+        # Use effective_period_start and effective_period_end (already calculated above)
+        metric_info = calculate_all_metrics(
+            bookings_filtered,
+            monthly_costs_filtered,
+            view_mode,
+            nights_available,
+            selected_year_int,
+            start_date=effective_period_start,
+            end_date=effective_period_end,
+            bookings_all=bookings,  # Pass all bookings for overlap calculation
+        )
+
+        # ----- Show core metrics -----
+        st.markdown("### KPI overview")
+
+        core_keys = [
+            "Reservations",
+            "Total nights",
+            "Occupancy (%)",
+            "Total revenue (€)",
+            "Net Profit (€)",
+            "Average price per night (€)",
+            "Average Monthly Gross Income (€)",
+            "Average Monthly Net Income (€)",
+        ]
+
+        kpi_grid([metric_grid_card(metric_info, key) for key in core_keys if key in metric_info])
+
+        # ----- Custom Metrics Section -----
+        st.markdown("---")
+        st.markdown("#### ⭐ Custom Metrics")
+        
+        # Get all available metric keys (including core keys so they can be added to Custom Metrics too)
+        all_metric_keys = [k for k in metric_info.keys()]
+        
+        # Filter out invalid metrics from custom_metrics (metrics that no longer exist)
+        valid_custom_metrics = [k for k in st.session_state["custom_metrics"] if k in metric_info]
+        if len(valid_custom_metrics) != len(st.session_state["custom_metrics"]):
+            # Some metrics were removed from code, update session state and save
+            st.session_state["custom_metrics"] = valid_custom_metrics
+            save_custom_metrics(valid_custom_metrics)
+        
+        # Custom metrics management UI
+        with st.expander("Manage Custom Metrics", expanded=False):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("**Add metrics to Custom section:**")
+                # Show metrics grouped by section for easy selection
+                available_to_add = [k for k in all_metric_keys if k not in valid_custom_metrics]
+                if available_to_add:
+                    metric_to_add = st.selectbox(
+                        "Select metric to add",
+                        options=[""] + available_to_add,
+                        format_func=lambda x: f"{x} ({get_metric_section(x)})" if x else "Choose a metric...",
+                        key="add_custom_metric",
+                    )
+                    if metric_to_add and st.button("➕ Add to Custom"):
+                        if metric_to_add not in st.session_state["custom_metrics"]:
+                            st.session_state["custom_metrics"].append(metric_to_add)
+                            save_custom_metrics(st.session_state["custom_metrics"])
+                            st.rerun()
+                else:
+                    st.info("All metrics are already in Custom section.")
+            
+            with col2:
+                st.markdown("**Remove metrics from Custom section:**")
+                if valid_custom_metrics:
+                    metrics_to_remove = st.multiselect(
+                        "Select metrics to remove",
+                        options=valid_custom_metrics,
+                        format_func=lambda x: f"{x} ({get_metric_section(x)})",
+                        key="remove_custom_metrics",
+                    )
+                    if metrics_to_remove and st.button("➖ Remove from Custom"):
+                        st.session_state["custom_metrics"] = [
+                            k for k in st.session_state["custom_metrics"] 
+                            if k not in metrics_to_remove
+                        ]
+                        save_custom_metrics(st.session_state["custom_metrics"])
+                        st.rerun()
+                    
+                    # Reorder Custom metrics
+                    st.markdown("**Reorder Custom metrics:**")
+                    custom_df = pd.DataFrame({
+                        "Metric": valid_custom_metrics,
+                        "Section": [get_metric_section(k) for k in valid_custom_metrics],
+                        "Order": range(len(valid_custom_metrics)),
+                    })
+                    edited_df = st.data_editor(
+                        custom_df,
+                        column_config={
+                            "Metric": st.column_config.SelectboxColumn(
+                                "Metric",
+                                options=all_metric_keys,
+                                required=True,
+                            ),
+                            "Section": st.column_config.TextColumn("Section", disabled=True),
+                            "Order": st.column_config.NumberColumn("Order", min_value=0, step=1),
+                        },
+                        use_container_width=True,
+                        num_rows="dynamic",
+                        key="custom_metrics_editor",
+                    )
+                    
+                    if st.button("💾 Save Custom Order"):
+                        # Sort by Order and update session state
+                        edited_df = edited_df.sort_values("Order")
+                        new_order = edited_df["Metric"].tolist()
+                        # Filter out any invalid metrics
+                        new_order = [k for k in new_order if k in metric_info]
+                        st.session_state["custom_metrics"] = new_order
+                        save_custom_metrics(new_order)
+                        st.rerun()
+                    
+                    if st.button("🗑️ Clear All Custom Metrics"):
+                        st.session_state["custom_metrics"] = []
+                        save_custom_metrics([])
+                        st.rerun()
+                else:
+                    st.info("No custom metrics yet. Add metrics from the left panel.")
+
+        # Display Custom metrics (always show if they exist, independent of More Metrics selection)
+        if valid_custom_metrics:
+            custom_cards = []
+            for key in valid_custom_metrics:
+                # Append section name in parentheses for custom metrics
+                original_section = get_metric_section(key)
+                display_label = f"{metric_info[key]['label']} ({original_section})" if original_section != "Custom" else None
+                custom_cards.append(metric_grid_card(metric_info, key, label=display_label))
+            kpi_grid(custom_cards)
+        else:
+            st.info("⭐ No custom metrics configured. Use 'Manage Custom Metrics' above to add your favorite metrics here.")
+
+        render_more_metrics(metric_info, valid_custom_metrics)
+
+        # ----- Visualizations (Chart Block) -----
+        st.markdown("### Visualizations")
+        chart_container = st.container()
+        
+        with chart_container:
+            render_chart_carousel(bookings_filtered, view_mode)
+
+            # ----- Custom Graphs Management -----
+            st.markdown("---")
+            st.markdown("#### 🎨 Custom Graphs")
+            
+            with st.expander("Manage Custom Graphs", expanded=False):
+                # Build dynamic list of eligible metrics for custom graphs.
+                # We include:
+                # - Time-series keys from CHART_METRIC_KEYS (monthly metrics)
+                # - All numeric metrics from metric_info (KPI metrics from METRIC_INFO)
+                eligible_metrics: list[tuple[str, str]] = []  # (group_label, metric_key)
+
+                # 1) Time-series metrics group
+                if CHART_METRIC_KEYS:
+                    for mk in CHART_METRIC_KEYS:
+                        eligible_metrics.append(("📅 Time series (by month)", mk))
+
+                # 2) KPI metrics grouped by section, only numeric values
+                for section_name, section_metrics in METRIC_SECTIONS.items():
+                    if section_name == "Custom":
+                        continue
+                    group_label = SECTION_DISPLAY_NAMES.get(section_name, section_name)
+                    for mk in section_metrics:
+                        if mk in metric_info and isinstance(metric_info[mk].get("value"), (int, float)):
+                            eligible_metrics.append((group_label, mk))
+
+                # 3) Any additional numeric metrics not explicitly in METRIC_SECTIONS
+                already_added = {m for _, m in eligible_metrics}
+                for mk, info in metric_info.items():
+                    if mk not in already_added and isinstance(info.get("value"), (int, float)):
+                        eligible_metrics.append(("Other", mk))
+
+                metric_options = [m for _, m in eligible_metrics]
+                group_by_metric = {m: g for g, m in eligible_metrics}
+
+                # Form to create new custom graph
+                st.markdown("**Create a new custom graph:**")
+                col_name, col_metric, col_layout = st.columns([2, 2, 2])
+                with col_name:
+                    new_graph_name = st.text_input("Graph name", key="new_graph_name", placeholder="e.g., My Revenue Chart")
+                with col_metric:
+                    new_graph_metric = st.selectbox(
+                        "Metric",
+                        options=metric_options,
+                        format_func=lambda x: f"{group_by_metric.get(x, '')} · {x}" if x in group_by_metric else x,
+                        key="new_graph_metric",
+                    )
+                    # Show metric description under the dropdown for clarity
+                    metric_meta = get_metric_info(new_graph_metric)
+                    if metric_meta.get("description"):
+                        st.caption(metric_meta["description"])
+                with col_layout:
+                    new_graph_layout = st.selectbox(
+                        "Layout",
+                        options=CHART_LAYOUTS,
+                        key="new_graph_layout",
+                    )
+                
+                if st.button("💾 Save Graph", key="save_custom_graph"):
+                    if new_graph_name.strip():
+                        # Check if name already exists
+                        existing_names = [g.get("name", "") for g in st.session_state["custom_graphs"]]
+                        if new_graph_name.strip() in existing_names:
+                            st.warning(f"A graph named '{new_graph_name.strip()}' already exists. Please choose a different name.")
+                        else:
+                            new_graph = {
+                                "name": new_graph_name.strip(),
+                                "metric_key": new_graph_metric,
+                                "layout": new_graph_layout,
+                            }
+                            st.session_state["custom_graphs"].append(new_graph)
+                            save_custom_graphs(st.session_state["custom_graphs"])
+                            st.success(f"Graph '{new_graph_name.strip()}' saved!")
+                            st.rerun()
+                    else:
+                        st.warning("Please enter a graph name.")
+                
+                # Delete existing custom graphs
+                st.markdown("**Delete custom graphs:**")
+                if st.session_state["custom_graphs"]:
+                    graphs_to_delete = st.multiselect(
+                        "Select graphs to delete",
+                        options=[g.get("name", "Unnamed") for g in st.session_state["custom_graphs"]],
+                        key="delete_custom_graphs",
+                    )
+                    if st.button("🗑️ Delete Selected", key="delete_graphs_btn"):
+                        if graphs_to_delete:
+                            st.session_state["custom_graphs"] = [
+                                g for g in st.session_state["custom_graphs"]
+                                if g.get("name", "Unnamed") not in graphs_to_delete
+                            ]
+                            save_custom_graphs(st.session_state["custom_graphs"])
+                            st.success(f"Deleted {len(graphs_to_delete)} graph(s).")
+                            st.rerun()
+                else:
+                    st.info("No custom graphs saved yet.")
+            
+            # Display all saved custom graphs
+            if st.session_state["custom_graphs"]:
+                st.markdown("---")
+                # All time-series graphs read from one aggregation of the period's
+                # bookings, built the first time a graph needs it
+                monthly_cube = None
+                for graph in st.session_state["custom_graphs"]:
+                    graph_name = graph.get("name", "Unnamed Graph")
+                    graph_metric_key = graph.get("metric_key", "revenue_by_month")
+                    graph_layout = graph.get("layout", "Line")
+                    
+                    st.markdown(f"##### {graph_name}")
+                    
+                    try:
+                        # Decide whether this is a time-series metric (CHART_METRIC_KEYS)
+                        # or an aggregated KPI metric from metric_info.
+                        if graph_metric_key in CHART_METRIC_KEYS:
+                            # ----- Time-series metric: column of the shared monthly cube -----
+                            if monthly_cube is None:
+                                monthly_cube = cached_monthly_metric_cube(bookings_filtered)
+                            chart_df_custom = prepare_chart_data(monthly_cube[graph_metric_key], view_mode)
+                        else:
+                            # ----- Aggregated KPI metric: use current metric_info value -----
+                            metric_entry = metric_info.get(graph_metric_key, {})
+                            metric_value = metric_entry.get("value", None)
+                            if isinstance(metric_value, (int, float)):
+                                chart_df_custom = pd.DataFrame({"Value": [float(metric_value)]})
+                                chart_df_custom.index = [graph_metric_key]
+                            else:
+                                chart_df_custom = pd.DataFrame()
+                        
+                        # Build and display chart
+                        if not chart_df_custom.empty:
+                            chart_spec_custom = metric_chart_spec(
+                                chart_df_custom,
+                                graph_metric_key,
+                                graph_layout,
+                                view_mode,
+                            )
+                            st.vega_lite_chart(chart_spec_custom, use_container_width=True)
+                        else:
+                            st.info(f"No data available for this custom graph.")
+                    except Exception as e:
+                        st.error(f"Error generating custom graph '{graph_name}': {e}")
+
+        # ----- Year/Month revenue heatmap -----
+        st.markdown("### Year/Month revenue heatmap")
+
+        heat_grouped = revenue_heatmap_frame(bookings_filtered, view_mode)
+        if heat_grouped is not None:
+            st.vega_lite_chart(revenue_heatmap_spec(heat_grouped), use_container_width=True)
+        else:
+            st.info("No booking data available to build a heatmap for the selected period.")
+
+    else:
+        # ----- COMPARISON VIEW (Airbnb vs Booking.com) -----
+        st.markdown("### Airbnb vs Booking.com – comparison")
+
+        monthly_revenue_data = monthly_revenue_by_platform(bookings_filtered)
+        comparison_df = monthly_revenue_data[["Airbnb", "Booking.com"]].copy()
+        comparison_df["Difference (Airbnb - Booking.com)"] = (
+            comparison_df["Airbnb"] - comparison_df["Booking.com"]
+        )
+
+        total_airbnb = comparison_df["Airbnb"].sum()
+        total_booking_com = comparison_df["Booking.com"].sum()
+
+        kpi_grid([
+            {
+                "label": "Total revenue – Airbnb (€)",
+                "value": total_airbnb,
+                "prefix": "€ ",
+                "metric_key": "Airbnb revenue (€)",
+                "caption": "Total revenue generated from Airbnb in the selected period.",
+            },
+            {
+                "label": "Total revenue – Booking.com (€)",
+                "value": total_booking_com,
+                "prefix": "€ ",
+                "metric_key": "Booking.com revenue (€)",
+                "caption": "Total revenue generated from Booking.com in the selected period.",
+            },
+            {
+                "label": "Revenue Difference (Airbnb - Booking.com)",
+                "value": total_airbnb - total_booking_com,
+                "prefix": "€ ",
+                "metric_key": "Platform Profitability Difference (€)",
+                "caption": "Difference in total revenue between Airbnb and Booking.com.",
+            },
+        ])
+
+        st.markdown("#### Monthly revenue comparison")
+        st.bar_chart(comparison_df[["Airbnb", "Booking.com"]])
+
+        st.markdown("#### Table view")
+        st.dataframe(comparison_df.style.format("{:,.2f}"))
@@ -0,0 +1,220 @@
+"""
+Expenses page: fixed monthly costs, consumables, laundry pricing and FX rates.
+"""
+import streamlit as st
+import pandas as pd
+
+from lynx_metrics import (
+    FILE_PATH,
+    recalc_monthly_costs,
+    recalc_toiletries,
+    get_current_consumables_totals,
+    FX_RATES_FILE,
+    load_fx_rates,
+    write_fx_rates,
+    EditConflict,
+    MERGE_DERIVED_COLUMNS,
+    frame_edits,
+    apply_frame_edits,
+)
+from lynx_ui import (
+    save_data,
+    editor_base,
+    reset_editor,
+    show_edit_conflict,
+    queue_github_push,
+    remember_github_push_result,
+)
+
+
+def render_laundry_pricing_table() -> None:
+    """Render a static laundry pricing table inside the Expenses page."""
+    laundry_rows = [
+        {"Артикл": "Јастучница за јастук (50×60 cm)", "Големина / Тип": "Единична", "Перење / Пеглање (ден.)": "20–25"},
+        {"Артикл": "Навлака за јорган (брачен, 160×200)", "Големина / Тип": "Брачен сет", "Перење / Пеглање (ден.)": "60"},
+        {"Артикл": "Навлака за јорган", "Големина / Тип": "Единична", "Перење / Пеглање (ден.)": "50"},
+        {"Артикл": "Чаршав со ластик (брачен кревет)", "Големина / Тип": "Брачен сет", "Перење / Пеглање (ден.)": "50"},
+        {"Артикл": "Чаршав со ластик (единичен кревет)", "Големина / Тип": "Единичен сет", "Перење / Пеглање (ден.)": "50"},
+    ]
+
+    df = pd.DataFrame(laundry_rows)
+
+    st.markdown("#### Laundry Pricing Table")
+    st.caption("Static price list (not yet connected to spreadsheet)")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+
+# ========== PAGE ==========
+
+def render(bookings: pd.DataFrame, monthly_costs: pd.DataFrame, toiletries: pd.DataFrame, loaded_base: tuple) -> None:
+    """Render the Expenses page."""
+    st.title("💸 Expenses")
+    
+    # Create tabs for Fixed Costs, Consumables, Laundry Pricing and FX Rates.
+    # The active tab is kept in session state; only its editor is built.
+    tab_names = ["💸 Fixed Costs", "🧴 Consumables Costs", "🧺 Laundry Pricing", "💱 FX Rates"]
+    tab1, tab2, tab3, tab4 = st.tabs(tab_names, key="expenses_tab", on_change="rerun")
+    
+    # -------- TAB 1: Fixed Costs --------
+    if tab1.open:
+        with tab1:
+            st.markdown("#### Add Year")
+            with st.form("add_year_form", clear_on_submit=True):
+                new_year = st.number_input(
+                    "Year",
+                    min_value=2024,
+                    max_value=2100,
+                    value=int(pd.Timestamp.today().year),
+                    step=1,
+                )
+                add_year_btn = st.form_submit_button("➕ Add Year")
+
+            if add_year_btn:
+                existing_years = (
+                    monthly_costs["Year"].dropna().astype(int).unique()
+                    if "Year" in monthly_costs.columns
+                    else []
+                )
+                if int(new_year) in existing_years:
+                    st.warning(f"Year {int(new_year)} already exists in the table.")
+                else:
+                    new_rows = []
+                    for month_number in range(1, 13):
+                        row = {}
+                        for column in monthly_costs.columns:
+                            if column == "Year":
+                                row[column] = int(new_year)
+                            elif column.lower().startswith("month"):
+                                row[column] = month_number
+                            else:
+                                row[column] = 0
+                        new_rows.append(row)
+
+                    monthly_costs = pd.concat(
+                        [monthly_costs, pd.DataFrame(new_rows)], ignore_index=True
+                    )
+                    monthly_costs = recalc_monthly_costs(monthly_costs)
+                    try:
+                        save_data(bookings, monthly_costs, toiletries, FILE_PATH, base=loaded_base)
+                    except EditConflict as conflict:
+                        st.session_state["costs_editor_conflict"] = conflict.conflicts
+                        st.rerun()
+                    st.success(f"Year {int(new_year)} added with 12 months ✅")
+
+            st.markdown("#### Edit Fixed Costs")
+            show_edit_conflict("costs_editor", "Fixed costs")
+
+            costs_base = editor_base("costs_editor", loaded_base)
+            edited_costs = st.data_editor(
+                costs_base[1]["Monthly_Costs"],
+                num_rows="dynamic",
+                use_container_width=True,
+                key="costs_editor",
+            )
+
+            if st.button("💾 Save Fixed Costs"):
+                edited_costs = recalc_monthly_costs(edited_costs)
+                try:
+                    merged = save_data(bookings, edited_costs, toiletries, FILE_PATH, base=costs_base)
+                except EditConflict as conflict:
+                    st.session_state["costs_editor_conflict"] = conflict.conflicts
+                    st.rerun()
+                # The edits are saved: the editor starts over on the saved data
+                reset_editor("costs_editor")
+                if merged:
+                    st.toast("Merged with changes someone else saved meanwhile.", icon="🔀")
+                st.success("Fixed Costs updated and saved ✅")
+                st.rerun()
+    
+    # -------- TAB 2: Consumables Costs --------
+    if tab2.open:
+        with tab2:
+            st.markdown("#### Edit Consumables")
+            show_edit_conflict("toiletries_editor", "Consumables")
+        
+            # Session state keeps only the pinned base (a snapshot shared by all
+            # sessions) and a small diff of the edits; the table is rebuilt from them
+            edits = st.session_state.get("toiletries_editor_edits")
+            toiletries_base = editor_base("toiletries_editor", loaded_base, has_edits=bool(edits and any(edits.values())))
+            # Recalculate Total (MKD) (also makes the columns numeric)
+            base_display = recalc_toiletries(toiletries_base[1]["Toiletries"].copy())
+            toiletries_to_edit = recalc_toiletries(apply_frame_edits(base_display, edits).copy())
+            toiletries_to_edit["Total (MKD)"] = toiletries_to_edit["Total (MKD)"].round(2)
+        
+            edited_toiletries = st.data_editor(
+                toiletries_to_edit,
+                num_rows="dynamic",
+                use_container_width=True,
+                key="toiletries_editor",
+            )
+        
+            # Immediately recalculate Total (MKD) = Unit Price (MKD) * Units per Stay after user edits
+            edited_toiletries = recalc_toiletries(edited_toiletries)
+            edited_toiletries["Total (MKD)"] = edited_toiletries["Total (MKD)"].round(2)
+        
+            # Keep the edits for the next render, where the table is rebuilt with the
+            # recalculated Total (MKD) (Streamlit reruns after every edit in the data_editor)
+            st.session_state["toiletries_editor_edits"] = frame_edits(
+                base_display, edited_toiletries, ignore=MERGE_DERIVED_COLUMNS["Toiletries"]
+            )
+        
+            # Calculate and display totals using recalculated values
+            total_mkd, total_eur = get_current_consumables_totals(edited_toiletries)
+        
+            # Display totals below the table
+            st.markdown("---")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total (MKD)", f"{total_mkd:,.2f}")
+            with col2:
+                st.metric("Total (EUR)", f"{total_eur:,.2f}")
+
+            if st.button("💾 Save Consumables Costs"):
+                # Final recalculation before saving
+                edited_toiletries_final = recalc_toiletries(edited_toiletries.copy())
+                try:
+                    merged = save_data(
+                        bookings, monthly_costs, edited_toiletries_final, FILE_PATH,
+                        base=toiletries_base,
+                    )
+                except EditConflict as conflict:
+                    st.session_state["toiletries_editor_conflict"] = conflict.conflicts
+                    st.rerun()
+                # The edits are saved: the editor starts over on the saved data
+                reset_editor("toiletries_editor")
+                if merged:
+                    st.toast("Merged with changes someone else saved meanwhile.", icon="🔀")
+                st.success("Consumables Costs updated and saved ✅")
+                st.rerun()  # Refresh to show updated totals
+
+    # -------- TAB 3: Laundry Pricing (Static) --------
+    if tab3.open:
+        with tab3:
+            render_laundry_pricing_table()
+
+    # -------- TAB 4: FX Rates --------
+    if tab4.open:
+        with tab4:
+            st.markdown("#### Denar / Euro Rates")
+            st.caption(
+                "Each rate applies from its date until the next one. Fixed costs in denars are converted "
+                "at the rate of their month, the consumables total at today's rate."
+            )
+            _, fx_rates = load_fx_rates(FX_RATES_FILE)
+            edited_rates = st.data_editor(
+                fx_rates,
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                key="fx_rates_editor",
+                column_config={
+                    "Date": st.column_config.DateColumn("Date", format="DD/MM/YYYY", required=True),
+                    "MKD per EUR": st.column_config.NumberColumn("MKD per EUR", min_value=0.01, format="%.4f", required=True),
+                },
+            )
+            if st.button("💾 Save FX Rates"):
+                write_fx_rates(edited_rates, FX_RATES_FILE)
+                st.session_state.pop("fx_rates_editor", None)
+                sync_state = queue_github_push("Update FX rates via Streamlit app")
+                remember_github_push_result(sync_state, context="FX rates")
+                st.rerun()
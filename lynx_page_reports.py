@@ -0,0 +1,498 @@
+"""
+Reports page: view and export reports, build custom report templates and
+manage them.
+"""
+import streamlit as st
+import pandas as pd
+import calendar
+import json
+from datetime import datetime
+from typing import Dict, Any, Tuple
+
+from lynx_metrics import (
+    FILE_PATH,
+    METRIC_SECTIONS,
+    METRIC_CATALOG,
+    SECTION_DISPLAY_NAMES,
+)
+from lynx_reports import (
+    REPORT_TEMPLATES_FILE,
+    BUILT_IN_REPORT_TEMPLATES,
+    read_report_templates,
+    report_filter_info,
+    get_report_artifact,
+)
+from lynx_ui import (
+    load_data_version,
+    metric_grid_card,
+    kpi_grid,
+)
+
+
+# ========== REPORTS SYSTEM ==========
+
+def load_report_templates() -> Dict[str, Dict]:
+    """Load user-defined report templates from JSON file."""
+    try:
+        return read_report_templates(REPORT_TEMPLATES_FILE)
+    except (json.JSONDecodeError, IOError, Exception) as e:
+        st.warning(f"Could not load report templates: {e}")
+        return {}
+
+
+def save_report_templates(templates: Dict[str, Dict]) -> None:
+    """Save user-defined report templates to JSON file."""
+    try:
+        # Ensure directory exists
+        REPORT_TEMPLATES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(REPORT_TEMPLATES_FILE, "w", encoding="utf-8") as f:
+            json.dump(templates, f, indent=2, ensure_ascii=False)
+    except (IOError, Exception) as e:
+        st.error(f"Could not save report templates: {e}")
+
+
+def delete_template(template_name: str) -> bool:
+    """
+    Delete a custom template by name.
+    Returns True if deleted successfully, False otherwise.
+    Only deletes user-created templates, not built-in ones.
+    """
+    # Safety check: never delete built-in templates
+    if template_name in BUILT_IN_REPORT_TEMPLATES:
+        st.error(f"Cannot delete built-in template '{template_name}'")
+        return False
+    
+    try:
+        user_templates = load_report_templates()
+        if template_name in user_templates:
+            del user_templates[template_name]
+            save_report_templates(user_templates)
+            return True
+        else:
+            st.warning(f"Template '{template_name}' not found")
+            return False
+    except Exception as e:
+        st.error(f"Error deleting template: {e}")
+        return False
+
+
+def get_all_report_templates() -> Dict[str, Dict]:
+    """Get all report templates (built-in + user-defined)."""
+    builtin = BUILT_IN_REPORT_TEMPLATES.copy()
+    user_templates = load_report_templates()
+    return {**builtin, **user_templates}
+
+
+# NOTE: Email export functionality removed from UI - function kept for potential future use
+# Email export UI was removed due to SMTP configuration complexity and credential management requirements
+def send_email_smtp(
+    recipient_email: str,
+    subject: str,
+    body: str,
+    html_content: str,
+    smtp_server: str,
+    smtp_port: int,
+    sender_email: str,
+    sender_password: str,
+) -> Tuple[bool, str]:
+    """
+    Send email via SMTP with HTML content as attachment.
+    Returns (success: bool, message: str)
+    
+    NOTE: This function is currently unused - email export UI was removed.
+    This requires SMTP credentials. For Gmail, use an App Password.
+    Works with any SMTP server (Gmail, Outlook, custom SMTP).
+    """
+    try:
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        from email.mime.base import MIMEBase
+        from email import encoders
+        
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = subject
+        
+        # Add body
+        msg.attach(MIMEText(body, 'plain'))
+        
+        # Add HTML as attachment
+        attachment = MIMEBase('text', 'html')
+        attachment.set_payload(html_content.encode('utf-8'))
+        encoders.encode_base64(attachment)
+        attachment.add_header(
+            'Content-Disposition',
+            f'attachment; filename=report.html',
+        )
+        msg.attach(attachment)
+        
+        # Send email
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()
+        server.login(sender_email, sender_password)
+        server.send_message(msg)
+        server.quit()
+        
+        return True, "Email sent successfully!"
+    except smtplib.SMTPAuthenticationError:
+        return False, "Authentication failed. Check your email and password (use App Password for Gmail)."
+    except smtplib.SMTPException as e:
+        return False, f"SMTP error: {str(e)}"
+    except Exception as e:
+        return False, f"Error sending email: {str(e)}"
+
+
+def render_report(
+    template: Dict[str, Any],
+    bookings: pd.DataFrame,
+    monthly_costs: pd.DataFrame,
+    filter_params: Dict[str, Any],
+) -> None:
+    """Render a report based on template configuration."""
+    # altair is only needed once a report is generated, not to open the page
+    from lynx_charts import cost_breakdown_spec, revenue_heatmap_spec
+
+    st.markdown("---")
+    st.markdown(f"## {template['name']}")
+    
+    # Reuse the stored artifact when template, filters and data are unchanged
+    artifact = get_report_artifact(
+        template,
+        bookings,
+        monthly_costs,
+        filter_params,
+        load_data_version(FILE_PATH),
+    )
+    metric_info = artifact["metric_info"]
+    chart_data = artifact["chart_data"]
+    
+    # Report metadata
+    st.caption(f"Generated: {artifact['generated_time']}")
+    
+    # Show applied filters
+    filter_info = report_filter_info(filter_params)
+    if filter_info:
+        st.caption(" | ".join(filter_info))
+    
+    # Render metrics
+    st.markdown("### Key Metrics")
+    metric_keys = template.get("metrics", [])
+    
+    kpi_grid([metric_grid_card(metric_info, metric_key) for metric_key in metric_keys if metric_key in metric_info])
+    
+    # Render charts
+    charts = template.get("charts", [])
+    if charts:
+        st.markdown("### Charts")
+        
+        for chart_type in charts:
+            chart_df = chart_data.get(chart_type)
+            
+            if chart_type == "monthly_revenue_line":
+                st.line_chart(chart_df)
+                st.caption("Monthly revenue trend")
+            
+            elif chart_type == "platform_comparison_bar":
+                st.bar_chart(chart_df)
+                st.caption("Platform revenue comparison")
+            
+            elif chart_type == "platform_comparison_table":
+                st.dataframe(chart_df.style.format("{:,.2f}"))
+                st.caption("Platform comparison table")
+            
+            elif chart_type == "cost_breakdown_pie":
+                # Cost breakdown pie chart
+                if chart_df is not None:
+                    if chart_df["Amount"].sum() > 0:
+                        st.vega_lite_chart(cost_breakdown_spec(chart_df), use_container_width=True)
+                        st.caption("Cost breakdown by type")
+                else:
+                    st.info("No cost data available for the selected period.")
+            
+            elif chart_type == "revenue_heatmap":
+                if chart_df is not None:
+                    st.vega_lite_chart(revenue_heatmap_spec(chart_df), use_container_width=True)
+                    st.caption("Revenue heatmap by year and month")
+    
+    # Export section
+    st.markdown("---")
+    st.markdown("### Export Report")
+    
+    # PDF/HTML Download - Works in Streamlit
+    # NOTE: Streamlit cannot generate PDF directly without external libraries.
+    # We provide HTML download which can be converted to PDF using browser's Print to PDF
+    # or external tools. This is the most reliable approach in Streamlit.
+    st.download_button(
+        label="📄 Download Report (HTML)",
+        data=artifact["html"],
+        file_name=f"{template['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.html",
+        mime="text/html",
+        key=f"download_html_{template['name']}",
+        help="Download as HTML file. Open in browser and use 'Print to PDF' for PDF version."
+    )
+    st.caption("💡 Tip: Open the HTML file in your browser and use 'Print to PDF' for PDF format")
+    
+    # Note: Email and Google Drive export functionality removed from UI
+    # Email export (send_email_smtp) and Google Drive upload were removed due to:
+    # - Email: Requires SMTP configuration and credentials management
+    # - Google Drive: OAuth 2.0 complexity in Streamlit (redirect URLs, service accounts, token management)
+    # Users can download HTML and manually share via email or upload to Drive
+
+
+# ========== PAGE ==========
+
+def render(bookings: pd.DataFrame, monthly_costs: pd.DataFrame, toiletries: pd.DataFrame, loaded_base: tuple) -> None:
+    """Render the Reports page."""
+    st.title("📊 Reports")
+    
+    # Tab selection: View Reports, Create Custom Report, or Manage Templates.
+    # The tabs keep their selection in session state and only the open one runs.
+    tab1, tab2, tab3 = st.tabs(
+        ["📋 View Reports", "➕ Create Custom Report", "⚙️ Manage Templates"],
+        key="reports_tab",
+        on_change="rerun",
+    )
+    
+    if tab1.open:
+        with tab1:
+            st.markdown("### Select a Report Template")
+        
+            all_templates = get_all_report_templates()
+            template_names = list(all_templates.keys())
+        
+            selected_template_name = st.selectbox(
+                "Choose a report template",
+                options=template_names,
+                format_func=lambda x: f"{x} {'(Built-in)' if all_templates[x].get('is_builtin') else '(Custom)'}",
+            )
+        
+            if selected_template_name:
+                template = all_templates[selected_template_name]
+                st.markdown(f"**Description:** {template.get('description', 'No description')}")
+            
+                # Filter configuration
+                st.markdown("### Configure Filters")
+            
+                col1, col2 = st.columns(2)
+            
+                with col1:
+                    period_type = st.selectbox(
+                        "Period Type",
+                        options=["year", "month_year", "date_range"],
+                        index=0,
+                        key="report_period_type",
+                    )
+                
+                    if period_type == "year":
+                        available_years = (
+                            bookings["Check-in Year"].dropna().astype(int).sort_values().unique()
+                            if "Check-in Year" in bookings.columns
+                            else []
+                        )
+                        if len(available_years) > 0:
+                            selected_year = st.selectbox("Year", options=available_years, key="report_year")
+                        else:
+                            selected_year = None
+                        filter_params = {"period_type": period_type, "year": int(selected_year) if selected_year else None}
+                
+                    elif period_type == "month_year":
+                        available_years = (
+                            bookings["Check-in Year"].dropna().astype(int).sort_values().unique()
+                            if "Check-in Year" in bookings.columns
+                            else []
+                        )
+                        if len(available_years) > 0:
+                            selected_year = st.selectbox("Year", options=available_years, key="report_year_month")
+                            selected_month = st.selectbox("Month", options=list(range(1, 13)), format_func=lambda x: calendar.month_name[x], key="report_month")
+                        else:
+                            selected_year = None
+                            selected_month = None
+                        filter_params = {
+                            "period_type": period_type,
+                            "year": int(selected_year) if selected_year else None,
+                            "month": selected_month,
+                        }
+                
+                    else:  # date_range
+                        start_date = st.date_input(
+                            "Start Date",
+                            key="report_start_date",
+                            format="DD-MM-YYYY",
+                        )
+                        end_date = st.date_input(
+                            "End Date",
+                            key="report_end_date",
+                            format="DD-MM-YYYY",
+                        )
+                        filter_params = {
+                            "period_type": period_type,
+                            "start_date": start_date,
+                            "end_date": end_date,
+                        }
+            
+                with col2:
+                    platform = st.selectbox(
+                        "Platform",
+                        options=["Overall", "Airbnb", "Booking.com"],
+                        key="report_platform",
+                    )
+                    filter_params["platform"] = platform
+            
+                # Generate report button
+                if st.button("📊 Generate Report", type="primary"):
+                    if selected_template_name in all_templates:
+                        render_report(
+                            all_templates[selected_template_name],
+                            bookings,
+                            monthly_costs,
+                            filter_params,
+                        )
+    
+    if tab2.open:
+        with tab2:
+            st.markdown("### Create Custom Report Template")
+        
+            # All selectable metrics come from the static catalog - nothing is computed here
+            all_metric_keys = METRIC_CATALOG
+        
+            # Report configuration form
+            with st.form("custom_report_form"):
+                report_name = st.text_input("Report Name *", placeholder="e.g., Q4 Performance Review")
+                report_description = st.text_area("Description", placeholder="Brief description of this report")
+            
+                st.markdown("**Select Metrics**")
+                # Group metrics by section for easier selection
+                selected_metrics = []
+                for section_name, section_metrics in METRIC_SECTIONS.items():
+                    if section_name == "Custom":
+                        continue
+                    available_in_section = [m for m in section_metrics if m in all_metric_keys]
+                    if available_in_section:
+                        st.markdown(f"##### {SECTION_DISPLAY_NAMES.get(section_name, section_name)}")
+                        section_selected = st.multiselect(
+                            f"Select from {section_name}",
+                            options=available_in_section,
+                            key=f"custom_report_{section_name}",
+                        )
+                        selected_metrics.extend(section_selected)
+            
+                # Also allow selecting from all metrics
+                st.markdown("##### All Metrics")
+                additional_metrics = st.multiselect(
+                    "Or select from all metrics",
+                    options=[m for m in all_metric_keys if m not in selected_metrics],
+                    key="custom_report_all",
+                )
+                selected_metrics.extend(additional_metrics)
+            
+                # Chart selection
+                st.markdown("**Select Charts**")
+                chart_options = [
+                    "monthly_revenue_line",
+                    "platform_comparison_bar",
+                    "platform_comparison_table",
+                    "cost_breakdown_pie",
+                    "revenue_heatmap",
+                ]
+                selected_charts = st.multiselect(
+                    "Choose charts to include",
+                    options=chart_options,
+                    key="custom_report_charts",
+                )
+            
+                # Default filters
+                st.markdown("**Default Filters**")
+                default_period_type = st.selectbox(
+                    "Default Period Type",
+                    options=["year", "month_year", "date_range"],
+                    key="custom_report_period_type",
+                )
+                default_platform = st.selectbox(
+                    "Default Platform",
+                    options=["Overall", "Airbnb", "Booking.com"],
+                    key="custom_report_platform",
+                )
+            
+                submitted = st.form_submit_button("💾 Save as Template")
+            
+                if submitted:
+                    if not report_name.strip():
+                        st.error("Report name is required!")
+                    elif not selected_metrics:
+                        st.error("Please select at least one metric!")
+                    else:
+                        # Create template
+                        new_template = {
+                            "name": report_name.strip(),
+                            "description": report_description.strip() if report_description else "",
+                            "metrics": selected_metrics,
+                            "filters": {
+                                "period_type": default_period_type,
+                                "platform": default_platform,
+                            },
+                            "charts": selected_charts,
+                            "is_builtin": False,
+                        }
+                    
+                        # Save to file
+                        user_templates = load_report_templates()
+                        user_templates[report_name.strip()] = new_template
+                        save_report_templates(user_templates)
+                    
+                        st.success(f"✅ Template '{report_name}' saved successfully!")
+                        st.info("You can now select this template from the 'View Reports' tab.")
+        
+    if tab3.open:
+        with tab3:
+            st.markdown("### ⚙️ Manage Custom Templates")
+            st.caption("View, manage, and delete your custom report templates. Built-in templates cannot be deleted.")
+        
+            user_templates = load_report_templates()
+        
+            if user_templates:
+                st.write(f"You have **{len(user_templates)}** custom template(s):")
+                st.markdown("---")
+            
+                # Create a more organized template management interface
+                for idx, (template_name, template_data) in enumerate(user_templates.items()):
+                    with st.container():
+                        col_info, col_action = st.columns([4, 1])
+                    
+                        with col_info:
+                            st.markdown(f"#### 📄 {template_name}")
+                            if template_data.get("description"):
+                                st.caption(template_data.get("description"))
+                        
+                            col_meta1, col_meta2, col_meta3 = st.columns(3)
+                            with col_meta1:
+                                st.write(f"📊 **{len(template_data.get('metrics', []))}** metrics")
+                            with col_meta2:
+                                st.write(f"📈 **{len(template_data.get('charts', []))}** charts")
+                            with col_meta3:
+                                period_type = template_data.get('filters', {}).get('period_type', 'N/A')
+                                platform = template_data.get('filters', {}).get('platform', 'N/A')
+                                st.write(f"🔧 {period_type} | {platform}")
+                    
+                        with col_action:
+                            st.write("")  # Spacing
+                            # Use a unique key that includes index to avoid conflicts
+                            delete_key = f"delete_template_{idx}_{template_name}"
+                            if st.button("🗑️ Delete", key=delete_key, type="secondary"):
+                                # Confirm deletion
+                                if delete_template(template_name):
+                                    st.success(f"✅ Template '{template_name}' deleted successfully!")
+                                    st.rerun()
+                                else:
+                                    st.error(f"❌ Failed to delete template '{template_name}'")
+                    
+                        if idx < len(user_templates) - 1:
+                            st.divider()
+            
+                st.markdown("---")
+                st.info("💡 **Tip:** Custom templates are saved permanently. You can use them anytime in the 'View Reports' tab.")
+            else:
+                st.info("📝 No custom templates yet. Create one in the 'Create Custom Report' tab to get started!")
+                st.caption("Custom templates are saved permanently and can be reused anytime.")
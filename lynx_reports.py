@@ -0,0 +1,964 @@
+"""
+Report templates and report rendering for the Lynx Apartment dashboard.
+
+Free of Streamlit calls so reports can be rendered from the app as well as in
+batch from the command line:
+
+    python lynx_reports.py --from 2025-01 --to 2025-12 --out reports
+
+renders every built-in and custom template for every month (and, with --years,
+every year) in the range into the output directory, alongside a manifest.json.
+Add --combined for one document per template covering all periods, and --zip
+to write everything into a single archive.
+"""
+import argparse
+import calendar
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from lynx_metrics import (
+    FILE_PATH,
+    calculate_all_metrics,
+    compute_nights_available,
+    filter_bookings_by_period,
+    filter_monthly_costs_by_period,
+    monthly_revenue_by_platform,
+    revenue_heatmap_frame,
+    load_tracker,
+    tracker_content_hash,
+)
+
+
+# 🔧 CONFIG
+REPORT_TEMPLATES_FILE = Path("lynx_report_templates.json")
+REPORT_CACHE_DIR = Path(".lynx_cache/reports")
+REPORT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Metrics a chart reads in addition to the template's own metrics
+REPORT_CHART_METRICS = {
+    "cost_breakdown_pie": [
+        "Reservations",
+        "Transportation Cost per Stay (€)",
+        "Laundry Cost per Stay (€)",
+        "Consumable Cost per Stay (€)",
+        "Bank Fees per Stay (€)",
+    ],
+}
+
+
+# Built-in report templates
+BUILT_IN_REPORT_TEMPLATES = {
+    "Monthly Performance Summary": {
+        "name": "Monthly Performance Summary",
+        "description": "Core KPIs for a selected month or date range",
+        "metrics": [
+            "Reservations",
+            "Total nights",
+            "Total revenue (€)",
+            "Net Profit (€)",
+            "Occupancy (%)",
+            "Average price per night (€)",
+            "Revenue per Available Night (€)",
+            "Average Daily Rate (€)",
+            "Profit Margin (%)",
+        ],
+        "filters": {
+            "period_type": "month_year",  # month_year, date_range
+            "platform": "Overall",  # Overall, Airbnb, Booking.com
+        },
+        "charts": ["monthly_revenue_line"],
+        "is_builtin": True,
+    },
+    "Platform Comparison": {
+        "name": "Platform Comparison",
+        "description": "Compare Airbnb vs Booking.com performance",
+        "metrics": [
+            "Airbnb revenue (€)",
+            "Booking.com revenue (€)",
+            "Airbnb nights",
+            "Booking.com nights",
+            "Airbnb ADR (€)",
+            "Booking.com ADR (€)",
+            "Airbnb RevPAR (€)",
+            "Booking.com RevPAR (€)",
+            "Platform Profitability Difference (€)",
+            "Airbnb share of revenue (%)",
+            "Booking.com share of revenue (%)",
+        ],
+        "filters": {
+            "period_type": "date_range",
+            "platform": "Overall",
+        },
+        "charts": ["platform_comparison_bar", "platform_comparison_table"],
+        "is_builtin": True,
+    },
+    "Profitability & Cost Breakdown": {
+        "name": "Profitability & Cost Breakdown",
+        "description": "Detailed profitability analysis with cost breakdown",
+        "metrics": [
+            "Profit Margin (%)",
+            "Profit per Night (€)",
+            "Profit per Stay (€)",
+            "Cost per Reservation (€)",
+            "Average Cost per Night (€)",
+            "Variable vs Fixed Cost Ratio",
+            "Total Fixed Costs (€)",
+            "Total Per-Stay Expenses (€)",
+            "Transportation Cost per Stay (€)",
+            "Laundry Cost per Stay (€)",
+            "Consumable Cost per Stay (€)",
+            "Bank Fees per Stay (€)",
+        ],
+        "filters": {
+            "period_type": "date_range",
+            "platform": "Overall",
+        },
+        "charts": ["cost_breakdown_pie"],
+        "is_builtin": True,
+    },
+    "Seasonality & Trends": {
+        "name": "Seasonality & Trends",
+        "description": "Revenue trends and seasonality analysis",
+        "metrics": [
+            "Best month by revenue",
+            "Worst Month by Revenue (€)",
+            "Month-over-Month Revenue Change (%)",
+            "Year-over-Year Revenue Change (%)",
+            "3-Month Moving Average Revenue (€)",
+            "Seasonal Index",
+            "Projected next-year revenue",
+            "Projected Next-Year Revenue (Weighted)",
+        ],
+        "filters": {
+            "period_type": "date_range",
+            "platform": "Overall",
+        },
+        "charts": ["monthly_revenue_line", "revenue_heatmap"],
+        "is_builtin": True,
+    },
+    "Guest Profile Snapshot": {
+        "name": "Guest Profile Snapshot",
+        "description": "Guest demographics and behavior insights",
+        "metrics": [
+            "Average group size",
+            "Baby Crib usage (%)",
+            "Sofa Bed usage (%)",
+            "Parking Usage (%)",
+            "Top Countries by Bookings",
+            "Top Countries by Revenue",
+            "Average Revenue per Stay (€)",
+            "Revenue per Guest (€)",
+        ],
+        "filters": {
+            "period_type": "date_range",
+            "platform": "Overall",
+        },
+        "charts": [],
+        "is_builtin": True,
+    },
+}
+
+
+def read_report_templates(path: Path = REPORT_TEMPLATES_FILE) -> Dict[str, Dict]:
+    """
+    Read user-defined report templates from JSON file.
+    
+    Templates without a 'name' or 'metrics' entry are skipped. Read and parse
+    errors are raised to the caller.
+    """
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        return {}
+    # Filter out corrupted templates (must have 'name' and 'metrics')
+    return {
+        key: template
+        for key, template in data.items()
+        if isinstance(template, dict) and 'name' in template and 'metrics' in template
+    }
+
+
+def report_metric_keys(template: Dict[str, Any]) -> List[str]:
+    """Metric keys a template needs: its own metrics plus those its charts read."""
+    keys = list(template.get("metrics", []))
+    for chart_type in template.get("charts", []):
+        keys.extend(key for key in REPORT_CHART_METRICS.get(chart_type, []) if key not in keys)
+    return keys
+
+
+def report_filter_info(filter_params: Dict[str, Any]) -> List[str]:
+    """Human-readable description of the report filters (period, platform)."""
+    filter_info = []
+    if filter_params.get("period_type") == "month_year":
+        month_name = calendar.month_name[filter_params.get("month", 1)]
+        filter_info.append(f"Period: {month_name} {filter_params.get('year', 'N/A')}")
+    elif filter_params.get("period_type") == "date_range":
+        start = filter_params.get("start_date", "")
+        end = filter_params.get("end_date", "")
+        filter_info.append(f"Period: {start} to {end}")
+    elif filter_params.get("period_type") == "year":
+        filter_info.append(f"Year: {filter_params.get('year', 'N/A')}")
+    
+    if filter_params.get("platform") and filter_params["platform"] != "Overall":
+        filter_info.append(f"Platform: {filter_params['platform']}")
+    
+    return filter_info
+
+
+def compute_report_metrics(
+    bookings: pd.DataFrame,
+    monthly_costs: pd.DataFrame,
+    filter_params: Dict[str, Any],
+    metric_keys: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Dict]]:
+    """
+    Filter the data for a report and calculate its metrics.
+    
+    Only metric_keys are calculated when given (see report_metric_keys).
+    
+    Returns:
+        (bookings_filtered, metric_info)
+    """
+    # Filter data
+    bookings_filtered = filter_bookings_by_period(
+        bookings,
+        filter_params.get("period_type", "year"),
+        filter_params.get("year"),
+        filter_params.get("month"),
+        filter_params.get("start_date"),
+        filter_params.get("end_date"),
+    )
+    
+    # Apply platform filter
+    platform = filter_params.get("platform", "Overall")
+    if platform != "Overall":
+        bookings_filtered = bookings_filtered[
+            bookings_filtered["Platform"].replace({"Booking": "Booking.com"}) == platform
+        ]
+    
+    # Filter monthly costs using the helper function
+    monthly_costs_filtered = filter_monthly_costs_by_period(
+        monthly_costs,
+        filter_params.get("period_type", "year"),
+        filter_params.get("year"),
+        filter_params.get("month"),
+        filter_params.get("start_date"),
+        filter_params.get("end_date"),
+    )
+    
+    # Calculate nights available based on period type
+    selected_year = filter_params.get("year")
+    nights_available = compute_nights_available(
+        bookings_filtered,
+        selected_year=selected_year,
+        period_type=filter_params.get("period_type"),
+        month=filter_params.get("month"),
+        start_date=filter_params.get("start_date"),
+        end_date=filter_params.get("end_date"),
+    )
+    
+    # Determine start_date and end_date for metrics calculation
+    report_start_date = None
+    report_end_date = None
+    period_type = filter_params.get("period_type", "year")
+    if period_type == "date_range":
+        report_start_date = filter_params.get("start_date")
+        report_end_date = filter_params.get("end_date")
+        if report_start_date:
+            report_start_date = pd.Timestamp(report_start_date)
+        if report_end_date:
+            report_end_date = pd.Timestamp(report_end_date)
+    elif period_type == "year" and selected_year is not None:
+        # For year selection, use year boundaries
+        report_start_date = pd.Timestamp(year=selected_year, month=1, day=1)
+        report_end_date = pd.Timestamp(year=selected_year, month=12, day=31)
+    
+    metric_info = calculate_all_metrics(
+        bookings_filtered,
+        monthly_costs_filtered,
+        platform,
+        nights_available,
+        selected_year,
+        start_date=report_start_date,
+        end_date=report_end_date,
+        bookings_all=bookings,  # Pass all bookings for overlap calculation
+        metric_keys=metric_keys,
+    )
+    return bookings_filtered, metric_info
+
+
+# ========== HTML EXPORT ==========
+
+# Shared stylesheet for exported reports - the same for every report, so it is built once
+REPORT_CSS = """        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            margin: 40px;
+            background-color: #f5f5f5;
+            color: #333;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background-color: white;
+            padding: 30px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #1f77b4;
+            border-bottom: 3px solid #1f77b4;
+            padding-bottom: 10px;
+        }
+        .metadata {
+            color: #666;
+            font-size: 0.9em;
+            margin-bottom: 30px;
+        }
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            margin: 30px 0;
+        }
+        .metric-card {
+            border: 1px solid #ddd;
+            border-radius: 6px;
+            padding: 15px;
+            background-color: #fafafa;
+            transition: box-shadow 0.2s;
+        }
+        .metric-card:hover {
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
+        .metric-label {
+            font-size: 0.85em;
+            color: #666;
+            margin-bottom: 8px;
+        }
+        .metric-value {
+            font-size: 1.8em;
+            font-weight: bold;
+            color: #1f77b4;
+            margin-bottom: 5px;
+        }
+        .metric-explanation {
+            font-size: 0.8em;
+            color: #999;
+            font-style: italic;
+        }
+        .section-title {
+            font-size: 1.3em;
+            color: #333;
+            margin-top: 40px;
+            margin-bottom: 20px;
+            border-left: 4px solid #1f77b4;
+            padding-left: 10px;
+        }
+        @media print {
+            body {
+                background-color: white;
+                margin: 20px;
+            }
+            .container {
+                box-shadow: none;
+            }
+        }
+"""
+
+# Precompiled document fragments; generate/stream functions only fill them in
+_DOC_START = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>
+"""
+_DOC_HEADER = """    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>{title}</h1>
+        <div class="metadata">
+            <strong>Generated:</strong> {generated_time}<br>
+            <strong>Filters:</strong> {filter_str}
+        </div>
+"""
+_SECTION_START = """        
+        <div class="section-title">{title}</div>
+        <div class="metrics-grid">
+"""
+_METRIC_CARD = """
+            <div class="metric-card">
+                <div class="metric-label">{label}</div>
+                <div class="metric-value">{prefix}{value}</div>
+                <div class="metric-explanation">{explanation}</div>
+            </div>
+"""
+_SECTION_END = """
+        </div>
+"""
+_DOC_END = """    </div>
+</body>
+</html>
+"""
+
+
+def format_report_value(value: Any) -> str:
+    """Format a metric value for the exported report (thousands separators, 2 decimals)."""
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def iter_report_html(
+    template: Dict[str, Any],
+    sections: Iterable[Tuple[Dict[str, Any], Dict[str, Dict]]],
+    generated_time: str,
+    filter_str: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Stream a report document as HTML chunks.
+    
+    Args:
+        template: Report template (name and metric keys)
+        sections: (filter_params, metric_info) per section. Consumed lazily, so a
+            generator computing one period at a time keeps memory flat.
+        generated_time: Timestamp shown in the header
+        filter_str: Header filter description. Defaults to the filters of a single
+            section; multi-section documents label each section with its period.
+    """
+    sections = iter(sections)
+    first = next(sections, None)
+    second = next(sections, None)
+    multi = second is not None
+
+    if filter_str is None:
+        if first is None:
+            filter_str = "All data"
+        elif multi:
+            platform = first[0].get("platform", "Overall")
+            filter_str = f"Platform: {platform}" if platform != "Overall" else "All platforms"
+        else:
+            filter_str = " | ".join(report_filter_info(first[0])) or "All data"
+
+    yield _DOC_START.format(title=template['name'])
+    yield REPORT_CSS
+    yield _DOC_HEADER.format(title=template['name'], generated_time=generated_time, filter_str=filter_str)
+
+    metric_keys = template.get("metrics", [])
+    remaining = [s for s in (first, second) if s is not None]
+    for filter_params, metric_info in itertools.chain(remaining, sections):
+        if multi:
+            period_info = [info for info in report_filter_info(filter_params) if not info.startswith("Platform:")]
+            title = f"Key Metrics - {' | '.join(period_info) or 'All data'}"
+        else:
+            title = "Key Metrics"
+        yield _SECTION_START.format(title=title)
+        yield "".join(
+            _METRIC_CARD.format(
+                label=metric_info[key]['label'],
+                prefix=metric_info[key]['prefix'],
+                value=format_report_value(metric_info[key]["value"]),
+                explanation=metric_info[key]['explanation'],
+            )
+            for key in metric_keys
+            if key in metric_info
+        )
+        yield _SECTION_END
+
+    yield _DOC_END
+
+
+def generate_report_html_content(
+    template: Dict[str, Any],
+    metric_info: Dict[str, Dict],
+    filter_params: Dict[str, Any],
+    generated_time: str,
+) -> str:
+    """
+    Generate HTML content for a report that can be downloaded or converted to PDF.
+    This works within Streamlit's constraints - generates clean HTML that can be
+    downloaded and opened in a browser or converted to PDF externally.
+    """
+    return "".join(iter_report_html(template, [(filter_params, metric_info)], generated_time))
+
+
+def write_report_html(chunks: Iterable[str], target: Union[Path, BinaryIO]) -> int:
+    """
+    Write streamed HTML chunks to a file path or a binary buffer (e.g. BytesIO for downloads).
+    
+    Returns:
+        Number of bytes written
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as f:
+            return write_report_html(chunks, f)
+    written = 0
+    for chunk in chunks:
+        written += target.write(chunk.encode("utf-8"))
+    return written
+
+
+def write_report_archive(
+    target: Union[Path, BinaryIO],
+    reports: Iterable[Tuple[str, Iterable[str]]],
+) -> Dict[str, int]:
+    """
+    Write several reports into one ZIP archive, streaming each document into its entry.
+    
+    Args:
+        target: Archive path or binary buffer
+        reports: (name inside the archive, HTML chunks) per report
+    
+    Returns:
+        dict name inside the archive -> uncompressed size in bytes
+    """
+    sizes = {}
+    date_time = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for arcname, chunks in reports:
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, "w") as entry:
+                sizes[arcname] = write_report_html(chunks, entry)
+    return sizes
+
+def build_report_chart_data(
+    template: Dict[str, Any],
+    bookings_filtered: pd.DataFrame,
+    metric_info: Dict[str, Dict],
+    platform: str,
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Prepare the data behind each chart of a report template.
+    
+    Returns:
+        dict chart_type -> DataFrame, or None when the chart has no data to show
+    """
+    chart_data: Dict[str, Optional[pd.DataFrame]] = {}
+    charts = template.get("charts", [])
+    monthly_revenue_data = None
+    if {"monthly_revenue_line", "platform_comparison_bar", "platform_comparison_table"} & set(charts):
+        monthly_revenue_data = monthly_revenue_by_platform(bookings_filtered)
+    
+    for chart_type in charts:
+        if chart_type == "monthly_revenue_line":
+            if platform == "Overall":
+                chart_df = monthly_revenue_data[["Airbnb", "Booking.com"]].copy()
+                chart_df["Total"] = chart_df["Airbnb"] + chart_df["Booking.com"]
+            elif platform == "Airbnb":
+                chart_df = monthly_revenue_data[["Airbnb"]]
+            else:
+                chart_df = monthly_revenue_data[["Booking.com"]]
+            chart_data[chart_type] = chart_df
+        
+        elif chart_type == "platform_comparison_bar":
+            chart_data[chart_type] = monthly_revenue_data[["Airbnb", "Booking.com"]]
+        
+        elif chart_type == "platform_comparison_table":
+            comparison_df = monthly_revenue_data[["Airbnb", "Booking.com"]].copy()
+            comparison_df["Difference"] = comparison_df["Airbnb"] - comparison_df["Booking.com"]
+            chart_data[chart_type] = comparison_df
+        
+        elif chart_type == "cost_breakdown_pie":
+            # Per-stay costs scaled back up to totals for the period
+            reservations_count = metric_info.get("Reservations", {}).get("value", 0)
+            if reservations_count > 0:
+                trans_cost = metric_info.get("Transportation Cost per Stay (€)", {}).get("value", 0)
+                laundry_cost = metric_info.get("Laundry Cost per Stay (€)", {}).get("value", 0)
+                supplies_cost = metric_info.get("Consumable Cost per Stay (€)", {}).get("value", 0)
+                bank_fees_cost = metric_info.get("Bank Fees per Stay (€)", {}).get("value", 0)
+                
+                cost_data = {
+                    "Transportation": float(trans_cost * reservations_count),
+                    "Laundry": float(laundry_cost * reservations_count),
+                    "Consumables": float(supplies_cost * reservations_count),
+                    "Bank Fees": float(bank_fees_cost * reservations_count),
+                }
+                chart_data[chart_type] = pd.DataFrame(list(cost_data.items()), columns=["Cost Type", "Amount"])
+            else:
+                chart_data[chart_type] = None
+        
+        elif chart_type == "revenue_heatmap":
+            chart_data[chart_type] = revenue_heatmap_frame(bookings_filtered, platform)
+    
+    return chart_data
+
+
+def build_report_artifact(
+    template: Dict[str, Any],
+    bookings: pd.DataFrame,
+    monthly_costs: pd.DataFrame,
+    filter_params: Dict[str, Any],
+    generated_time: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compute everything needed to show or export one report.
+    
+    Returns:
+        dict with generated_time, metric_info (only the template's metrics),
+        chart_data (see build_report_chart_data) and html
+    """
+    if generated_time is None:
+        generated_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    platform = filter_params.get("platform", "Overall")
+    bookings_filtered, metric_info = compute_report_metrics(
+        bookings, monthly_costs, filter_params, metric_keys=report_metric_keys(template)
+    )
+    return {
+        "generated_time": generated_time,
+        "metric_info": {
+            key: metric_info[key] for key in template.get("metrics", []) if key in metric_info
+        },
+        "chart_data": build_report_chart_data(template, bookings_filtered, metric_info, platform),
+        "html": generate_report_html_content(template, metric_info, filter_params, generated_time),
+    }
+
+
+# ========== REPORT CACHE ==========
+
+def _cache_value(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class ReportArtifactCache:
+    """
+    On-disk cache of report artifacts (see build_report_artifact).
+    
+    Entries are keyed by the template definition, the filter parameters and the
+    tracker content hash, so they never go stale - a changed template, filter or
+    workbook simply produces a different key. Least recently used entries are
+    evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(template: Dict[str, Any], filter_params: Dict[str, Any], data_version: str) -> str:
+        payload = json.dumps(
+            {
+                "template": template,
+                "filters": {k: _cache_value(v) for k, v in filter_params.items()},
+                "data_version": data_version,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                artifact = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable entry (e.g. written by another pandas version) - drop it
+            path.unlink(missing_ok=True)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return artifact
+
+    def put(self, key: str, artifact: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.cache_dir.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+
+def get_report_artifact(
+    template: Dict[str, Any],
+    bookings: pd.DataFrame,
+    monthly_costs: pd.DataFrame,
+    filter_params: Dict[str, Any],
+    data_version: str,
+    cache: Optional[ReportArtifactCache] = None,
+) -> Dict[str, Any]:
+    """Return the cached artifact for this template, filters and data version, building it on a miss."""
+    cache = cache or ReportArtifactCache()
+    key = cache.make_key(template, filter_params, data_version)
+    artifact = cache.get(key)
+    if artifact is None:
+        artifact = build_report_artifact(template, bookings, monthly_costs, filter_params)
+        try:
+            cache.put(key, artifact)
+        except OSError:
+            # Read-only or full disk - the report still renders, just uncached
+            pass
+    return artifact
+
+
+# ========== BATCH RENDERING ==========
+
+# Tracker data for the current batch worker process (set once by the pool initializer)
+_BATCH_DATA: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+
+
+def report_periods(
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    include_years: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    List report periods between two (year, month) pairs, both inclusive.
+    
+    Returns one month_year filter per month and, with include_years, one year
+    filter per calendar year touched by the range.
+    """
+    periods = []
+    year, month = start
+    while (year, month) <= end:
+        periods.append({"period_type": "month_year", "year": year, "month": month})
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    if include_years:
+        for year in range(start[0], end[0] + 1):
+            periods.append({"period_type": "year", "year": year})
+    return periods
+
+
+def period_label(period: Dict[str, Any]) -> str:
+    if period["period_type"] == "month_year":
+        return f"{period['year']}-{period['month']:02d}"
+    return str(period["year"])
+
+
+def report_file_name(template_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", template_name).strip("_") + ".html"
+
+
+def _init_batch_worker(bookings: pd.DataFrame, monthly_costs: pd.DataFrame) -> None:
+    global _BATCH_DATA
+    _BATCH_DATA = (bookings, monthly_costs)
+
+
+def _compute_period_metrics(job: Dict[str, Any]) -> Dict[str, Dict]:
+    """Calculate the metrics of one (period, platform) in a batch worker."""
+    bookings, monthly_costs = _BATCH_DATA
+    filter_params = {**job["period"], "platform": job["platform"]}
+    _, metric_info = compute_report_metrics(bookings, monthly_costs, filter_params, metric_keys=job["metric_keys"])
+    return metric_info
+
+
+def render_reports_batch(
+    templates: Dict[str, Dict],
+    periods: List[Dict[str, Any]],
+    output_dir: Path,
+    file_path: Path = FILE_PATH,
+    workers: Optional[int] = None,
+    combined: bool = False,
+    archive: bool = False,
+) -> Path:
+    """
+    Render every template for every period into output_dir and write manifest.json.
+    
+    The tracker is read once and handed to each worker process once. Metrics are
+    calculated in parallel once per (period, platform) and shared by all templates
+    for that platform; documents are then streamed straight to disk.
+    
+    Args:
+        templates: Templates to render, keyed by name
+        periods: Period filters (see report_periods)
+        output_dir: Directory for the reports and manifest.json
+        file_path: Tracker workbook
+        workers: Worker processes (None = CPU count, 1 = calculate in this process)
+        combined: One document per template with a section per period, instead of
+            one document per template and period
+        archive: Write the documents into output_dir/reports.zip instead of loose files
+    
+    Returns:
+        Path to manifest.json
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    bookings, monthly_costs, _ = load_tracker(file_path)
+    generated_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Templates sharing a platform share one metrics calculation per period
+    by_platform: Dict[str, List[Dict]] = {}
+    for template in templates.values():
+        platform = template.get("filters", {}).get("platform", "Overall")
+        by_platform.setdefault(platform, []).append(template)
+
+    jobs = [
+        {
+            "period": period,
+            "platform": platform,
+            # Union of what the platform's templates show - one calculation covers them all
+            "metric_keys": list(dict.fromkeys(
+                key for template in platform_templates for key in report_metric_keys(template)
+            )),
+        }
+        for period in periods
+        for platform, platform_templates in by_platform.items()
+    ]
+
+    if workers == 1 or len(jobs) <= 1:
+        _init_batch_worker(bookings, monthly_costs)
+        results = [_compute_period_metrics(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(bookings, monthly_costs),
+        ) as pool:
+            results = list(pool.map(_compute_period_metrics, jobs))
+
+    sections: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Dict]]]] = {}
+    for job, metric_info in zip(jobs, results):
+        filter_params = {**job["period"], "platform": job["platform"]}
+        sections.setdefault(job["platform"], []).append((filter_params, metric_info))
+
+    # (file name, HTML chunks, manifest entry) for every document
+    documents = []
+    for platform, platform_templates in by_platform.items():
+        for template in platform_templates:
+            file_name = report_file_name(template["name"])
+            if combined:
+                documents.append((
+                    file_name,
+                    iter_report_html(template, sections[platform], generated_time),
+                    {"template": template["name"], "periods": [period_label(p) for p in periods], "platform": platform},
+                ))
+                continue
+            for filter_params, metric_info in sections[platform]:
+                label = period_label(filter_params)
+                documents.append((
+                    f"{label}/{file_name}",
+                    iter_report_html(template, [(filter_params, metric_info)], generated_time),
+                    {"template": template["name"], "period": label, **filter_params},
+                ))
+
+    entries = []
+    if archive:
+        sizes = write_report_archive(
+            output_dir / "reports.zip",
+            ((name, chunks) for name, chunks, _ in documents),
+        )
+        entries = [
+            {**entry, "file": f"reports.zip:{name}", "bytes": sizes[name]}
+            for name, _, entry in documents
+        ]
+    else:
+        for name, chunks, entry in documents:
+            report_path = output_dir / name
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            size = write_report_html(chunks, report_path)
+            entries.append({**entry, "file": name, "bytes": size})
+
+    manifest = {
+        "generated": generated_time,
+        "source": str(file_path),
+        "data_version": tracker_content_hash(file_path),
+        "templates": list(templates),
+        "periods": [period_label(period) for period in periods],
+        "reports": entries,
+    }
+    manifest_path = output_dir / "manifest.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest_path
+
+
+def _parse_year_month(value: str) -> Tuple[int, int]:
+    try:
+        parsed = datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got '{value}'")
+    return parsed.year, parsed.month
+
+
+def _data_month_range(bookings: pd.DataFrame) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    check_in = pd.to_datetime(bookings["Check-in date"], errors="coerce").dropna()
+    if check_in.empty:
+        today = datetime.now()
+        return (today.year, today.month), (today.year, today.month)
+    first, last = check_in.min(), check_in.max()
+    return (first.year, first.month), (last.year, last.month)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render Lynx report templates for a range of periods")
+    parser.add_argument("--from", dest="start", type=_parse_year_month, help="First month, YYYY-MM (default: first booking)")
+    parser.add_argument("--to", dest="end", type=_parse_year_month, help="Last month, YYYY-MM (default: last booking)")
+    parser.add_argument("--years", action="store_true", help="Also render one report per calendar year")
+    parser.add_argument("--template", action="append", dest="templates", help="Only render this template (repeatable)")
+    parser.add_argument("--out", type=Path, default=Path("reports"), help="Output directory (default: reports)")
+    parser.add_argument("--combined", action="store_true", help="One document per template with a section per period")
+    parser.add_argument("--zip", action="store_true", help="Write the reports into reports.zip instead of loose files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--file", type=Path, default=FILE_PATH, help="Path to the tracker workbook")
+    parser.add_argument("--templates-file", type=Path, default=REPORT_TEMPLATES_FILE, help="Custom report templates JSON")
+    args = parser.parse_args(argv)
+
+    templates = {**BUILT_IN_REPORT_TEMPLATES, **read_report_templates(args.templates_file)}
+    if args.templates:
+        unknown = [name for name in args.templates if name not in templates]
+        if unknown:
+            parser.error(f"unknown template(s): {', '.join(unknown)}")
+        templates = {name: templates[name] for name in args.templates}
+
+    start, end = args.start, args.end
+    if start is None or end is None:
+        data_start, data_end = _data_month_range(load_tracker(args.file)[0])
+        start, end = start or data_start, end or data_end
+    if end < start:
+        parser.error("--to must not be before --from")
+
+    periods = report_periods(start, end, include_years=args.years)
+    manifest_path = render_reports_batch(
+        templates, periods, args.out, args.file, args.workers, combined=args.combined, archive=args.zip
+    )
+    with open(manifest_path, encoding="utf-8") as f:
+        report_count = len(json.load(f)["reports"])
+    print(f"Rendered {report_count} reports ({len(templates)} templates, {len(periods)} periods) into {manifest_path.parent}")
+
+
+if __name__ == "__main__":
+    main()
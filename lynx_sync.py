@@ -0,0 +1,576 @@
+"""
+GitHub sync for the Lynx tracker files.
+
+Free of Streamlit calls: the app passes in the GitHub settings it reads from
+st.secrets. Pushes go through the Git Data API so any set of files lands in a
+single commit (blobs -> tree -> commit -> ref update), and files whose content
+already matches the branch are not uploaded at all.
+
+Requests share keep-alive connections, reads are revalidated with ETags, and
+the branch state left by our own last push is remembered so the next push only
+has to check that the branch head has not moved.
+
+The API base URL is part of the config ("api_url"), so the whole push path can
+be exercised against a local mock server.
+"""
+import base64
+import hashlib
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+# ========== HTTP ==========
+
+MAX_IDLE_CONNECTIONS = 4  # per host
+ETAG_CACHE_SIZE = 128
+
+_pool_lock = threading.Lock()
+_idle_connections: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+_etag_cache: "OrderedDict[str, tuple[str, dict]]" = OrderedDict()
+
+
+def _acquire_connection(scheme: str, netloc: str) -> tuple[http.client.HTTPConnection, bool]:
+    """An idle keep-alive connection to the host if there is one, else a new one."""
+    with _pool_lock:
+        idle = _idle_connections.get((scheme, netloc))
+        if idle:
+            return idle.pop(), True
+    connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return connection_class(netloc, timeout=60), False
+
+
+def _release_connection(scheme: str, netloc: str, connection: http.client.HTTPConnection) -> None:
+    with _pool_lock:
+        idle = _idle_connections.setdefault((scheme, netloc), [])
+        if len(idle) < MAX_IDLE_CONNECTIONS:
+            idle.append(connection)
+            return
+    connection.close()
+
+
+def github_api_request(
+    method: str,
+    url: str,
+    token: str,
+    payload: Optional[dict] = None,
+) -> tuple[int, dict, str]:
+    """
+    One GitHub API call over a pooled keep-alive connection.
+
+    GET responses are cached by URL with their ETag and revalidated with
+    If-None-Match; a 304 is returned as the cached 200 response (and does not
+    count against the API rate limit).
+    """
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+        "User-Agent": "lynx-apartment-dashboard",
+    }
+    data = None
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+
+    cached = None
+    if method == "GET":
+        with _pool_lock:
+            cached = _etag_cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+    for attempt in range(2):
+        connection, reused = _acquire_connection(parts.scheme, parts.netloc)
+        try:
+            connection.request(method, target, body=data, headers=headers)
+            response = connection.getresponse()
+            body = response.read().decode("utf-8", errors="replace")
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+            connection.close()
+            if reused and attempt == 0:
+                # The server closed an idle keep-alive connection - retry on a fresh one
+                continue
+            return 0, {}, str(exc)
+        except Exception as exc:
+            connection.close()
+            return 0, {}, str(exc)
+        break
+
+    if response.will_close:
+        connection.close()
+    else:
+        _release_connection(parts.scheme, parts.netloc, connection)
+
+    if response.status == 304 and cached:
+        with _pool_lock:
+            _etag_cache.move_to_end(url)
+        return 200, cached[1], ""
+
+    try:
+        body_json = json.loads(body) if body else {}
+    except json.JSONDecodeError:
+        body_json = {}
+
+    if response.status >= 400:
+        return response.status, body_json, body_json.get("message") or body or response.reason
+
+    etag = response.getheader("ETag")
+    if method == "GET" and response.status == 200 and etag:
+        with _pool_lock:
+            _etag_cache[url] = (etag, body_json)
+            _etag_cache.move_to_end(url)
+            while len(_etag_cache) > ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+    return response.status, body_json, ""
+
+
+# ========== GIT DATA API PUSH ==========
+
+# Last branch state we read or wrote ourselves, per (repo URL, branch):
+# head commit sha, its tree sha and the blob sha of every file in that tree.
+_branch_state: dict[tuple[str, str], dict] = {}
+
+
+def git_blob_sha(content: bytes) -> str:
+    """The sha git (and GitHub) assigns to a blob with this content."""
+    header = f"blob {len(content)}\0".encode("ascii")
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def repo_file_path(file_path: Path) -> str:
+    """Path of a local file inside the repository, with forward slashes."""
+    return str(file_path).replace("\\", "/")
+
+
+def push_files_via_git_data_api(
+    file_paths: list[Path],
+    commit_message: str,
+    config: dict,
+) -> tuple[bool, str, Optional[str]]:
+    """
+    Commit several files to GitHub in one commit via the Git Data API.
+
+    Only files whose blob sha differs from the branch head are uploaded. If none
+    differ, nothing is committed. A ref update rejected because the branch moved
+    in the meantime is retried once on top of the new head.
+
+    Returns:
+        (success, message, commit sha now at the branch head or None on failure)
+    """
+    files = {}
+    for file_path in file_paths:
+        if not file_path.is_file():
+            return False, f"File not found: {file_path}", None
+        files[repo_file_path(file_path)] = file_path.read_bytes()
+
+    owner = config["owner"]
+    repo = config["repo"]
+    branch = config["branch"]
+    token = config["token"]
+    repo_url = f"{config.get('api_url', GITHUB_API_URL).rstrip('/')}/repos/{owner}/{repo}"
+    ref_url = f"{repo_url}/git/refs/heads/{urllib.parse.quote(branch)}"
+    state_key = (repo_url, branch)
+
+    for attempt in range(2):
+        # Current branch head and its tree
+        status, data, err = github_api_request("GET", f"{repo_url}/git/ref/heads/{urllib.parse.quote(branch)}", token)
+        if status != 200:
+            return False, f"GitHub read failed ({status}): {err}", None
+        head_sha = data["object"]["sha"]
+
+        known = _branch_state.get(state_key)
+        if known and known["head_sha"] == head_sha:
+            # Branch is still where we left it - our tree listing is authoritative
+            base_tree_sha = known["tree_sha"]
+            remote_shas = known["blob_shas"]
+        else:
+            status, data, err = github_api_request("GET", f"{repo_url}/git/commits/{head_sha}", token)
+            if status != 200:
+                return False, f"GitHub read failed ({status}): {err}", None
+            base_tree_sha = data["tree"]["sha"]
+
+            status, data, err = github_api_request("GET", f"{repo_url}/git/trees/{base_tree_sha}?recursive=1", token)
+            if status != 200:
+                return False, f"GitHub read failed ({status}): {err}", None
+            remote_shas = {item["path"]: item["sha"] for item in data.get("tree", []) if item.get("type") == "blob"}
+            if data.get("truncated"):
+                # Listing is incomplete - don't let a missing path look like a known state
+                _branch_state.pop(state_key, None)
+            else:
+                _branch_state[state_key] = {"head_sha": head_sha, "tree_sha": base_tree_sha, "blob_shas": remote_shas}
+
+        changed = {
+            path: content
+            for path, content in files.items()
+            if remote_shas.get(path) != git_blob_sha(content)
+        }
+        if not changed:
+            return True, f"Already up to date on GitHub ({owner}/{repo}@{branch}).", head_sha
+
+        tree_entries = []
+        for path, content in changed.items():
+            status, data, err = github_api_request(
+                "POST",
+                f"{repo_url}/git/blobs",
+                token,
+                {"content": base64.b64encode(content).decode("ascii"), "encoding": "base64"},
+            )
+            if status != 201:
+                return False, f"GitHub upload failed ({status}): {err}", None
+            tree_entries.append({"path": path, "mode": "100644", "type": "blob", "sha": data["sha"]})
+
+        status, data, err = github_api_request(
+            "POST",
+            f"{repo_url}/git/trees",
+            token,
+            {"base_tree": base_tree_sha, "tree": tree_entries},
+        )
+        if status != 201:
+            return False, f"GitHub upload failed ({status}): {err}", None
+        tree_sha = data["sha"]
+
+        status, data, err = github_api_request(
+            "POST",
+            f"{repo_url}/git/commits",
+            token,
+            {"message": commit_message, "tree": tree_sha, "parents": [head_sha]},
+        )
+        if status != 201:
+            return False, f"GitHub commit failed ({status}): {err}", None
+        commit_sha = data["sha"]
+
+        status, data, err = github_api_request("PATCH", ref_url, token, {"sha": commit_sha})
+        if status == 200:
+            blob_shas = dict(remote_shas)
+            blob_shas.update({entry["path"]: entry["sha"] for entry in tree_entries})
+            _branch_state[state_key] = {"head_sha": commit_sha, "tree_sha": tree_sha, "blob_shas": blob_shas}
+            names = ", ".join(Path(path).name for path in changed)
+            return True, f"Pushed {names} to GitHub ({owner}/{repo}@{branch}, commit {commit_sha[:7]}).", commit_sha
+        if status != 422 or attempt == 1:
+            return False, f"GitHub ref update failed ({status}): {err}", None
+        # 422: the branch moved since we read it - rebuild on top of the new head
+
+    return False, "GitHub ref update failed", None
+
+
+# ========== BACKGROUND SYNC QUEUE ==========
+
+class SyncQueue:
+    """
+    Debounced background pusher.
+
+    Saves call submit() and return immediately. A worker thread waits until no
+    new save has arrived for `delay` seconds (or `max_delay` has passed since
+    the first pending save), then pushes every pending file in one commit.
+    Failed pushes are retried with exponential backoff; saves arriving in the
+    meantime join the next attempt. Files are read at push time, so the commit
+    always carries their latest content.
+
+    `push` is called as push(file_paths, commit_message) and returns
+    (success, message, commit_sha) like push_files_via_git_data_api.
+    """
+
+    def __init__(
+        self,
+        push: Callable[[list[Path], str], tuple[bool, str, Optional[str]]],
+        delay: float = 5.0,
+        max_delay: float = 30.0,
+        max_attempts: int = 5,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0,
+    ):
+        self.push = push
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._pending_files: dict[str, Path] = {}
+        self._pending_messages: list[str] = []
+        self._first_submit = 0.0
+        self._last_submit = 0.0
+        self._retry_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._state = {
+            "state": "idle",  # idle, pending, pushing, retrying, failed
+            "pending_files": [],
+            "pending_changes": 0,
+            "attempt": 0,
+            "last_pushed_sha": None,
+            "last_pushed_at": None,
+            "last_message": "",
+            "last_error": None,
+        }
+
+    def submit(self, file_paths: list[Path], commit_message: str) -> dict:
+        """Queue files for the next push and return the current state."""
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending_files:
+                self._first_submit = now
+            self._last_submit = now
+            for path in file_paths:
+                self._pending_files[str(path)] = path
+            self._pending_messages.append(commit_message)
+            self._update_pending_state()
+            if self._state["state"] in ("idle", "failed"):
+                self._state["state"] = "pending"
+            self._ensure_worker()
+            self._cond.notify_all()
+            return self.status()
+
+    def status(self) -> dict:
+        with self._cond:
+            return dict(self._state)
+
+    def _update_pending_state(self) -> None:
+        self._state["pending_files"] = sorted(self._pending_files)
+        self._state["pending_changes"] = len(self._pending_messages)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="lynx-github-sync", daemon=True)
+            self._thread.start()
+
+    def _due_at(self) -> float:
+        debounce = min(self._last_submit + self.delay, self._first_submit + self.max_delay)
+        return max(debounce, self._retry_at)
+
+    def _commit_message(self, messages: list[str]) -> str:
+        unique = list(dict.fromkeys(messages))
+        if len(unique) == 1:
+            return unique[0]
+        return f"Sync {len(messages)} tracker changes\n\n" + "\n".join(f"- {m}" for m in unique)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending_files:
+                        # Nothing to do - let the thread end; submit() starts a new one
+                        self._state["state"] = "idle"
+                        self._thread = None
+                        return
+                    wait = self._due_at() - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+
+                files = list(self._pending_files.values())
+                messages = list(self._pending_messages)
+                self._pending_files.clear()
+                self._pending_messages.clear()
+                self._state["state"] = "pushing"
+                self._state["attempt"] += 1
+                self._update_pending_state()
+
+            try:
+                success, message, commit_sha = self.push(files, self._commit_message(messages))
+            except Exception as exc:
+                success, message, commit_sha = False, str(exc), None
+
+            with self._cond:
+                self._state["last_message"] = message
+                if success:
+                    self._state["last_pushed_sha"] = commit_sha
+                    self._state["last_pushed_at"] = datetime.now()
+                    self._state["last_error"] = None
+                    self._state["attempt"] = 0
+                    self._retry_at = 0.0
+                    self._state["state"] = "pending" if self._pending_files else "idle"
+                else:
+                    self._state["last_error"] = message
+                    # Put the batch back in front of anything submitted meanwhile
+                    for path in files:
+                        self._pending_files.setdefault(str(path), path)
+                    self._pending_messages[:0] = messages
+                    self._update_pending_state()
+                    if self._state["attempt"] >= self.max_attempts:
+                        # Give up for now; the next submit() starts a fresh round
+                        self._state["state"] = "failed"
+                        self._state["attempt"] = 0
+                        self._thread = None
+                        return
+                    self._state["state"] = "retrying"
+                    retry_in = min(self.backoff * 2 ** (self._state["attempt"] - 1), self.max_backoff)
+                    self._retry_at = time.monotonic() + retry_in
+
+
+# ========== SELF-CHECK ==========
+# `python lynx_sync.py` pushes files to an in-process mock of the Git Data API
+# (the endpoints push_files_via_git_data_api uses, over plain http.server) and
+# checks the blobs -> tree -> commit -> ref path without a token or network.
+
+class _MockGitHub:
+    """Blobs, trees, commits and branch refs of one mock repository, kept in memory."""
+
+    def __init__(self, branch: str = "main"):
+        self.blobs: dict[str, bytes] = {}
+        self.trees: dict[str, dict[str, str]] = {}
+        self.commits: dict[str, dict] = {}
+        self.refs: dict[str, str] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.move_branch_before_update = False
+        self.refs[branch] = self.add_commit("Initial commit", self.add_tree({}), [])
+
+    def add_tree(self, entries: dict[str, str]) -> str:
+        sha = hashlib.sha1(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def add_commit(self, message: str, tree_sha: str, parents: list[str]) -> str:
+        sha = hashlib.sha1(json.dumps([message, tree_sha, parents, len(self.commits)]).encode("utf-8")).hexdigest()
+        self.commits[sha] = {"message": message, "tree": tree_sha, "parents": parents}
+        return sha
+
+    def files(self, branch: str = "main") -> dict[str, bytes]:
+        tree = self.trees[self.commits[self.refs[branch]]["tree"]]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def handle(self, method: str, path: str, payload: dict) -> tuple[int, dict, Optional[str]]:
+        """Answer one API call; returns (status, body, ETag or None)."""
+        self.requests.append((method, path.split("?")[0]))
+        rest = path.split("?")[0].split("/", 4)[-1]  # after /repos/<owner>/<repo>/
+
+        if method == "GET" and rest.startswith("git/ref/heads/"):
+            sha = self.refs.get(urllib.parse.unquote(rest[len("git/ref/heads/"):]))
+            if sha is None:
+                return 404, {"message": "Not Found"}, None
+            return 200, {"object": {"sha": sha}}, f'"{sha}"'
+        if method == "GET" and rest.startswith("git/commits/"):
+            return 200, {"tree": {"sha": self.commits[rest.rsplit("/", 1)[1]]["tree"]}}, None
+        if method == "GET" and rest.startswith("git/trees/"):
+            tree = self.trees[rest.rsplit("/", 1)[1]]
+            return 200, {"tree": [{"path": p, "type": "blob", "sha": s} for p, s in tree.items()]}, None
+        if method == "POST" and rest == "git/blobs":
+            content = base64.b64decode(payload["content"])
+            sha = git_blob_sha(content)
+            self.blobs[sha] = content
+            return 201, {"sha": sha}, None
+        if method == "POST" and rest == "git/trees":
+            entries = dict(self.trees[payload["base_tree"]])
+            entries.update({entry["path"]: entry["sha"] for entry in payload["tree"]})
+            return 201, {"sha": self.add_tree(entries)}, None
+        if method == "POST" and rest == "git/commits":
+            return 201, {"sha": self.add_commit(payload["message"], payload["tree"], payload["parents"])}, None
+        if method == "PATCH" and rest.startswith("git/refs/heads/"):
+            branch = urllib.parse.unquote(rest[len("git/refs/heads/"):])
+            if self.move_branch_before_update:
+                # Someone else pushes between our read of the head and our ref update
+                self.move_branch_before_update = False
+                head = self.refs[branch]
+                self.refs[branch] = self.add_commit("Concurrent commit", self.commits[head]["tree"], [head])
+            if self.commits[payload["sha"]]["parents"] != [self.refs[branch]]:
+                return 422, {"message": "Update is not a fast forward"}, None
+            self.refs[branch] = payload["sha"]
+            return 200, {"object": {"sha": payload["sha"]}}, None
+        return 404, {"message": "Not Found"}, None
+
+
+def _serve_mock_github(mock: _MockGitHub):
+    """Start a local HTTP server for `mock` in a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as the connection pool expects
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length)) if length else {}
+            status, body, etag = mock.handle(self.command, self.path, payload)
+            if etag and self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+            else:
+                data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = _respond
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def self_check() -> None:
+    """Run push_files_via_git_data_api against the mock; raises AssertionError on the first failed check."""
+    import tempfile
+
+    def expect(condition: bool, what: str) -> None:
+        if not condition:
+            raise AssertionError(what)
+        print(f"ok  {what}")
+
+    mock = _MockGitHub()
+    server = _serve_mock_github(mock)
+    config = {
+        "token": "test", "owner": "lynx", "repo": "tracker", "branch": "main",
+        "api_url": f"http://127.0.0.1:{server.server_address[1]}",
+    }
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = Path(tmp, "Bookings.csv"), Path(tmp, "Monthly_Costs.csv")
+            first.write_text("Guest\nAna\n", encoding="utf-8")
+            second.write_text("Month\n2025-01\n", encoding="utf-8")
+            files = [first, second]
+
+            def pushed():
+                return {path: mock.files().get(repo_file_path(path)) for path in files}
+
+            success, message, sha = push_files_via_git_data_api(files, "Two files", config)
+            expect(success and sha == mock.refs["main"], f"first push commits: {message}")
+            expect(pushed() == {path: path.read_bytes() for path in files}, "both files land in that one commit")
+            expect(mock.commits[sha]["message"] == "Two files", "commit message is kept")
+
+            mock.requests.clear()
+            success, message, sha = push_files_via_git_data_api(files, "Nothing changed", config)
+            expect(success and "Already up to date" in message, "unchanged files are not committed again")
+            expect(all(method == "GET" for method, _ in mock.requests), "an unchanged push only reads the branch head")
+
+            mock.requests.clear()
+            first.write_text("Guest\nAna\nMarko\n", encoding="utf-8")
+            success, message, sha = push_files_via_git_data_api(files, "One file", config)
+            blob_uploads = [path for method, path in mock.requests if path.endswith("/git/blobs")]
+            expect(success and len(blob_uploads) == 1, "only the changed file is uploaded")
+            expect(
+                not any("/git/trees/" in path or "/git/commits/" in path for method, path in mock.requests if method == "GET"),
+                "our own last push is trusted while the branch has not moved",
+            )
+
+            second.write_text("Month\n2025-01\n2025-02\n", encoding="utf-8")
+            mock.move_branch_before_update = True
+            success, message, sha = push_files_via_git_data_api(files, "After a concurrent push", config)
+            expect(success, f"a push racing another commit succeeds: {message}")
+            parent = mock.commits[sha]["parents"][0]
+            expect(mock.commits[parent]["message"] == "Concurrent commit", "it is rebuilt on top of the new head")
+            expect(pushed() == {path: path.read_bytes() for path in files}, "the branch ends with the latest files")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("Git Data API push path ok")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -0,0 +1,885 @@
+"""
+Shared Streamlit pieces of the Lynx Apartment app: settings, the CSS and
+tooltip assets, the cached data layer, GitHub sync and the metric cards.
+
+Imported once per process by lynx_app.py and the page modules, so none of
+this is redefined on a rerun.
+"""
+import shutil
+import subprocess
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import pandas as pd
+import hashlib
+import html
+import json
+import re
+import sys
+import weakref
+from pathlib import Path
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from lynx_metrics import (
+    FILE_PATH,
+    METRIC_INFO,
+    METRIC_SECTIONS,
+    CHART_LAYOUTS,
+    recalc_monthly_costs,
+    recalc_toiletries,
+    clean_bookings,
+    sort_bookings,
+    tracker_content_hash,
+    TRACKER_SNAPSHOT_DIR,
+    tracker_snapshot_paths,
+    TRACKER_SHEETS,
+    sync_tracker_snapshot,
+    JOURNAL_COMPACT_SECONDS,
+    TrackerJournal,
+    VALIDATION_RULES,
+    legacy_columns_seen,
+    FX_RATES_FILE,
+    validate_bookings,
+    tracker_file_signature,
+)
+from lynx_reports import REPORT_TEMPLATES_FILE
+from lynx_sync import (
+    GITHUB_API_URL,
+    SyncQueue,
+    push_files_via_git_data_api,
+)
+
+
+# 🔧 CONFIG
+GITHUB_DEFAULT_OWNER = "Z0ck0"
+GITHUB_DEFAULT_REPO = "lynx-apartment-dashboard"
+GITHUB_DEFAULT_BRANCH = "main"
+GITHUB_SYNC_DELAY_SECONDS = 5.0  # saves within this window are pushed as one commit
+CUSTOM_METRICS_FILE = Path("lynx_custom_metrics.json")
+CUSTOM_GRAPHS_FILE = Path("lynx_custom_graphs.json")
+
+# Logo assets paths
+# Logo files should be placed in the assets/ folder:
+# - assets/lynx_logo_light.png: White logo on transparent background (for dark backgrounds)
+# - assets/lynx_logo_dark.png: Black logo on transparent background (for light backgrounds)
+# NOTE: For best results, logo files should be square (1:1 aspect ratio) to prevent stretching
+#       in the browser tab favicon. Recommended size: 32x32px to 512x512px, square format.
+LYNX_LOGO_LIGHT = Path("assets/lynx_logo_light.png")  # White logo for dark backgrounds
+LYNX_LOGO_DARK = Path("assets/lynx_logo_dark.png")    # Black logo for light backgrounds
+
+
+# ========== STATIC ASSETS ==========
+# The app's CSS and the metric tooltip script live in assets/. They are read
+# and minified once per process and tagged with a hash of their content. The
+# identical element every rerun then goes out as a hash reference to the
+# browser's copy (see global.minCachedMessageSize in .streamlit/config.toml),
+# and the script installs its listeners once per page load.
+
+APP_CSS_FILES = (
+    Path("assets/lynx_metric_tooltips.css"),
+    Path("assets/lynx_responsive.css"),
+)
+APP_JS_FILE = Path("assets/lynx_metric_tooltips.js")
+
+
+def _minify_css(css: str) -> str:
+    """Drop comments and the whitespace around CSS punctuation."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _minify_js(js: str) -> str:
+    """Drop indentation, blank lines and whole-line // comments (strings are left alone)."""
+    kept = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in kept if line and not line.startswith("//"))
+
+
+@lru_cache(maxsize=4)
+def _static_assets(signature: Tuple[Tuple[str, int], ...]) -> Tuple[str, str]:
+    """Minified `<style>` and `<script>` blocks for one version of the asset files."""
+    css = "".join(_minify_css(path.read_text(encoding="utf-8")) for path in APP_CSS_FILES)
+    js = _minify_js(APP_JS_FILE.read_text(encoding="utf-8"))
+    version = hashlib.sha256(f"{css}\0{js}".encode()).hexdigest()[:12]
+    style = f'<style data-lynx-assets="{version}">{css}</style>'
+    # Reruns re-send the element; the guard keeps a second copy of the listeners out
+    script = (
+        f'<script>if (window.lynxAssetsVersion !== "{version}") {{'
+        f'window.lynxAssetsVersion = "{version}";\n{js}\n}}</script>'
+    )
+    return style, script
+
+
+def inject_static_assets():
+    """Inject the app CSS and the metric tooltip script (hover + click/tap)."""
+    signature = tuple((str(path), path.stat().st_mtime_ns) for path in (*APP_CSS_FILES, APP_JS_FILE))
+    style, script = _static_assets(signature)
+    # Style-only HTML goes to Streamlit's event container and takes no space in the page
+    st.html(style)
+    st.sidebar.html(script, unsafe_allow_javascript=True)
+
+
+def render_lynx_logo(logo_path: Path, width: int = 50) -> None:
+    """
+    Render the Lynx logo image in the sidebar.
+    
+    Args:
+        logo_path: Path to the logo file (LYNX_LOGO_LIGHT or LYNX_LOGO_DARK)
+        width: Width of the logo in pixels (default: 50px)
+    
+    Usage:
+        - Use LYNX_LOGO_LIGHT (white) for dark backgrounds (sidebar, dark UI)
+        - Use LYNX_LOGO_DARK (black) for light backgrounds (reports, HTML exports)
+    """
+    if logo_path.exists():
+        st.sidebar.image(str(logo_path), width=width)
+    else:
+        # Fallback if logo file is missing
+        st.sidebar.markdown("🏡")  # Temporary fallback
+
+
+# ========== DATA LAYER ==========
+
+@st.cache_resource
+def get_tracker_journal(file_path: Path) -> TrackerJournal:
+    """One edit journal per workbook and app process; compacts into the workbook in the background."""
+    journal = TrackerJournal(file_path, TRACKER_SNAPSHOT_DIR)
+    journal.start_background_compaction(JOURNAL_COMPACT_SECONDS)
+    return journal
+
+
+# Frames of the cached snapshots by id(), so the session memory report can tell
+# shared data from what a session holds on its own
+_SHARED_FRAMES = weakref.WeakValueDictionary()
+
+
+@st.cache_resource(max_entries=4)
+def _load_tracker(file_path: Path, signature: tuple):
+    snapshot = get_tracker_journal(file_path).load_versioned()
+    for df in snapshot[1]:
+        _SHARED_FRAMES[id(df)] = df
+    return snapshot
+
+
+def load_data_snapshot(file_path: Path):
+    """
+    (version, (bookings, monthly_costs, toiletries)) as of the latest save by
+    any session or process - the cache is keyed on the workbook and journal files.
+
+    The frames are one snapshot shared by every session (editor bases keep a
+    reference, not a copy): never modify them in place, work on a .copy().
+    """
+    return _load_tracker(file_path, tracker_file_signature(file_path))
+
+
+def load_data(file_path: Path):
+    return load_data_snapshot(file_path)[1]
+
+
+def load_edit_base(file_path: Path) -> tuple[str, dict]:
+    """(version, {sheet: DataFrame}) of the current data - what an edit starts from (see save_data)."""
+    version, sheets = load_data_snapshot(file_path)
+    return version, dict(zip(TRACKER_SHEETS, sheets))
+
+
+@st.cache_data
+def _tracker_version(file_path: Path, signature: tuple) -> str:
+    return tracker_content_hash(file_path)
+
+
+def load_data_version(file_path: Path) -> str:
+    """Content hash of the tracker - changes whenever an edit is saved."""
+    return _tracker_version(file_path, tracker_file_signature(file_path))
+
+
+def save_data(bookings: pd.DataFrame,
+              monthly_costs: pd.DataFrame,
+              toiletries: pd.DataFrame,
+              file_path: Path,
+              base: Optional[tuple] = None) -> list[str]:
+    """
+    Save Bookings, Monthly_Costs, Toiletries. Each sheet that differs from the
+    current data is recorded in the edit journal; the workbook itself is
+    rewritten later by compaction.
+
+    `base` is the (version, sheets) the edit started from. If another session
+    saved since, the sheets it changed are merged with ours; EditConflict is
+    raised when both changed the same cells. Returns the merged sheet names.
+    """
+    bookings = clean_bookings(bookings)
+    # Ensure bookings are sorted before saving back to Excel
+    bookings = sort_bookings(bookings)
+    monthly_costs = recalc_monthly_costs(monthly_costs)
+    
+    toiletries = recalc_toiletries(toiletries)
+
+    base_version, base_sheets = base if base else (None, None)
+    return get_tracker_journal(file_path).save_sheets(
+        {"Bookings": bookings, "Monthly_Costs": monthly_costs, "Toiletries": toiletries},
+        base_version,
+        base_sheets,
+    )
+
+
+def append_booking(new_row: dict, file_path: Path) -> None:
+    """Save one new booking - a single journal line, whatever the size of the workbook."""
+    get_tracker_journal(file_path).append("append_rows", "Bookings", pd.DataFrame([new_row]))
+
+
+@st.cache_resource
+def prepare_tracker_files() -> str:
+    """
+    Once per app process: rebuild the workbook from the CSV snapshot when only
+    the snapshot is synced (or the workbook is missing), otherwise refresh the
+    snapshot from the workbook. Then fold in any journal entries a previous
+    run left behind.
+    """
+    rewritten = sync_tracker_snapshot(FILE_PATH, TRACKER_SNAPSHOT_DIR, snapshot_only=get_sync_snapshot_only())
+    get_tracker_journal(FILE_PATH).compact()
+    return rewritten
+
+
+def editor_has_edits(editor_key: str) -> bool:
+    """Whether a data editor holds unsaved edits (cleared by reset_editor after a save)."""
+    editor_state = st.session_state.get(editor_key) or {}
+    return any(editor_state.get(k) for k in ("edited_rows", "added_rows", "deleted_rows"))
+
+
+def editor_base(editor_key: str, loaded_base: tuple, has_edits: Optional[bool] = None) -> tuple[str, dict]:
+    """
+    The (version, sheets) a data editor's edits apply to. Re-pinned to the latest
+    data whenever the editor has no unsaved edits and kept while it has, so a
+    save by another session does not shift rows under the user; saving then
+    merges against the data they actually edited.
+
+    `has_edits` defaults to the editor's widget state; pass it when the edits
+    are kept elsewhere (see frame_edits).
+    """
+    state_key = f"{editor_key}_base"
+    if has_edits is None:
+        has_edits = editor_has_edits(editor_key)
+    if state_key not in st.session_state or not has_edits:
+        st.session_state[state_key] = loaded_base
+    return st.session_state[state_key]
+
+
+def show_edit_conflict(editor_key: str, context: str) -> None:
+    """Explain a rejected save and offer to drop the unsaved edits."""
+    conflicts = st.session_state.get(f"{editor_key}_conflict")
+    if not conflicts:
+        return
+    st.error(
+        f"{context} were not saved: someone else changed the same entries while you were editing.\n\n"
+        + "\n".join(f"- {conflict}" for conflict in conflicts)
+    )
+    if st.button("🔄 Discard my edits and load the latest data", key=f"{editor_key}_reload"):
+        reset_editor(editor_key)
+        st.rerun()
+
+
+def reset_editor(editor_key: str) -> None:
+    """
+    Drop an editor's edits, pinned base and conflict, after a save or when
+    discarding: the next run opens it on the latest data with nothing unsaved.
+    """
+    for key in (editor_key, f"{editor_key}_base", f"{editor_key}_edits", f"{editor_key}_conflict"):
+        st.session_state.pop(key, None)
+
+
+@st.cache_data(max_entries=4)
+def _validate_tracker(version: str, _bookings: pd.DataFrame) -> pd.DataFrame:
+    return validate_bookings(_bookings)
+
+
+def load_data_quality(file_path: Path) -> pd.DataFrame:
+    """Data-quality findings for the current bookings, checked once per data version."""
+    version, (bookings, _, _) = load_data_snapshot(file_path)
+    return _validate_tracker(version, bookings)
+
+
+def render_data_quality_panel(findings: pd.DataFrame) -> None:
+    """Filterable list of the validator's findings (Bookings page)."""
+    errors = int((findings["Severity"] == "error").sum())
+    warnings = len(findings) - errors
+    title = f"🩺 Data quality: {errors} errors, {warnings} warnings" if len(findings) else "🩺 Data quality: no issues found"
+    with st.expander(title, expanded=errors > 0):
+        legacy = legacy_columns_seen(FILE_PATH)
+        if legacy:
+            st.caption(
+                "Legacy column names in the workbook, read as the current ones: "
+                + "; ".join(f"{sheet}: " + ", ".join(f"{old} → {new}" for old, new in names.items()) for sheet, names in legacy.items())
+            )
+        if findings.empty:
+            st.caption("Every booking passed the checks.")
+            return
+        c1, c2, c3 = st.columns([1, 2, 2])
+        severities = c1.multiselect("Severity", ["error", "warning"], default=["error", "warning"], key="dq_severity")
+        present_rules = [rule for rule in VALIDATION_RULES if rule in set(findings["Rule"])]
+        rules = c2.multiselect(
+            "Check",
+            present_rules,
+            default=present_rules,
+            format_func=lambda rule: VALIDATION_RULES[rule][1],
+            key="dq_rules",
+        )
+        guest_query = c3.text_input("Guest name contains", key="dq_guest")
+
+        shown = findings[findings["Severity"].isin(severities) & findings["Rule"].isin(rules)]
+        if guest_query:
+            shown = shown[shown["Guest Name"].astype(str).str.contains(guest_query, case=False, regex=False)]
+        st.caption("Fix the bookings in the table below and save; the list updates with the new data.")
+        st.dataframe(
+            shown.drop(columns=["Row", "Rule"]),
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Check-in date": st.column_config.DateColumn("Check-in date", format="DD/MM/YYYY")},
+        )
+
+
+def run_git_command(args: list[str], repo_path: Path) -> tuple[bool, str]:
+    try:
+        completed = subprocess.run(
+            args,
+            cwd=str(repo_path),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            return False, completed.stderr.strip() or completed.stdout.strip()
+        return True, completed.stdout.strip()
+    except Exception as exc:
+        return False, str(exc)
+
+
+def get_current_git_branch(repo_path: Path) -> Optional[str]:
+    success, output = run_git_command(["git", "branch", "--show-current"], repo_path)
+    return output.strip() if success else None
+
+
+def get_github_setting(name: str, default=None):
+    """One optional value from the [github] secrets section (works without a token)."""
+    try:
+        gh = st.secrets.get("github") or {}
+        return gh.get(name, default)
+    except Exception:
+        return default
+
+
+def get_sync_snapshot_only() -> bool:
+    """[github] snapshot_only = true syncs the per-sheet CSVs instead of the binary workbook."""
+    value = get_github_setting("snapshot_only", False)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def get_github_config() -> Optional[dict]:
+    """Read GitHub API settings from Streamlit secrets (required on Streamlit Cloud)."""
+    try:
+        gh = st.secrets.get("github")
+    except Exception:
+        return None
+    if not gh:
+        return None
+    token = (gh.get("token") or "").strip()
+    if not token:
+        return None
+    return {
+        "token": token,
+        "owner": (gh.get("owner") or GITHUB_DEFAULT_OWNER).strip(),
+        "repo": (gh.get("repo") or GITHUB_DEFAULT_REPO).strip(),
+        "branch": (gh.get("branch") or GITHUB_DEFAULT_BRANCH).strip(),
+        "api_url": (gh.get("api_url") or GITHUB_API_URL).strip(),
+    }
+
+
+def commit_and_push_booking(repo_path: Path, file_paths: list[Path], commit_message: str) -> tuple[bool, str]:
+    if shutil.which("git") is None:
+        return False, "Git is not available on the app host."
+
+    paths = [str(p) for p in file_paths]
+    success, output = run_git_command(["git", "add", "--"] + paths, repo_path)
+    if not success:
+        return False, f"Git add failed: {output}"
+
+    success, output = run_git_command(["git", "commit", "-m", commit_message], repo_path)
+    if not success:
+        if "nothing to commit" in output.lower():
+            return False, "Nothing to commit. The booking file did not change or the change was already committed."
+        return False, f"Git commit failed: {output}"
+
+    branch = get_current_git_branch(repo_path)
+    if not branch:
+        return False, "Unable to determine current Git branch."
+
+    success, output = run_git_command(["git", "push", "origin", branch], repo_path)
+    if not success:
+        return False, f"Git push failed: {output}"
+
+    return True, output
+
+
+def get_synced_files() -> list[Path]:
+    """
+    Tracker (workbook and/or its CSV snapshot) plus whichever app config files
+    exist - pushed together in one commit.
+    """
+    files = [] if get_sync_snapshot_only() else [FILE_PATH]
+    files += [path for path in tracker_snapshot_paths(TRACKER_SNAPSHOT_DIR) if path.is_file()]
+    files += [
+        path for path in (CUSTOM_METRICS_FILE, CUSTOM_GRAPHS_FILE, REPORT_TEMPLATES_FILE, FX_RATES_FILE)
+        if path.is_file()
+    ]
+    return files
+
+
+def make_sync_push(github_config: Optional[dict]):
+    """
+    Push function for the sync queue: the Git Data API when [github] secrets are
+    configured (Streamlit Cloud), otherwise local git push. Secrets are read up
+    front because the queue calls this from a background thread.
+    """
+    if github_config:
+        return lambda file_paths, message: push_files_via_git_data_api(file_paths, message, github_config)
+
+    git_repo_path = Path(__file__).resolve().parent
+
+    def push_with_local_git(file_paths: list[Path], message: str) -> tuple[bool, str, Optional[str]]:
+        success, output = commit_and_push_booking(git_repo_path, file_paths, message)
+        if not success:
+            return False, output, None
+        ok, head = run_git_command(["git", "rev-parse", "HEAD"], git_repo_path)
+        return True, output, head.strip() if ok else None
+
+    return push_with_local_git
+
+
+@st.cache_resource
+def get_sync_queue() -> SyncQueue:
+    """One background push queue per app process, shared by all sessions."""
+    try:
+        delay = float(get_github_setting("sync_delay", GITHUB_SYNC_DELAY_SECONDS))
+    except (TypeError, ValueError):
+        delay = GITHUB_SYNC_DELAY_SECONDS
+    journal = get_tracker_journal(FILE_PATH)
+    push = make_sync_push(get_github_config())
+
+    def compact_and_push(file_paths: list[Path], message: str) -> tuple[bool, str, Optional[str]]:
+        # Fold journaled edits into the workbook and CSV snapshot before they are read for the push
+        journal.compact()
+        return push(file_paths, message)
+
+    return SyncQueue(compact_and_push, delay=delay)
+
+
+def queue_github_push(commit_message: str) -> dict:
+    """Queue the tracker and config files for the next background push; returns the queue state."""
+    return get_sync_queue().submit(get_synced_files(), commit_message)
+
+
+def remember_github_push_result(sync_state: dict, context: str = "Changes") -> None:
+    """Keep the outcome of a save for show_github_push_result; saves rerun right after, which would wipe a message shown now."""
+    st.session_state["github_push_result"] = (context, sync_state.get("last_error"))
+
+
+def show_github_push_result() -> None:
+    """Show the outcome remembered by the last save, once."""
+    result = st.session_state.pop("github_push_result", None)
+    if result is None:
+        return
+    context, last_error = result
+    if last_error:
+        st.warning(
+            f"{context} saved locally. The last GitHub push failed and will be retried "
+            f"with the next sync: {last_error}"
+        )
+        if not get_github_config():
+            st.info(
+                "On Streamlit Cloud, add a GitHub token in app Secrets:\n\n"
+                "```toml\n[github]\n"
+                'token = "ghp_..."\n'
+                f'owner = "{GITHUB_DEFAULT_OWNER}"\n'
+                f'repo = "{GITHUB_DEFAULT_REPO}"\n'
+                f'branch = "{GITHUB_DEFAULT_BRANCH}"\n'
+                "```"
+            )
+    else:
+        st.success(f"{context} saved ✅ Syncing to GitHub in the background.")
+        st.toast("Lynx Apartment Tracker.xlsx queued for GitHub sync.", icon="🚀")
+
+
+def render_sync_status() -> None:
+    """One-line GitHub sync status for the sidebar."""
+    sync_state = get_sync_queue().status()
+    state = sync_state["state"]
+    if state in ("pending", "pushing"):
+        changes = sync_state["pending_changes"]
+        st.sidebar.caption(f"🔄 GitHub sync: {state} ({changes} change{'s' if changes != 1 else ''})")
+    elif state in ("retrying", "failed"):
+        st.sidebar.caption(f"⚠️ GitHub sync {state}: {sync_state['last_error']}")
+    elif sync_state["last_pushed_sha"]:
+        pushed_at = sync_state["last_pushed_at"].strftime("%H:%M")
+        st.sidebar.caption(f"✅ GitHub synced at {pushed_at} ({sync_state['last_pushed_sha'][:7]})")
+
+
+# ========== SESSION MEMORY ==========
+
+def _retained_bytes(value, seen: set) -> tuple[int, int]:
+    """
+    (own, shared) bytes `value` keeps alive: frames are measured with
+    memory_usage(deep=True), containers with their items, anything else with
+    sys.getsizeof. Frames of the cached data snapshots count as shared.
+    Objects in `seen` were counted already.
+    """
+    if id(value) in seen:
+        return 0, 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = int(value.memory_usage(deep=True).sum())
+        return (0, size) if _SHARED_FRAMES.get(id(value)) is value else (size, 0)
+    own, shared = sys.getsizeof(value), 0
+    if isinstance(value, dict):
+        items = [*value.keys(), *value.values()]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    else:
+        items = ()
+    for item in items:
+        item_own, item_shared = _retained_bytes(item, seen)
+        own += item_own
+        shared += item_shared
+    return own, shared
+
+
+def session_footprint(state: dict) -> pd.DataFrame:
+    """Bytes each session-state key retains (one row per key, largest first)."""
+    seen = set()
+    rows = []
+    for key, value in state.items():
+        own, shared = _retained_bytes(value, seen)
+        rows.append({"Key": str(key), "Type": type(value).__name__, "Own bytes": own, "Shared bytes": shared})
+    return pd.DataFrame(rows, columns=["Key", "Type", "Own bytes", "Shared bytes"]).sort_values(
+        "Own bytes", ascending=False, ignore_index=True
+    )
+
+
+def _all_session_states() -> dict:
+    """
+    {session id: session state} for every session this server runs. Listing
+    the other sessions goes through Streamlit's internal session manager, which
+    is not a public API: when it is missing or has changed shape (or there is
+    no server), only this session is returned, as {"this session": state}.
+    """
+    this_session = {"this session": dict(st.session_state)}
+    try:
+        from streamlit.runtime import Runtime
+        session_mgr = getattr(Runtime.instance(), "_session_mgr", None)
+        sessions = session_mgr.list_sessions() if session_mgr is not None else []
+    except Exception:
+        return this_session
+    states = {}
+    for info in sessions:
+        try:
+            session = info.session
+            states[session.id] = dict(session.session_state.filtered_state)
+        except Exception:
+            continue  # the session is mid-rerun, or the internals changed
+    return states or this_session
+
+
+def session_memory_panel_enabled() -> bool:
+    """
+    [debug] session_memory = true in the secrets shows the Session memory panel.
+    Off by default: the panel lists every open session, so it is for whoever
+    sizes the server, not for every visitor.
+    """
+    try:
+        value = (st.secrets.get("debug") or {}).get("session_memory", False)
+    except Exception:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+def render_session_memory() -> None:
+    """
+    Sidebar debug panel: what every open session keeps in session state, for
+    sizing the container. Shared data snapshots are listed once, not per session.
+    Only shown when enabled in the secrets (see session_memory_panel_enabled).
+    """
+    if not session_memory_panel_enabled():
+        return
+    with st.sidebar.expander("🧠 Session memory"):
+        if not st.toggle("Measure", key="session_memory_measure"):
+            st.caption("Bytes each open session retains in its session state.")
+            return
+        ctx = get_script_run_ctx()
+        this_session = ctx.session_id if ctx else None
+        rows = []
+        states = _all_session_states()
+        for session_id, state in states.items():
+            footprint = session_footprint(state)
+            rows.append({
+                "Session": "this session" if session_id in (this_session, "this session") else session_id[:8],
+                "Keys": len(footprint),
+                "Retained": format_bytes(footprint["Own bytes"].sum()),
+                "Largest key": footprint["Key"].iloc[0] if len(footprint) else "",
+            })
+        snapshot_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in list(_SHARED_FRAMES.values()))
+        st.caption(
+            f"{len(rows)} session(s). Shared data snapshots: {format_bytes(snapshot_bytes)} "
+            f"in total, held once for all sessions."
+            + (" Only this session is listed: Streamlit's session list is not available here." if "this session" in states else "")
+        )
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        st.markdown("**This session by key**")
+        mine = session_footprint(dict(st.session_state))
+        st.dataframe(
+            mine.assign(**{
+                "Own bytes": mine["Own bytes"].map(format_bytes),
+                "Shared bytes": mine["Shared bytes"].map(format_bytes),
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+# ========== UI HELPERS ==========
+
+def get_metric_info(metric_key: str) -> dict:
+    """
+    Get metric information from central METRIC_INFO dictionary.
+    Returns empty dict if metric not found.
+    """
+    # Try exact match first
+    if metric_key in METRIC_INFO:
+        return METRIC_INFO[metric_key]
+    
+    # Try partial matches (for metrics with platform prefixes or variations)
+    for key, info in METRIC_INFO.items():
+        if key.lower() in metric_key.lower() or metric_key.lower() in key.lower():
+            return info
+    
+    return {}
+
+
+def format_kpi_value(value, prefix="") -> str:
+    """Format nicely: ints no decimals, floats 2 decimals."""
+    if isinstance(value, bool):
+        return f"{prefix}{value}"
+    if isinstance(value, int):
+        return f"{prefix}{value:,}"
+    if isinstance(value, float):
+        return f"{prefix}{value:,.2f}"
+    return f"{prefix}{value}"
+
+
+@lru_cache(maxsize=1024)
+def _kpi_card_template(label: str, metric_key: Optional[str]) -> Tuple[str, str]:
+    """
+    Card HTML before and after the value for one label.
+
+    METRIC_INFO is fixed, so the ID hash, the metric lookup and the escaping
+    are done once per label instead of on every rerun.
+    """
+    metric_info = get_metric_info(metric_key or label) if (metric_key or label) else {}
+    formula = metric_info.get("formula", "Formula not available.")
+    insight = metric_info.get("insight", "This metric helps track performance.")
+
+    suffix = hashlib.md5(label.encode()).hexdigest()[:8]
+    tooltip_id = f"tooltip-{suffix}"
+    head = (
+        f'<div class="metric-card-container" id="metric-{suffix}">'
+        f'<div class="metric-info-icon" id="icon-{suffix}" data-tooltip-id="{tooltip_id}" title="Click for detailed information" role="button" aria-label="Show metric information" tabindex="0">i</div>'
+        f'<div class="metric-tooltip" id="{tooltip_id}">'
+        f'<div class="metric-tooltip-title">{html.escape(label)}</div>'
+        f'<div class="metric-tooltip-formula">{html.escape(formula)}</div>'
+        f'<div class="metric-tooltip-insight">{html.escape(insight)}</div>'
+        f'</div>'
+        f'<div class="metric-card-label" style="font-size:0.9rem;color:#ccc;min-height:32px;line-height:1.4;">{html.escape(label)}</div>'
+        f'<div class="metric-card-value" style="font-size:1.5rem;font-weight:600;margin-top:0.3rem;color:#fff;flex-grow:1;display:flex;align-items:center;">'
+    )
+    return head, "</div></div>"
+
+
+def kpi_card_html(label, value, prefix="", metric_key=None, explanation=None) -> str:
+    """HTML for one metric card with tooltip and info icon."""
+    head, tail = _kpi_card_template(label, metric_key)
+    return f"{head}{html.escape(format_kpi_value(value, prefix))}{tail}"
+
+
+def kpi_card(label, value, prefix="", metric_key=None, explanation=None):
+    """
+    Render a metric card with tooltip and info icon.
+    
+    Args:
+        label: Display label for the metric
+        value: Metric value
+        prefix: Prefix for value (e.g., "€ ")
+        metric_key: Key to look up in METRIC_INFO dictionary
+        explanation: Optional explanation override (for backward compatibility)
+    """
+    st.markdown(kpi_card_html(label, value, prefix, metric_key, explanation), unsafe_allow_html=True)
+
+
+def metric_grid_card(metric_info: dict, metric_key: str, label: Optional[str] = None) -> dict:
+    """A kpi_grid card for an entry of calculate_all_metrics(), captioned with its explanation."""
+    mi = metric_info[metric_key]
+    return {
+        "label": label or mi["label"],
+        "value": mi["value"],
+        "prefix": mi["prefix"],
+        "metric_key": metric_key,
+        "explanation": mi.get("explanation"),
+        "caption": mi.get("explanation"),
+    }
+
+
+def kpi_grid(cards: List[dict], columns: int = 3) -> None:
+    """
+    Render metric cards, each with its caption, as one grid element.
+
+    Replaces a kpi_card + st.caption pair per metric inside st.columns, so a
+    section of any size is a single message to the browser. Streamlit sends
+    an unchanged message of 2 KB or more (minCachedMessageSize in
+    .streamlit/config.toml; Streamlit's default is 10 KB) as a reference to
+    the copy the browser already has, so a grid is only re-sent when a value
+    changes.
+
+    Args:
+        cards: dicts with label, value and optional prefix, metric_key,
+            explanation and caption (see metric_grid_card)
+        columns: cards per row on wide screens
+    """
+    if not cards:
+        return
+    cells = []
+    for card in cards:
+        cell = kpi_card_html(
+            card["label"],
+            card["value"],
+            card.get("prefix", ""),
+            card.get("metric_key"),
+            card.get("explanation"),
+        )
+        caption = card.get("caption")
+        if caption:
+            cell += f'<div class="metric-card-caption">{html.escape(str(caption))}</div>'
+        cells.append(f'<div class="metric-grid-cell">{cell}</div>')
+    st.markdown(
+        f'<div class="metric-grid" style="--metric-grid-columns:{columns};">{"".join(cells)}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+def get_metric_section(metric_key: str) -> str:
+    """Find which section a metric belongs to."""
+    for section, metrics in METRIC_SECTIONS.items():
+        if metric_key in metrics:
+            return section
+    return "Other"
+
+
+def load_custom_metrics() -> list[str]:
+    """
+    Load custom metrics from JSON file.
+    Returns empty list if file doesn't exist or is invalid.
+    """
+    if CUSTOM_METRICS_FILE.exists():
+        try:
+            with open(CUSTOM_METRICS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                # Validate it's a list of strings
+                if isinstance(data, list):
+                    return [str(m) for m in data if isinstance(m, str)]
+        except (json.JSONDecodeError, IOError, Exception) as e:
+            # If file is corrupted or can't be read, return empty list
+            st.warning(f"Could not load custom metrics: {e}")
+            return []
+    return []
+
+
+def save_custom_metrics(metrics: list[str]) -> None:
+    """
+    Save custom metrics to JSON file.
+    Filters out invalid metric keys before saving.
+    """
+    try:
+        # Validate metrics are strings
+        valid_metrics = [str(m) for m in metrics if isinstance(m, str)]
+        with open(CUSTOM_METRICS_FILE, "w", encoding="utf-8") as f:
+            json.dump(valid_metrics, f, indent=2, ensure_ascii=False)
+    except (IOError, Exception) as e:
+        st.error(f"Could not save custom metrics: {e}")
+
+
+def initialize_custom_metrics():
+    """
+    Initialize session state for custom metrics.
+    Loads from JSON file on first run, then uses session state for performance.
+    """
+    if "custom_metrics" not in st.session_state:
+        # Load from persistent storage
+        st.session_state["custom_metrics"] = load_custom_metrics()
+
+
+def load_custom_graphs() -> list[dict]:
+    """
+    Load custom graphs from JSON file.
+    Returns empty list if file doesn't exist or is invalid.
+    """
+    if CUSTOM_GRAPHS_FILE.exists():
+        try:
+            with open(CUSTOM_GRAPHS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                # Validate it's a list of dicts
+                if isinstance(data, list):
+                    return [g for g in data if isinstance(g, dict) and "name" in g and "metric_key" in g and "layout" in g]
+        except (json.JSONDecodeError, IOError, Exception) as e:
+            # If file is corrupted or can't be read, return empty list
+            st.warning(f"Could not load custom graphs: {e}")
+            return []
+    return []
+
+
+def save_custom_graphs(graphs: list[dict]) -> None:
+    """
+    Save custom graphs to JSON file.
+    Filters out invalid graph definitions before saving.
+    """
+    try:
+        # Validate graphs are dicts with required fields
+        valid_graphs = []
+        for g in graphs:
+            if isinstance(g, dict) and "name" in g and "metric_key" in g and "layout" in g:
+                # Ensure layout is valid; metric_key can be any known or future metric
+                # (including time-series keys like CHART_METRIC_KEYS or KPI keys from METRIC_INFO)
+                if g["layout"] in CHART_LAYOUTS and isinstance(g["metric_key"], str):
+                    valid_graphs.append(g)
+        
+        with open(CUSTOM_GRAPHS_FILE, "w", encoding="utf-8") as f:
+            json.dump(valid_graphs, f, indent=2, ensure_ascii=False)
+    except (IOError, Exception) as e:
+        st.error(f"Could not save custom graphs: {e}")
+
+
+def initialize_custom_graphs():
+    """
+    Initialize session state for custom graphs.
+    Loads from JSON file on first run, then uses session state for performance.
+    """
+    if "custom_graphs" not in st.session_state:
+        # Load from persistent storage
+        st.session_state["custom_graphs"] = load_custom_graphs()